@@ -47,11 +47,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'accounts.middleware.QueryBudgetMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.ProfileMiddleware',
+    'accounts.middleware.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -69,6 +72,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'accounts.context_processors.notifications',
             ],
         },
     },
@@ -88,6 +92,35 @@ DATABASES = {
     )
 }
 
+# Read replicas, as comma separated URLs: replica1, replica2, ...
+for number, url in enumerate(filter(None, os.environ.get('REPLICA_DATABASE_URLS', '').split(',')), 1):
+    DATABASES[f'replica{number}'] = {
+        **dj_database_url.parse(url.strip()),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+# Reads of reporting views and commands go to these DATABASES aliases
+# while they are up and within REPLICA_MAX_LAG seconds of the primary
+# (see accounts/replicas.py); lag is measured from the replica_heartbeat
+# worker's writes
+DATABASE_ROUTERS = ['accounts.replicas.ReplicaRouter']
+REPLICA_MAX_LAG = 10
+# Seconds between checks of a replica, per process
+REPLICA_CHECK_INTERVAL = 5
+# Seconds a user's reads stay on the primary after they write
+REPLICA_STICKY_SECONDS = 15
+
+# Cache (dashboard fragments, see dashboard/fragments.py), shared by the
+# worker processes of a host
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_DIR', str(BASE_DIR / 'cache')),
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    }
+}
+
 
 
 # Password validation
@@ -134,6 +167,11 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Custom user model
 AUTH_USER_MODEL = 'accounts.User'
+
+# Loads the student or company profile with the session's user (see
+# accounts.middleware.ProfileMiddleware)
+AUTHENTICATION_BACKENDS = ['accounts.backends.ProfileBackend']
+
 # Login URLs
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'home'
@@ -149,6 +187,69 @@ EMAIL_HOST_PASSWORD = 'uecyoapfdcubwnyq'
 
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
+# Seconds an outbox email the mail server rejects is retried before it is
+# marked failed; connection errors only delay it (see accounts/outbox.py)
+OUTBOX_GIVE_UP_AFTER = 24 * 60 * 60
+
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Media files, served only through access-checked views
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+
+# Job search backend (see jobs/search.py)
+JOB_SEARCH_BACKEND = 'jobs.search.MySQLFullTextBackend'
+
+# Raise instead of logging when a view exceeds its @query_budget
+QUERY_BUDGET_STRICT = False
+
+# Notifications for audiences this large are written by the process_fanout worker
+FANOUT_ASYNC_THRESHOLD = 10000
+
+# Processes hashing passwords during bulk user imports; None uses one per CPU
+IMPORT_HASH_WORKERS = None
+
+# Processes of the process_resumes worker extracting resume text; None uses
+# up to two, fewer on a single CPU
+RESUME_EXTRACT_WORKERS = None
+
+# Uploads are hashed as they are received, for content-addressed resume
+# storage (see accounts/storage.py)
+FILE_UPLOAD_HANDLERS = [
+    'accounts.storage.HashingMemoryFileUploadHandler',
+    'accounts.storage.HashingTemporaryFileUploadHandler',
+]
+
+# Front-end server sending resume downloads after the access check:
+# 'x-accel-redirect' (nginx), 'x-sendfile' (Apache, lighttpd), or None to
+# stream them from Django (see accounts/downloads.py)
+RESUME_SENDFILE = None
+
+# Internal nginx location aliased to MEDIA_ROOT, for 'x-accel-redirect'
+RESUME_SENDFILE_PREFIX = '/protected-media/'
+
+# Seconds a process may serve its cached list of active announcements
+ANNOUNCEMENT_CACHE_TTL = 60
+
+# Seconds before the officer dashboard snapshot is recomputed from scratch
+OFFICER_SNAPSHOT_TTL = 300
+
+# Currency of salaries written without one, and of placement package statistics
+SALARY_DEFAULT_CURRENCY = 'INR'
+
+# Cache alias of the dashboard fragments, and seconds after which fragments
+# listing upcoming items are re-rendered so that past items drop out
+DASHBOARD_FRAGMENT_CACHE = 'default'
+DASHBOARD_FRAGMENT_CLOCK = 300
+
+# Share of fragment renders counted in the hit and miss statistics; each
+# count is a cache write, a file write with the file based cache
+DASHBOARD_FRAGMENT_STATS_SAMPLE = 0.01
+
+# Cache alias of the iCalendar feeds, seconds a built feed is served before
+# it is rebuilt, and days of past interviews and events a feed lists
+CALENDAR_FEED_CACHE = 'default'
+CALENDAR_FEED_TTL = 3600
+CALENDAR_FEED_PAST_DAYS = 30
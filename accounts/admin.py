@@ -1,9 +1,10 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, StudentProfile, CompanyProfile, Notification
+from .models import User, StudentProfile, CompanyProfile, Notification, OutboxEmail, FanoutJob, ResumeText
+from .replicas import ReplicaChangelistMixin
 
 # User admin with custom fields
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(ReplicaChangelistMixin, UserAdmin):
     fieldsets = UserAdmin.fieldsets + (
         ('Additional Info', {'fields': ('user_type', 'phone_number')}),
     )
@@ -14,7 +15,7 @@ admin.site.register(User, CustomUserAdmin)
 
 # Student Profile Admin
 @admin.register(StudentProfile)
-class StudentProfileAdmin(admin.ModelAdmin):
+class StudentProfileAdmin(ReplicaChangelistMixin, admin.ModelAdmin):
     list_display = ('user', 'roll_number', 'department', 'year_of_graduation', 'cgpa')
     search_fields = ('user__username', 'roll_number', 'department')
     list_filter = ('department', 'year_of_graduation')
@@ -28,7 +29,32 @@ class CompanyProfileAdmin(admin.ModelAdmin):
 
 # Notification Admin
 @admin.register(Notification)
-class NotificationAdmin(admin.ModelAdmin):
+class NotificationAdmin(ReplicaChangelistMixin, admin.ModelAdmin):
     list_display = ('title', 'user', 'created_at', 'read')
     list_filter = ('read', 'created_at')
     search_fields = ('title', 'message', 'user__username')
+
+# Outbox Admin
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipient', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'recipient')
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
+
+# Fan-out Admin
+@admin.register(FanoutJob)
+class FanoutJobAdmin(admin.ModelAdmin):
+    list_display = ('title', 'audience', 'audience_value', 'status', 'delivered', 'created_at', 'finished_at')
+    list_filter = ('status', 'audience')
+    search_fields = ('title',)
+    readonly_fields = ('delivered', 'last_user_id', 'last_error', 'created_at', 'updated_at', 'finished_at')
+
+# Resume Text Admin
+@admin.register(ResumeText)
+class ResumeTextAdmin(admin.ModelAdmin):
+    list_display = ('student', 'status', 'skills', 'extracted_at', 'updated_at')
+    list_filter = ('status',)
+    search_fields = ('student__user__username', 'student__roll_number', 'skills')
+    readonly_fields = ('file_name', 'content_hash', 'extracted_hash', 'text', 'skills', 'last_error',
+                       'created_at', 'updated_at', 'extracted_at')
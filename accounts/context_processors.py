@@ -0,0 +1,15 @@
+from dashboard.feed import unseen_announcement_count
+
+
+def notifications(request):
+    """
+    Unread badge count for the navigation bar.
+    Reads the counter loaded with request.user and the cached announcement
+    list, so it adds no queries.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {
+        'unread_notification_count': user.unread_notifications + unseen_announcement_count(user),
+    }
@@ -0,0 +1,15 @@
+def query_budget(max_queries):
+    """
+    Declare the maximum number of SQL queries a request to this view may
+    issue, including session and authentication lookups.
+    Enforced by accounts.middleware.QueryBudgetMiddleware.
+    
+    Usage:
+        @login_required
+        @query_budget(10)
+        def my_view(request): ...
+    """
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
@@ -0,0 +1,195 @@
+"""
+Serving stored files after an access check.
+
+With RESUME_SENDFILE set, a view only checks access and hands the file
+to the front-end server: 'x-accel-redirect' (nginx) redirects internally
+to RESUME_SENDFILE_PREFIX + the file name, which must be an internal
+location aliased to MEDIA_ROOT; 'x-sendfile' (Apache mod_xsendfile,
+lighttpd) passes the file's path. The server then sends the file,
+including ranges and conditional requests.
+
+Without it, the file is streamed from Django in chunks. The response
+carries an ETag (the content hash of content-addressed names) and
+Last-Modified, answers If-None-Match and If-Modified-Since with 304, and
+serves a single byte range with 206, so that PDF viewers can fetch
+pages and interrupted downloads can resume.
+
+stream_zip() sends several stored files as one ZIP archive, written as
+the files are read, a chunk at a time: nothing is buffered besides the
+chunk being sent, so the first bytes go out at once and memory does not
+grow with the archive.
+"""
+import logging
+import mimetypes
+import os
+import re
+import zipfile
+from datetime import datetime
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from .storage import stored_hash
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Already compressed formats, stored in archives rather than deflated again
+STORED_EXTENSIONS = {'.pdf', '.docx', '.zip', '.png', '.jpg', '.jpeg'}
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def byte_range(header, size):
+    """
+    Return (start, end), end exclusive, of a single-range Range header,
+    None to send the whole file (no header, several ranges or a syntax
+    error), or False when the range is past the end of the file.
+    """
+    match = _RANGE.match(header.replace(' ', '')) if header else None
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last bytes of the file
+        length = int(last)
+        if not length:
+            return False
+        return max(size - length, 0), size
+    start = int(first)
+    end = min(int(last) + 1, size) if last else size
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return False
+    return start, end
+
+
+def _read_range(path, start, end):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _if_range_matches(request, etag, last_modified):
+    """Whether the Range header applies, given If-Range"""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _disposition(download_name, as_attachment):
+    kind = 'attachment' if as_attachment else 'inline'
+    try:
+        download_name.encode('ascii')
+        return f'{kind}; filename="{download_name}"'
+    except UnicodeEncodeError:
+        return f"{kind}; filename*=utf-8''{quote(download_name)}"
+
+
+def serve_file(request, storage, name, download_name, as_attachment=False):
+    """Response sending a stored file, or 304/412/416 for the request's conditions"""
+    try:
+        path = storage.path(name)
+        stat = os.stat(path)
+    except (FileNotFoundError, NotImplementedError):
+        raise Http404("File not found")
+    size, last_modified = stat.st_size, int(stat.st_mtime)
+    digest = stored_hash(name)
+    etag = quote_etag(digest) if digest else f'"{last_modified:x}-{size:x}"'
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        content_type = mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+        mode = getattr(settings, 'RESUME_SENDFILE', None)
+        if mode == 'x-accel-redirect':
+            response = HttpResponse(content_type=content_type)
+            prefix = getattr(settings, 'RESUME_SENDFILE_PREFIX', '/protected-media/')
+            response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(name)
+        elif mode == 'x-sendfile':
+            response = HttpResponse(content_type=content_type)
+            response['X-Sendfile'] = path
+        else:
+            bounds = byte_range(request.META.get('HTTP_RANGE'), size)
+            if bounds is not None and not _if_range_matches(request, etag, last_modified):
+                bounds = None
+            if bounds is False:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+            if bounds is None or bounds == (0, size):
+                response = FileResponse(open(path, 'rb'), content_type=content_type)
+            else:
+                start, end = bounds
+                response = StreamingHttpResponse(_read_range(path, start, end), status=206,
+                                                 content_type=content_type)
+                response['Content-Range'] = f'bytes {start}-{end - 1}/{size}'
+                response['Content-Length'] = str(end - start)
+            response['Accept-Ranges'] = 'bytes'
+        response['Content-Disposition'] = _disposition(download_name, as_attachment)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+class _Sink:
+    """Write-only stream whose contents are sent after each write"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        if self.chunks:
+            yield b''.join(self.chunks)
+            self.chunks.clear()
+
+
+def stream_zip(storage, entries):
+    """
+    Yield a ZIP archive of stored files, given (archive name, stored name)
+    pairs. Files that cannot be read are left out.
+    """
+    sink = _Sink()
+    # The sink cannot seek, so entries are written with data descriptors
+    with zipfile.ZipFile(sink, 'w') as archive:
+        for arcname, name in entries:
+            try:
+                path = storage.path(name)
+                file = open(path, 'rb')
+            except (OSError, NotImplementedError) as exc:
+                logger.warning("Left %s out of an archive: %s", name, exc)
+                continue
+            with file:
+                stat = os.fstat(file.fileno())
+                info = zipfile.ZipInfo(arcname, datetime.fromtimestamp(stat.st_mtime).timetuple()[:6])
+                info.file_size = stat.st_size
+                extension = os.path.splitext(arcname)[1].lower()
+                info.compress_type = zipfile.ZIP_STORED if extension in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+                with archive.open(info, 'w') as entry:
+                    while chunk := file.read(CHUNK_SIZE):
+                        entry.write(chunk)
+                        yield from sink.drain()
+            yield from sink.drain()
+    # The central directory
+    yield from sink.drain()
@@ -0,0 +1,152 @@
+"""
+Notification fan-out to a whole audience.
+
+fan_out() resolves an audience (all users, a role, the students of a
+department or the applicants of a job) to user ids, streamed with
+.iterator(), and writes Notification rows with chunked bulk_create, so
+memory stays bounded whatever the audience size. Audiences of
+FANOUT_ASYNC_THRESHOLD users or more are not written in the request:
+a FanoutJob row is queued instead and the process_fanout worker delivers
+it chunk by chunk, checkpointing after each chunk so an interrupted job
+resumes without duplicates.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import FanoutJob, Notification
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+DEFAULT_ASYNC_THRESHOLD = 10000
+
+# A running job that has not checkpointed for this long is picked up again
+STALE_AFTER = timedelta(minutes=10)
+
+
+def audience_users(audience, value=None):
+    """Return the queryset of active users in an audience"""
+    users = get_user_model().objects.filter(is_active=True)
+    if audience == 'all':
+        return users
+    if audience == 'students':
+        return users.filter(user_type='student')
+    if audience == 'companies':
+        return users.filter(user_type='company')
+    if audience == 'officers':
+        return users.filter(user_type='officer')
+    if audience == 'department':
+        return users.filter(user_type='student', student_profile__department=value)
+    if audience == 'job_applicants':
+        return users.filter(student_profile__applications__job_id=value)
+    raise ValueError(f"Unknown audience: {audience!r}")
+
+
+def iter_user_chunks(users, after_id=0, chunk_size=CHUNK_SIZE):
+    """Yield lists of user ids in id order, streaming the query"""
+    ids = (
+        users.filter(pk__gt=after_id).order_by('pk')
+        .values_list('pk', flat=True).iterator(chunk_size=chunk_size)
+    )
+    chunk = []
+    for user_id in ids:
+        chunk.append(user_id)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def notify_users(user_ids, title, message):
+    """Write one notification per user id with a single INSERT"""
+    Notification.objects.bulk_create(
+        [Notification(user_id=user_id, title=title, message=message) for user_id in user_ids]
+    )
+    return len(user_ids)
+
+
+def deliver(users, title, message, chunk_size=CHUNK_SIZE):
+    """Notify every user of a queryset now; return the number notified"""
+    delivered = 0
+    for chunk in iter_user_chunks(users, chunk_size=chunk_size):
+        delivered += notify_users(chunk, title, message)
+    return delivered
+
+
+def fan_out(audience, title, message, value=None):
+    """
+    Notify an audience. Small audiences are written immediately and the
+    number of notifications is returned; large ones are queued as a
+    FanoutJob, which is returned.
+    """
+    users = audience_users(audience, value)
+    threshold = getattr(settings, 'FANOUT_ASYNC_THRESHOLD', DEFAULT_ASYNC_THRESHOLD)
+    if users.order_by().values('pk')[:threshold].count() >= threshold:
+        return FanoutJob.objects.create(
+            audience=audience,
+            audience_value='' if value is None else str(value),
+            title=title,
+            message=message,
+        )
+    return deliver(users, title, message)
+
+
+def _claim_job():
+    """Mark the oldest pending (or stalled) job as running and return it"""
+    stale = timezone.now() - STALE_AFTER
+    with transaction.atomic():
+        jobs = FanoutJob.objects.filter(
+            Q(status='pending') | Q(status='running', updated_at__lt=stale)
+        ).order_by('created_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            jobs = jobs.select_for_update(skip_locked=True)
+        else:
+            jobs = jobs.select_for_update()
+        job = jobs.first()
+        if job is not None:
+            job.status = 'running'
+            job.save(update_fields=['status', 'updated_at'])
+        return job
+
+
+def run_job(job, chunk_size=CHUNK_SIZE):
+    """
+    Deliver a FanoutJob from its checkpoint. Each chunk of notifications
+    and the checkpoint that records it commit together.
+    """
+    users = audience_users(job.audience, job.audience_value or None)
+    try:
+        for chunk in iter_user_chunks(users, after_id=job.last_user_id, chunk_size=chunk_size):
+            with transaction.atomic():
+                job.delivered += notify_users(chunk, job.title, job.message)
+                job.last_user_id = chunk[-1]
+                job.save(update_fields=['delivered', 'last_user_id', 'updated_at'])
+    except Exception as exc:
+        logger.exception("Fan-out job %s failed after %s notifications", job.pk, job.delivered)
+        job.status = 'failed'
+        job.last_error = f"{type(exc).__name__}: {exc}"
+        job.save(update_fields=['status', 'last_error', 'updated_at'])
+        return False
+
+    job.status = 'done'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'finished_at', 'updated_at'])
+    return True
+
+
+def process_pending(chunk_size=CHUNK_SIZE):
+    """Run queued jobs until none is left; return the number processed"""
+    processed = 0
+    while True:
+        job = _claim_job()
+        if job is None:
+            return processed
+        run_job(job, chunk_size=chunk_size)
+        processed += 1
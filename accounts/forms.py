@@ -74,3 +74,16 @@ class ResumeUploadForm(forms.ModelForm):
             if resume.size > 5 * 1024 * 1024:
                 raise forms.ValidationError("File size must be under 5MB")
         return resume
+
+
+class UserImportForm(forms.Form):
+    """CSV of students or companies to import"""
+    user_type = forms.ChoiceField(choices=[('student', 'Students'), ('company', 'Companies')])
+    file = forms.FileField(widget=forms.FileInput(attrs={'accept': '.csv'}))
+    dry_run = forms.BooleanField(required=False, label="Only validate the file")
+
+    def clean_file(self):
+        file = self.cleaned_data.get('file')
+        if file and not file.name.lower().endswith('.csv'):
+            raise forms.ValidationError("Upload a CSV file")
+        return file
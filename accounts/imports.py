@@ -0,0 +1,281 @@
+"""
+Bulk import of student and company accounts from CSV.
+
+import_users() validates the whole file before writing anything: each
+row is checked against the model fields, and usernames, emails and roll
+numbers against the rest of the file and the database. Passwords are
+then hashed in a process pool, since hashing is slow by design and CPU
+bound, and users, profiles and welcome notifications are written with
+bulk_create in chunks of CHUNK_SIZE rows, one transaction per chunk.
+
+bulk_create does not send post_save, so the per-user profile and
+notification path (accounts/signals.py) and the per-profile counters are
+skipped; users_imported is sent once per chunk instead, with the chunk's
+profiles, for the dashboard to update its counters and statistics in
+aggregate.
+
+A row without a password gets an unusable one; the user sets it through
+password reset.
+
+The bulk_import view imports small files within the request
+(in_request=True): at most REQUEST_MAX_ROWS rows, of which fewer than
+REQUEST_MAX_PASSWORDS have a password, hashed in the request's process.
+Larger files are imported with the import_users command, which keeps
+the process pool out of the web server.
+"""
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.dispatch import Signal
+
+from .models import CompanyProfile, Notification, StudentProfile, User
+
+# Sent once per written chunk with user_type and profiles=[...]
+users_imported = Signal()
+
+CHUNK_SIZE = 500
+
+# Fewer passwords than this are hashed in the calling process
+POOL_THRESHOLD = 50
+
+# Largest file imported within a web request: one chunk, and passwords
+# few enough to hash without the pool
+REQUEST_MAX_ROWS = CHUNK_SIZE
+REQUEST_MAX_PASSWORDS = POOL_THRESHOLD
+
+# Validation errors reported before giving up on a file
+MAX_ERRORS = 100
+
+USER_COLUMNS = ('username', 'email', 'password', 'first_name', 'last_name', 'phone_number')
+
+# Profile model, its columns and the columns a row must fill in, per user type
+KINDS = {
+    'student': (
+        StudentProfile,
+        ('roll_number', 'department', 'year_of_graduation', 'cgpa', 'skills', 'bio',
+         'linkedin_profile', 'github_profile'),
+        ('username', 'email', 'roll_number', 'department', 'year_of_graduation'),
+    ),
+    'company': (
+        CompanyProfile,
+        ('company_name', 'industry', 'description', 'website', 'address', 'established_year'),
+        ('username', 'email', 'company_name', 'industry', 'website'),
+    ),
+}
+
+# The welcome notification of accounts/signals.py
+WELCOME_TITLE = "Welcome to Campus Placement System"
+WELCOME_MESSAGES = {
+    'student': "Welcome to the Campus Placement System! Complete your profile and upload your resume to start applying for jobs.",
+    'company': "Welcome to the Campus Placement System! Complete your company profile to start posting job opportunities.",
+}
+
+# Values of required model fields a company row may leave out, as in
+# accounts/signals.py
+COMPANY_DEFAULTS = {
+    'description': "Company description not provided yet.",
+    'address': "Address not provided yet.",
+}
+
+
+class ImportValidationError(ValueError):
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"{len(errors)} error(s) in the import file")
+
+
+@dataclass
+class ImportResult:
+    rows: int  # imported, or only validated on a dry run
+    seconds: float
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else float(self.rows)
+
+
+def hash_workers():
+    return getattr(settings, 'IMPORT_HASH_WORKERS', None) or os.cpu_count() or 1
+
+
+def read_rows(file, user_type):
+    """
+    Return the rows of a CSV file object as (line number, {column: value})
+    pairs. Raises ImportValidationError for missing or unknown columns.
+    """
+    _, profile_columns, required = KINDS[user_type]
+    reader = csv.DictReader(file)
+    columns = [column.strip() for column in reader.fieldnames or ()]
+    unknown = set(columns) - set(USER_COLUMNS) - set(profile_columns)
+    missing = [column for column in required if column not in columns]
+    errors = [(1, f"Unknown column {column!r}.") for column in sorted(unknown)]
+    errors += [(1, f"Missing column {column!r}.") for column in missing]
+    if errors:
+        raise ImportValidationError(errors)
+    reader.fieldnames = columns
+    return [
+        (reader.line_num, {key: (value or '').strip() for key, value in row.items() if key is not None})
+        for row in reader
+    ]
+
+
+def _build(user_type, row):
+    """Return the unsaved (user, profile) of a row; raises ValidationError"""
+    profile_model, profile_columns, required = KINDS[user_type]
+    missing = [column for column in required if not row.get(column)]
+    if missing:
+        raise ValidationError(f"Missing {', '.join(missing)}.")
+
+    user = User(user_type=user_type)
+    for column in USER_COLUMNS:
+        if column != 'password' and row.get(column):
+            setattr(user, column, row[column])
+    profile = profile_model(**(COMPANY_DEFAULTS if user_type == 'company' else {}))
+    for column in profile_columns:
+        if row.get(column):
+            setattr(profile, column, row[column])
+
+    messages = []
+    for instance, exclude in ((user, ['password']), (profile, ['user'])):
+        try:
+            instance.clean_fields(exclude=exclude)
+        except ValidationError as exc:
+            messages += [f"{field}: {' '.join(errors)}" for field, errors in exc.message_dict.items()]
+    if messages:
+        raise ValidationError('; '.join(messages))
+    return user, profile
+
+
+def _taken(model, field, values):
+    """Return which of the values are already used by rows of the model"""
+    taken = set()
+    values = list(values)
+    for start in range(0, len(values), 1000):
+        lookup = {f'{field}__in': values[start:start + 1000]}
+        taken.update(value.lower() for value in model.objects.filter(**lookup).values_list(field, flat=True))
+    return taken
+
+
+def validate(user_type, rows):
+    """
+    Return the unsaved (user, profile) pairs of the rows, in order.
+    Raises ImportValidationError listing up to MAX_ERRORS problems.
+    """
+    errors = []
+    built = []
+    seen = {'username': {}, 'email': {}, 'roll_number': {}}
+    for line, row in rows:
+        try:
+            user, profile = _build(user_type, row)
+        except ValidationError as exc:
+            errors.append((line, ' '.join(exc.messages)))
+        else:
+            built.append((line, user, profile))
+        for field, lines in seen.items():
+            if row.get(field):
+                value = row[field].lower()
+                if value in lines:
+                    errors.append((line, f"Duplicate {field} {row[field]!r}, also on line {lines[value]}."))
+                else:
+                    lines[value] = line
+        if len(errors) >= MAX_ERRORS:
+            raise ImportValidationError(errors)
+
+    checks = [(User, 'username'), (User, 'email')]
+    if user_type == 'student':
+        checks.append((StudentProfile, 'roll_number'))
+    for model, field in checks:
+        taken = _taken(model, field, (row[field] for _, row in rows if row.get(field)))
+        for line, row in rows:
+            if row.get(field, '').lower() in taken:
+                errors.append((line, f"{field} {row[field]!r} is already registered."))
+    if errors:
+        raise ImportValidationError(sorted(errors)[:MAX_ERRORS])
+    return [(user, profile) for _, user, profile in built]
+
+
+def _setup_worker():
+    # Spawned workers start without settings; forked ones already have them
+    import django
+    django.setup()
+
+
+def _hash(password):
+    return make_password(password or None)
+
+
+def hash_passwords(passwords, workers=None):
+    """Hash the passwords (None or '' gives an unusable one), in a process pool"""
+    workers = workers or hash_workers()
+    if workers <= 1 or len(passwords) < POOL_THRESHOLD:
+        return [_hash(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_setup_worker) as pool:
+        return list(pool.map(_hash, passwords, chunksize=chunksize))
+
+
+def _write_chunk(user_type, pairs):
+    users = [user for user, _ in pairs]
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+        if any(user.pk is None for user in users):
+            # Backends without INSERT ... RETURNING (MySQL) leave the ids unset
+            ids = dict(User.objects.filter(
+                username__in=[user.username for user in users]
+            ).values_list('username', 'pk'))
+            for user in users:
+                user.pk = ids[user.username]
+        profiles = []
+        for user, profile in pairs:
+            profile.user = user
+            profiles.append(profile)
+        KINDS[user_type][0].objects.bulk_create(profiles)
+        Notification.objects.bulk_create(
+            Notification(user=user, title=WELCOME_TITLE, message=WELCOME_MESSAGES[user_type])
+            for user in users
+        )
+        users_imported.send(sender=User, user_type=user_type, profiles=profiles)
+
+
+def check_request_size(rows):
+    """Raise ImportValidationError if the rows are too many to import within a request"""
+    passwords = sum(1 for _, row in rows if row.get('password'))
+    if len(rows) > REQUEST_MAX_ROWS or passwords >= REQUEST_MAX_PASSWORDS:
+        raise ImportValidationError([(1, (
+            f"The file has {len(rows)} rows, {passwords} with a password. Files of more than "
+            f"{REQUEST_MAX_ROWS} rows, or with {REQUEST_MAX_PASSWORDS} passwords or more, are imported "
+            f"with the import_users command."
+        ))])
+
+
+def import_users(file, user_type, chunk_size=CHUNK_SIZE, workers=None, dry_run=False, in_request=False):
+    """
+    Import the students or companies (user_type 'student' or 'company')
+    of a CSV file object. Nothing is written unless every row is valid;
+    raises ImportValidationError otherwise. Returns an ImportResult.
+
+    in_request limits the file to what a web request imports: see
+    check_request_size(). Its passwords are hashed without the pool.
+    """
+    started = time.monotonic()
+    rows = read_rows(file, user_type)
+    if in_request:
+        check_request_size(rows)
+        workers = 1
+    pairs = validate(user_type, rows)
+    if dry_run:
+        return ImportResult(len(pairs), time.monotonic() - started)
+
+    passwords = hash_passwords([row.get('password') for _, row in rows], workers)
+    for (user, _), password in zip(pairs, passwords):
+        user.password = password
+    for start in range(0, len(pairs), chunk_size):
+        _write_chunk(user_type, pairs[start:start + chunk_size])
+    return ImportResult(len(pairs), time.monotonic() - started)
@@ -0,0 +1,55 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.models import StudentProfile
+from accounts.storage import RESUME_DIRECTORY, resume_storage
+
+
+def stored_files(storage, directory):
+    """Names of the files under a storage directory, recursively"""
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield f'{directory}/{name}'
+    for name in directories:
+        yield from stored_files(storage, f'{directory}/{name}')
+
+
+class Command(BaseCommand):
+    help = "Delete stored resume files that no student profile refers to"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace', type=int, default=3600,
+                            help="Seconds a file is kept after it was last stored, so that uploads "
+                                 "whose profile is not saved yet are not collected")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="List the files that would be deleted")
+
+    def handle(self, *args, **options):
+        storage = resume_storage
+        if not storage.exists(RESUME_DIRECTORY):
+            return
+        # Read the references before looking at the files: a file stored
+        # again after this is recent, and kept by the grace period
+        referenced = set(StudentProfile.objects.exclude(resume='').exclude(resume__isnull=True)
+                         .values_list('resume', flat=True))
+        cutoff = time.time() - options['grace']
+        deleted = freed = 0
+        for name in stored_files(storage, RESUME_DIRECTORY):
+            if name in referenced:
+                continue
+            try:
+                stat = os.stat(storage.path(name))
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime > cutoff:
+                continue
+            if options['dry_run']:
+                self.stdout.write(name)
+            else:
+                storage.delete(name)
+            deleted += 1
+            freed += stat.st_size
+        verb = "Would delete" if options['dry_run'] else "Deleted"
+        self.stdout.write(f"{verb} {deleted} unreferenced resume file(s), {freed} bytes")
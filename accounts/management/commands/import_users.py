@@ -0,0 +1,50 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts import imports
+
+
+class Command(BaseCommand):
+    help = "Import students or companies from a CSV file, validating the whole file first"
+
+    def add_arguments(self, parser):
+        parser.add_argument('user_type', choices=list(imports.KINDS))
+        parser.add_argument('path', help="CSV file to import, or '-' for standard input")
+        parser.add_argument('--chunk-size', type=int, default=imports.CHUNK_SIZE,
+                            help="Users written per transaction")
+        parser.add_argument('--workers', type=int,
+                            help="Processes hashing passwords; defaults to IMPORT_HASH_WORKERS")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Validate the file without importing it")
+
+    def handle(self, *args, **options):
+        try:
+            if options['path'] == '-':
+                result = self._import(sys.stdin, options)
+            else:
+                with open(options['path'], encoding='utf-8-sig', newline='') as file:
+                    result = self._import(file, options)
+        except OSError as exc:
+            raise CommandError(str(exc))
+        except imports.ImportValidationError as exc:
+            for line, message in exc.errors:
+                self.stderr.write(f"Line {line}: {message}")
+            raise CommandError(f"Nothing was imported: {exc}.")
+
+        if options['dry_run']:
+            self.stdout.write(f"{result.rows} row(s) valid, checked in {result.seconds:.1f}s.")
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Imported {result.rows} user(s) in {result.seconds:.1f}s "
+                f"({result.rows_per_second:.0f} rows/s)."
+            ))
+
+    def _import(self, file, options):
+        return imports.import_users(
+            file,
+            options['user_type'],
+            chunk_size=options['chunk_size'],
+            workers=options['workers'],
+            dry_run=options['dry_run'],
+        )
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.fanout import CHUNK_SIZE, process_pending
+
+
+class Command(BaseCommand):
+    help = "Deliver queued notification fan-out jobs in chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help="Notifications written per INSERT")
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help="Seconds to sleep when no job is queued")
+        parser.add_argument('--once', action='store_true',
+                            help="Process the queued jobs, then exit")
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                processed = process_pending(chunk_size=options['chunk_size'])
+                if processed:
+                    self.stdout.write(f"Processed {processed} fan-out job(s)")
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.outbox import OutboxWorker, queue_depth
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbox emails, reusing one SMTP connection across batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50,
+                            help="Messages claimed and sent per batch")
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help="Seconds to sleep when the outbox is empty")
+        parser.add_argument('--once', action='store_true',
+                            help="Drain the messages that are due now, then exit")
+        parser.add_argument('--stats', action='store_true',
+                            help="Print the outbox queue depth and exit")
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            for key, value in queue_depth().items():
+                self.stdout.write(f"{key}: {value}")
+            return
+
+        worker = OutboxWorker(batch_size=options['batch_size'])
+        try:
+            while True:
+                sent, failed = worker.drain()
+                if sent or failed:
+                    self.stdout.write(f"Sent {sent}, failed {failed}; queue: {queue_depth()}")
+                if options['once']:
+                    break
+                # Nothing due: let the SMTP connection go rather than hold it idle
+                worker.close()
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            worker.close()
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.models import StudentProfile
+from accounts.resumes import BATCH_PER_WORKER, extract_workers, extraction_pool, process_pending, queue_extraction
+
+
+class Command(BaseCommand):
+    help = "Extract the text and skills of uploaded resumes in a pool of worker processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int,
+                            help="Extraction processes; defaults to RESUME_EXTRACT_WORKERS")
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help="Seconds to sleep when no resume is queued")
+        parser.add_argument('--once', action='store_true',
+                            help="Extract the queued resumes, then exit")
+        parser.add_argument('--backfill', action='store_true',
+                            help="First queue every resume not extracted yet")
+
+    def handle(self, *args, **options):
+        if options['backfill']:
+            profiles = StudentProfile.objects.exclude(resume='').exclude(resume__isnull=True).filter(
+                resume_text__isnull=True
+            )
+            queued = sum(1 for profile in profiles.iterator() if queue_extraction(profile))
+            self.stdout.write(f"Queued {queued} resume(s)")
+
+        workers = options['workers'] or extract_workers()
+        with extraction_pool(workers) as pool:
+            try:
+                while True:
+                    processed = process_pending(pool, workers * BATCH_PER_WORKER)
+                    if processed:
+                        self.stdout.write(f"Processed {processed} resume(s)")
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                pass
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from accounts.models import User, Notification
+
+
+class Command(BaseCommand):
+    help = "Recompute every user's unread notification counter from the Notification table"
+
+    def handle(self, *args, **options):
+        unread = (
+            Notification.objects.filter(user=OuterRef('pk'), read=False)
+            .order_by().values('user').annotate(n=Count('id')).values('n')
+        )
+        updated = User.objects.update(
+            unread_notifications=Coalesce(Subquery(unread, output_field=IntegerField()), Value(0))
+        )
+        self.stdout.write(f"Recounted unread notifications for {updated} users")
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.models import ReplicaHeartbeat
+from accounts.replicas import replica_aliases, replica_lag
+
+
+class Command(BaseCommand):
+    help = "Update the heartbeat on the primary that replica lag is measured from"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help="Seconds between heartbeats")
+        parser.add_argument('--once', action='store_true',
+                            help="Write one heartbeat, then exit")
+        parser.add_argument('--lag', action='store_true',
+                            help="Print the lag of each replica and exit")
+
+    def handle(self, *args, **options):
+        if options['lag']:
+            for alias in replica_aliases():
+                lag = replica_lag(alias)
+                self.stdout.write(f"{alias}: {'unavailable' if lag is None else f'{lag:.1f} seconds behind'}")
+            return
+
+        try:
+            while True:
+                ReplicaHeartbeat.objects.update_or_create(pk=1, defaults={'beat': timezone.now()})
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,148 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connections
+from django.http import Http404
+from django.utils.functional import SimpleLazyObject
+
+from .replicas import checking_replicas, pin_to_primary, pinned, pinned_until, replica_aliases
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    """Database execute wrapper counting the queries it sees"""
+
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if checking_replicas():
+            # Made at most every REPLICA_CHECK_INTERVAL, whatever the view
+            return execute(sql, params, many, context)
+        self.count += 1
+        self.statements.append(sql)
+        return execute(sql, params, many, context)
+
+
+class QueryBudgetMiddleware:
+    """
+    Count the SQL queries of every request and compare them with the budget
+    declared on the view through @query_budget.
+
+    Over-budget requests are logged as warnings, or raise
+    QueryBudgetExceeded when QUERY_BUDGET_STRICT is enabled (use this in
+    tests). With DEBUG on, the count is also sent in an X-Query-Count header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        request.query_budget = None
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(counter))
+            response = self.get_response(request)
+
+        if settings.DEBUG:
+            response['X-Query-Count'] = str(counter.count)
+
+        budget = request.query_budget
+        if budget is not None and counter.count > budget:
+            message = (
+                f"{request.method} {request.path} issued {counter.count} queries, "
+                f"over its budget of {budget}"
+            )
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(message + ":\n" + "\n".join(counter.statements))
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = getattr(view_func, 'query_budget', None)
+        return None
+
+
+# Profile relation of each user type
+PROFILE_ACCESSORS = {
+    'student': 'student_profile',
+    'company': 'company_profile',
+}
+
+PROFILE_BACKEND = 'accounts.backends.ProfileBackend'
+
+# Sessions logged in before ProfileBackend name this backend
+_MODEL_BACKEND = 'django.contrib.auth.backends.ModelBackend'
+
+
+def get_profile(user):
+    """The StudentProfile or CompanyProfile of a user, or None"""
+    accessor = PROFILE_ACCESSORS.get(getattr(user, 'user_type', None))
+    if accessor is None or not user.is_authenticated:
+        return None
+    try:
+        return getattr(user, accessor)
+    except ObjectDoesNotExist:
+        return None
+
+
+def require_profile(request):
+    """request.profile, or Http404 when the user has none"""
+    if not request.profile:
+        raise Http404("No profile found for this user.")
+    return request.profile
+
+
+class ProfileMiddleware:
+    """
+    Attach the user's StudentProfile or CompanyProfile to the request as
+    request.profile, loaded on first use and shared by the view, its
+    helpers and templates. It is falsy for officers, anonymous users and
+    users without a profile.
+
+    ProfileBackend loads the profile in the same query as the user;
+    sessions logged in through ModelBackend are moved over to it, so they
+    get the joined query too without logging in again.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        session = getattr(request, 'session', None)
+        if session is not None and session.get(BACKEND_SESSION_KEY) == _MODEL_BACKEND:
+            session[BACKEND_SESSION_KEY] = PROFILE_BACKEND
+        request.profile = SimpleLazyObject(lambda: get_profile(request.user))
+        return self.get_response(request)
+
+
+class ReplicaMiddleware:
+    """
+    Keep the reads of a user who wrote in the last REPLICA_STICKY_SECONDS
+    on the primary, so that replica lag does not hide their own changes
+    (see accounts/replicas.py). Any unsafe request counts as a write.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_aliases():
+            return self.get_response(request)
+
+        with pinned(pinned_until(request) > time.time()):
+            response = self.get_response(request)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE') and request.user.is_authenticated:
+            pin_to_primary(response)
+        return response
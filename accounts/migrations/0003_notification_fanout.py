@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_email_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FanoutJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('audience', models.CharField(choices=[('all', 'All Users'), ('students', 'Students'), ('companies', 'Companies'), ('officers', 'Placement Officers'), ('department', 'Students of a Department'), ('job_applicants', 'Applicants of a Job')], max_length=20)),
+                ('audience_value', models.CharField(blank=True, max_length=100)),
+                ('title', models.CharField(max_length=255)),
+                ('message', models.TextField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('delivered', models.PositiveIntegerField(default=0)),
+                ('last_user_id', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='fanout_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_notification_fanout'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='announcements_seen_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
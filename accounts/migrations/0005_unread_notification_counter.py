@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:43
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_unread_notifications(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    Notification = apps.get_model('accounts', 'Notification')
+    unread = (
+        Notification.objects.filter(user=OuterRef('pk'), read=False)
+        .order_by().values('user').annotate(n=Count('id')).values('n')
+    )
+    User.objects.update(
+        unread_notifications=Coalesce(Subquery(unread, output_field=IntegerField()), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_announcement_watermark'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='unread_notifications',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_unread_notifications, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_unread_notification_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeText',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(max_length=255)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('extracted_hash', models.CharField(blank=True, max_length=64)),
+                ('text', models.TextField(blank=True)),
+                ('skills', models.TextField(blank=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('extracted_at', models.DateTimeField(blank=True, null=True)),
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='resume_text', to='accounts.studentprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='resume_text_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:36
+
+import accounts.models
+import accounts.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_resume_text'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='studentprofile',
+            name='resume',
+            field=models.FileField(blank=True, null=True, storage=accounts.storage.ContentAddressedStorage(), upload_to=accounts.models.resume_upload_path),
+        ),
+    ]
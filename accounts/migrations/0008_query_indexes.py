@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_resume_storage'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'created_at'], name='notification_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReplicaHeartbeat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('beat', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_replica_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='calendar_key',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+    ]
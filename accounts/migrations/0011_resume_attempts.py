@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 00:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_calendar_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resumetext',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
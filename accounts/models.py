@@ -2,8 +2,12 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
-import os
-import uuid
+from django.utils import timezone
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from collections import Counter, defaultdict
+from .storage import RESUME_DIRECTORY, resume_storage
 
 class User(AbstractUser):
     """
@@ -16,6 +20,13 @@ class User(AbstractUser):
     )
     user_type = models.CharField(max_length=20, choices=USER_TYPE_CHOICES)
     phone_number = models.CharField(max_length=15, blank=True, null=True)
+    # Announcements created up to this time have been seen (see dashboard/feed.py)
+    announcements_seen_at = models.DateTimeField(blank=True, null=True)
+    # Number of unread Notification rows, maintained by Notification
+    unread_notifications = models.PositiveIntegerField(default=0)
+    # Part of the signed calendar feed URL; a new key revokes the old URL
+    # (see dashboard/ical.py)
+    calendar_key = models.CharField(max_length=32, blank=True, default='')
     
     class Meta:
         verbose_name = _('user')
@@ -38,10 +49,8 @@ class User(AbstractUser):
 
 
 def resume_upload_path(instance, filename):
-    """Generate a unique file path for uploaded resumes"""
-    ext = filename.split('.')[-1]
-    filename = f"{uuid.uuid4()}.{ext}"
-    return os.path.join('resumes', str(instance.user.id), filename)
+    """Directory of uploaded resumes; resume_storage names the files by content"""
+    return f'{RESUME_DIRECTORY}/{filename}'
 
 
 class StudentProfile(models.Model):
@@ -53,7 +62,7 @@ class StudentProfile(models.Model):
     department = models.CharField(max_length=100)
     year_of_graduation = models.IntegerField()
     cgpa = models.DecimalField(max_digits=4, decimal_places=2, null=True, blank=True)
-    resume = models.FileField(upload_to=resume_upload_path, null=True, blank=True)
+    resume = models.FileField(upload_to=resume_upload_path, storage=resume_storage, null=True, blank=True)
     skills = models.TextField(blank=True)
     bio = models.TextField(blank=True)
     linkedin_profile = models.URLField(blank=True)
@@ -61,6 +70,15 @@ class StudentProfile(models.Model):
     
     def __str__(self):
         return f"{self.user.username}'s Profile"
+    
+    # (department, year_of_graduation) as loaded from the database
+    _loaded_group = None
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_group = (instance.__dict__.get('department'), instance.__dict__.get('year_of_graduation'))
+        return instance
 
 
 class CompanyProfile(models.Model):
@@ -75,13 +93,55 @@ class CompanyProfile(models.Model):
     address = models.TextField()
     established_year = models.IntegerField(blank=True, null=True)
     
+    # Name as loaded from the database; None for unsaved profiles
+    _loaded_name = None
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_name = instance.__dict__.get('company_name')
+        return instance
+    
     def __str__(self):
         return self.company_name
 
 
+def adjust_unread_counts(deltas):
+    """
+    Apply {user_id: delta} changes to User.unread_notifications, with one
+    UPDATE per distinct delta
+    """
+    users_by_delta = defaultdict(list)
+    for user_id, delta in deltas.items():
+        if delta:
+            users_by_delta[delta].append(user_id)
+    for delta, user_ids in users_by_delta.items():
+        User.objects.filter(pk__in=user_ids).update(
+            unread_notifications=Greatest(F('unread_notifications') + delta, 0)
+        )
+
+
+class NotificationQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            adjust_unread_counts(Counter(obj.user_id for obj in objs if not obj.read))
+        return objs
+    
+    def mark_read(self, user, ids):
+        """Mark the given notifications of a user as read; return how many changed"""
+        with transaction.atomic(savepoint=False):
+            changed = self.filter(user=user, pk__in=ids, read=False).update(read=True)
+            adjust_unread_counts({user.pk: -changed})
+        user.unread_notifications = max(user.unread_notifications - changed, 0)
+        return changed
+
+
 class Notification(models.Model):
     """
-    System notifications for users
+    System notifications for users.
+    Creating an unread notification (including through bulk_create) and
+    NotificationQuerySet.mark_read() keep User.unread_notifications in step.
     """
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
     title = models.CharField(max_length=255)
@@ -89,8 +149,148 @@ class Notification(models.Model):
     read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = NotificationQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # A user's notifications, newest first; unread counts are kept
+            # on User, so no query filters on read alone
+            models.Index(fields=['user', 'created_at'], name='notification_user_created_idx'),
+        ]
     
     def __str__(self):
         return self.title
+    
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            if adding and not self.read:
+                adjust_unread_counts({self.user_id: 1})
+
+
+class OutboxEmail(models.Model):
+    """
+    Outgoing email queued in the sender's transaction and delivered by the
+    process_outbox worker (see accounts/outbox.py)
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+    
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    from_email = models.CharField(max_length=254)
+    recipient = models.CharField(max_length=254)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['next_attempt_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} -> {self.recipient} ({self.status})"
+
+
+class FanoutJob(models.Model):
+    """
+    Notification for a large audience, written by the process_fanout
+    worker in chunks (see accounts/fanout.py)
+    """
+    AUDIENCE_CHOICES = (
+        ('all', 'All Users'),
+        ('students', 'Students'),
+        ('companies', 'Companies'),
+        ('officers', 'Placement Officers'),
+        ('department', 'Students of a Department'),
+        ('job_applicants', 'Applicants of a Job'),
+    )
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    
+    audience = models.CharField(max_length=20, choices=AUDIENCE_CHOICES)
+    audience_value = models.CharField(max_length=100, blank=True)  # department name or job id
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    delivered = models.PositiveIntegerField(default=0)
+    last_user_id = models.PositiveIntegerField(default=0)  # resume point, users are delivered in id order
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='fanout_status_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.title} -> {self.get_audience_display()} ({self.status})"
+
+
+class ResumeText(models.Model):
+    """
+    Text and skills extracted from a student's resume by the
+    process_resumes worker (see accounts/resumes.py). Extraction is queued
+    again only when the content of the resume changes.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    
+    student = models.OneToOneField(StudentProfile, on_delete=models.CASCADE, related_name='resume_text')
+    file_name = models.CharField(max_length=255)
+    content_hash = models.CharField(max_length=64)  # SHA-256 of the file queued for extraction
+    extracted_hash = models.CharField(max_length=64, blank=True)  # of the file text and skills came from
+    text = models.TextField(blank=True)
+    skills = models.TextField(blank=True)  # comma separated, as in StudentProfile.skills
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    # Times the current content was claimed for extraction
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    extracted_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='resume_text_status_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Resume text of {self.student} ({self.status})"
+    
+    @property
+    def skill_list(self):
+        return [skill for skill in self.skills.split(', ') if skill]
+
+
+class ReplicaHeartbeat(models.Model):
+    """
+    A single row whose time the replica_heartbeat worker updates on the
+    primary every second. How old the copy on a replica is tells its lag
+    (see accounts/replicas.py).
+    """
+    beat = models.DateTimeField()
+    
+    def __str__(self):
+        return f"Heartbeat at {self.beat}"
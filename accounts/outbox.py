@@ -0,0 +1,178 @@
+"""
+Delivery of queued OutboxEmail rows.
+
+The process_outbox management command calls deliver_batch() in a loop.
+Each batch is claimed with SELECT ... FOR UPDATE SKIP LOCKED (where the
+database supports it), so several workers can drain the outbox in
+parallel, and all messages are sent over one reused SMTP connection.
+
+A message the server rejects is retried with exponential backoff, and
+marked failed once it has been queued for OUTBOX_GIVE_UP_AFTER seconds
+(a day by default). Transport errors are not charged to the messages: if
+the connection cannot be opened the batch is left untouched, and if it
+drops while sending, the batch stops there and the rest is claimed again
+over a new connection. A mail server outage therefore only delays the
+queue.
+"""
+import logging
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GIVE_UP_AFTER = 24 * 60 * 60
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 60 * 60
+
+
+def retry_delay(attempts):
+    """Backoff before the next attempt: 30s, 60s, 120s, ... capped at one hour"""
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def give_up_after():
+    return timedelta(seconds=getattr(settings, 'OUTBOX_GIVE_UP_AFTER', DEFAULT_GIVE_UP_AFTER))
+
+
+def is_transport_error(exc):
+    """Whether a sending error is the connection's rather than the message's"""
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return True
+    # SMTP replies are OSErrors too
+    return isinstance(exc, OSError) and not isinstance(exc, smtplib.SMTPException)
+
+
+def queue_depth():
+    """
+    Return outbox counters: pending and failed messages, how many pending
+    ones are due now, and the age in seconds of the oldest pending one.
+    """
+    now = timezone.now()
+    counts = dict(
+        OutboxEmail.objects.filter(status__in=('pending', 'failed'))
+        .values_list('status').annotate(n=Count('id')).order_by()
+    )
+    pending = OutboxEmail.objects.filter(status='pending')
+    oldest = pending.aggregate(oldest=Min('created_at'))['oldest']
+    return {
+        'pending': counts.get('pending', 0),
+        'due': pending.filter(next_attempt_at__lte=now).count(),
+        'failed': counts.get('failed', 0),
+        'oldest_pending_seconds': int((now - oldest).total_seconds()) if oldest else 0,
+    }
+
+
+def _claim(queryset):
+    if connection.features.has_select_for_update_skip_locked:
+        return queryset.select_for_update(skip_locked=True)
+    return queryset.select_for_update()
+
+
+class OutboxWorker:
+    """
+    Sends due outbox messages in batches over one SMTP connection.
+    The connection stays open between batches and is reopened after a
+    transport error; call close() when the worker stops.
+    """
+
+    def __init__(self, batch_size=50):
+        self.batch_size = batch_size
+        self.connection = None
+
+    def _open(self):
+        if self.connection is None:
+            self.connection = get_connection(fail_silently=False)
+            self.connection.open()
+        return self.connection
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                logger.exception("Error closing the mail connection")
+            self.connection = None
+
+    def deliver_batch(self):
+        """Send one batch of due messages; return (sent, failed) counts"""
+        sent = failed = 0
+        with transaction.atomic():
+            batch = list(_claim(
+                OutboxEmail.objects.filter(status='pending', next_attempt_at__lte=timezone.now())
+                .order_by('next_attempt_at', 'id')
+            )[:self.batch_size])
+            if not batch:
+                return sent, failed
+            try:
+                mail_connection = self._open()
+            except Exception as exc:
+                self.close()
+                logger.warning("Cannot connect to the mail server, %s outbox emails stay queued: %s",
+                               len(batch), exc)
+                return sent, failed
+
+            handled = []
+            for email in batch:
+                handled.append(email)
+                try:
+                    mail_connection.send_messages([EmailMessage(
+                        subject=email.subject,
+                        body=email.message,
+                        from_email=email.from_email,
+                        to=[email.recipient],
+                        connection=mail_connection,
+                    )])
+                except Exception as exc:
+                    if is_transport_error(exc):
+                        # Retry this message later and leave the rest for a new connection
+                        self.close()
+                        self._record_failure(email, exc, charge=False)
+                        break
+                    self._record_failure(email, exc)
+                    failed += 1
+                else:
+                    email.status = 'sent'
+                    email.sent_at = timezone.now()
+                    email.attempts += 1
+                    email.last_error = ''
+                    sent += 1
+
+            OutboxEmail.objects.bulk_update(
+                handled, ['status', 'sent_at', 'attempts', 'next_attempt_at', 'last_error']
+            )
+        return sent, failed
+
+    def _record_failure(self, email, exc, charge=True):
+        """
+        Schedule a retry, or give up on a message queued for longer than
+        OUTBOX_GIVE_UP_AFTER; errors not charged to it are always retried
+        """
+        if charge:
+            email.attempts += 1
+        email.last_error = f"{type(exc).__name__}: {exc}"
+        now = timezone.now()
+        if charge and now - email.created_at >= give_up_after():
+            email.status = 'failed'
+            logger.error("Giving up on outbox email %s to %s: %s", email.pk, email.recipient, exc)
+        else:
+            email.next_attempt_at = now + retry_delay(max(email.attempts, 1))
+            logger.warning("Outbox email %s to %s failed (attempt %s): %s",
+                           email.pk, email.recipient, email.attempts, exc)
+
+    def drain(self):
+        """Deliver batches until nothing is due; return (sent, failed) totals"""
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = self.deliver_batch()
+            total_sent += sent
+            total_failed += failed
+            if sent + failed < self.batch_size:
+                return total_sent, total_failed
@@ -0,0 +1,219 @@
+"""
+Keyset (cursor) pagination.
+
+Unlike django.core.paginator.Paginator, a page is located by the ordering
+values of the row it starts after, so every page costs one indexed range
+scan of ``per_page + 1`` rows: no COUNT(*) and no OFFSET, however deep the
+page. Cursors are signed, opaque tokens passed in the ``cursor`` query
+parameter.
+"""
+from collections.abc import Sequence
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from django.http import QueryDict
+
+CURSOR_PARAM = 'cursor'
+CURSOR_SALT = 'accounts.pagination.cursor'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class CursorPaginator:
+    """
+    Paginate a queryset on a fixed ordering.
+
+    ``ordering`` lists the ordering fields, e.g. ('-applied_at', '-id'); the
+    last field must be unique (the primary key) so that ties are broken
+    deterministically, and none of the fields may be NULL. Annotated
+    fields such as a search rank may be used as well.
+
+    When ``count_limit`` is set, pages expose an approximate total that is
+    counted up to that many rows only.
+    """
+
+    def __init__(self, queryset, per_page, ordering, count_limit=None):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.count_limit = count_limit
+        self._fields = [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+
+    def encode_cursor(self, obj, backwards=False):
+        values = [_encode_value(getattr(obj, self._attname(name))) for name, _ in self._fields]
+        return signing.dumps({'v': values, 'b': backwards}, salt=CURSOR_SALT, compress=True)
+
+    def decode_cursor(self, token):
+        try:
+            payload = signing.loads(token, salt=CURSOR_SALT)
+            values = payload['v']
+            backwards = bool(payload['b'])
+        except (signing.BadSignature, KeyError, TypeError, ValueError):
+            raise InvalidCursor(token)
+        if len(values) != len(self._fields):
+            raise InvalidCursor(token)
+        return [self._to_python(name, value) for (name, _), value in zip(self._fields, values)], backwards
+
+    def _attname(self, name):
+        if name == 'pk':
+            return 'pk'
+        try:
+            return self.queryset.model._meta.get_field(name).attname
+        except FieldDoesNotExist:
+            return name
+
+    def _to_python(self, name, value):
+        try:
+            field = self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return value
+        return field.to_python(value)
+
+    def _keyset_filter(self, values, backwards):
+        """
+        Build (f1 > v1) OR (f1 = v1 AND f2 > v2) OR ... honouring the
+        direction of every ordering field.
+        """
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self._fields, values):
+            lookup = 'lt' if descending != backwards else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def page(self, cursor=None):
+        """Return the page following (or, for a backwards cursor, preceding) a cursor"""
+        backwards = False
+        queryset = self.queryset
+        if cursor:
+            values, backwards = self.decode_cursor(cursor)
+            queryset = queryset.filter(self._keyset_filter(values, backwards))
+
+        if backwards:
+            ordering = [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+        else:
+            ordering = list(self.ordering)
+
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if backwards:
+            rows.reverse()
+            return CursorPage(rows, self, has_next=True, has_previous=has_more)
+        return CursorPage(rows, self, has_next=has_more, has_previous=bool(cursor))
+
+    def get_page(self, params):
+        """
+        Return the page for the cursor in a QueryDict (usually request.GET).
+        Unreadable cursors fall back to the first page.
+        """
+        try:
+            page = self.page(params.get(CURSOR_PARAM))
+        except InvalidCursor:
+            page = self.page()
+        page.params = params
+        return page
+
+    def approximate_count(self):
+        """Return (count, exact) with the count capped at count_limit"""
+        if self.count_limit is None:
+            return None, False
+        count = self.queryset.order_by().values('pk')[:self.count_limit + 1].count()
+        if count > self.count_limit:
+            return self.count_limit, False
+        return count, True
+
+
+class CursorPage(Sequence):
+    """
+    One page of a CursorPaginator.
+    Supports iteration, len() and truthiness like django's Page, plus
+    ready-made query strings for the first/previous/next links.
+    """
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.params = None
+        self._count = None
+
+    def __repr__(self):
+        return f"<CursorPage of {len(self.object_list)} items>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next and bool(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous and bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        return self.paginator.encode_cursor(self.object_list[0], backwards=True)
+
+    def _query(self, cursor):
+        params = self.params.copy() if self.params is not None else QueryDict(mutable=True)
+        params.pop(CURSOR_PARAM, None)
+        params.pop('page', None)
+        if cursor:
+            params[CURSOR_PARAM] = cursor
+        return params.urlencode()
+
+    @property
+    def first_query(self):
+        return self._query(None)
+
+    @property
+    def next_query(self):
+        return self._query(self.next_cursor)
+
+    @property
+    def previous_query(self):
+        return self._query(self.previous_cursor)
+
+    def _load_count(self):
+        if self._count is None:
+            self._count = self.paginator.approximate_count()
+        return self._count
+
+    @property
+    def approximate_count(self):
+        """Total rows, counted up to the paginator's count_limit (None when disabled)"""
+        return self._load_count()[0]
+
+    @property
+    def count_is_exact(self):
+        return self._load_count()[1]
@@ -0,0 +1,220 @@
+"""
+Read replicas for reporting.
+
+Reads go to the primary ('default') unless they run inside
+replica_reads(): the officer dashboard and statistics, the chart
+endpoints, exports, admin list pages and the reporting commands. Inside
+it, ReplicaRouter sends them to one of the DATABASE_REPLICAS aliases,
+chosen on the first read and kept for the rest of the scope so that
+every query sees the same data. Writes always go to the primary, and so
+do reads inside a transaction, or inside primary_reads() for code that
+writes what it computes.
+
+A replica is used only while it is up and at most REPLICA_MAX_LAG
+seconds behind. Its lag is read from the ReplicaHeartbeat row, which the
+replica_heartbeat worker updates on the primary every second. Each
+process checks a replica at most every REPLICA_CHECK_INTERVAL seconds;
+the check is left out of the request's query budget.
+Without the worker, replicas count as lagging and reads stay on the
+primary.
+
+After a user writes (any unsafe request), ReplicaMiddleware keeps their
+reads on the primary for REPLICA_STICKY_SECONDS, so they see their own
+changes. The time is kept in a signed cookie rather than the session,
+which would take another write on every unsafe request.
+
+Two SQLite files can stand in for a primary and a replica: run
+migrate --database <replica>, then copy the primary file over the
+replica's to "replicate". The replica then lags by the time since the
+copy.
+"""
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_LAG = 10
+DEFAULT_CHECK_INTERVAL = 5
+DEFAULT_STICKY_SECONDS = 15
+
+# Signed cookie of the time until which the user's reads stay on the primary
+STICKY_COOKIE = 'primary_until'
+STICKY_COOKIE_SALT = 'accounts.replicas.sticky'
+
+# The replica scope of the current code: None reads from the primary,
+# otherwise a dict holding the alias chosen on the first read
+_scope = ContextVar('replica_scope', default=None)
+
+# Whether the current request's user has written recently
+_pinned = ContextVar('replica_pinned', default=False)
+
+# Whether replica health is being checked, which query budgets leave out
+_checking = ContextVar('replica_checking', default=False)
+
+# Alias -> (checked at, usable), per process
+_health = {}
+
+
+def replica_aliases():
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+def replica_lag(alias):
+    """Seconds a replica is behind, from the heartbeat it holds; None when it cannot be read"""
+    from .models import ReplicaHeartbeat
+
+    token = _checking.set(True)
+    try:
+        beat = ReplicaHeartbeat.objects.using(alias).values_list('beat', flat=True).first()
+    except DatabaseError as exc:
+        logger.warning("Replica %s is unavailable: %s", alias, exc)
+        connections[alias].close()
+        return None
+    finally:
+        _checking.reset(token)
+    if beat is None:
+        return None
+    return max((timezone.now() - beat).total_seconds(), 0.0)
+
+
+def checking_replicas():
+    return _checking.get()
+
+
+def replica_usable(alias):
+    """Whether a replica is up and within REPLICA_MAX_LAG, checked at most every REPLICA_CHECK_INTERVAL"""
+    now = time.monotonic()
+    entry = _health.get(alias)
+    if entry is not None and now - entry[0] < getattr(settings, 'REPLICA_CHECK_INTERVAL', DEFAULT_CHECK_INTERVAL):
+        return entry[1]
+    lag = replica_lag(alias)
+    usable = lag is not None and lag <= getattr(settings, 'REPLICA_MAX_LAG', DEFAULT_MAX_LAG)
+    if lag is not None and not usable:
+        logger.warning("Replica %s is %.1f seconds behind; reading from the primary", alias, lag)
+    _health[alias] = (now, usable)
+    return usable
+
+
+def choose_replica():
+    """A usable replica alias, or the primary's when there is none"""
+    usable = [alias for alias in replica_aliases() if replica_usable(alias)]
+    return random.choice(usable) if usable else DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def replica_reads():
+    """
+    Read from a replica within the block (or the decorated function),
+    unless the current user has written recently
+    """
+    token = _scope.set(None if _pinned.get() or not replica_aliases() else {'alias': None})
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Read from the primary within the block, e.g. to compute data that is then written"""
+    token = _scope.set(None)
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+@contextmanager
+def _entered(scope):
+    token = _scope.set(scope)
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def _stream_in(scope, content):
+    with _entered(scope):
+        yield from content
+
+
+def use_replica(view_func):
+    """
+    View decorator reading from a replica on GET and HEAD requests,
+    including while a streaming response is sent
+    """
+    @wraps(view_func)
+    def wrapped(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view_func(request, *args, **kwargs)
+        with replica_reads():
+            scope = _scope.get()
+            response = view_func(request, *args, **kwargs)
+        if scope is not None and response.streaming:
+            response.streaming_content = _stream_in(scope, response.streaming_content)
+        return response
+    return wrapped
+
+
+class ReplicaChangelistMixin:
+    """ModelAdmin mixin reading list pages from a replica"""
+
+    def changelist_view(self, request, extra_context=None):
+        return use_replica(super().changelist_view)(request, extra_context)
+
+
+def pinned_until(request):
+    """Time until which the user's reads stay on the primary, 0 when they do not"""
+    value = request.get_signed_cookie(STICKY_COOKIE, default='0', salt=STICKY_COOKIE_SALT)
+    try:
+        return float(value)
+    except ValueError:
+        return 0
+
+
+def pin_to_primary(response):
+    """Keep the user's reads on the primary for REPLICA_STICKY_SECONDS"""
+    sticky = getattr(settings, 'REPLICA_STICKY_SECONDS', DEFAULT_STICKY_SECONDS)
+    response.set_signed_cookie(
+        STICKY_COOKIE, str(time.time() + sticky), salt=STICKY_COOKIE_SALT, max_age=sticky,
+        secure=settings.SESSION_COOKIE_SECURE, httponly=True, samesite='Lax',
+    )
+
+
+@contextmanager
+def pinned(value):
+    token = _pinned.set(value)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+class ReplicaRouter:
+    """Route reads inside replica_reads() to a replica, everything else to the primary"""
+
+    def db_for_read(self, model, **hints):
+        scope = _scope.get()
+        if scope is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if scope['alias'] is None:
+            scope['alias'] = choose_replica()
+        return scope['alias']
+
+    def db_for_write(self, model, **hints):
+        # Explicitly, as objects read from a replica would otherwise be saved there
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
@@ -0,0 +1,538 @@
+"""
+Text and skill extraction from resume files.
+
+extract() takes the bytes of a PDF, DOCX or DOC file and returns its
+normalized text and the skills found in it. It does not touch the
+database or settings, so it runs as is in the worker processes of
+accounts/resumes.py.
+
+Only the standard library is used:
+
+* DOCX - the paragraphs of word/document.xml.
+* PDF - the text operators of each page's content streams, decoded
+  through the fonts' ToUnicode maps where present and as Latin-1
+  otherwise. Compressed (FlateDecode) streams and object streams are
+  read; text drawn as images or in encrypted files is not found.
+* DOC - runs of readable UTF-16 or 8-bit text in the binary file, which
+  finds the body text of most Word 97-2003 files along with some noise.
+"""
+import io
+import re
+import unicodedata
+import zipfile
+import zlib
+from xml.etree import ElementTree
+
+# Characters of normalized text kept per resume
+MAX_TEXT_LENGTH = 100000
+
+# Bytes a compressed document part or PDF stream may inflate to
+MAX_INFLATED_SIZE = 32 * 1024 * 1024
+
+
+class ExtractionError(ValueError):
+    pass
+
+
+# Canonical skill name -> other spellings found in resumes
+SKILLS = {
+    'Python': (), 'Java': (), 'JavaScript': ('js',), 'TypeScript': (),
+    'C++': ('cpp',), 'C#': ('csharp',), 'Go': ('golang', 'go lang'), 'Rust': (), 'Kotlin': (),
+    'Swift': (), 'PHP': (), 'Ruby': (), 'Scala': (), 'MATLAB': (), 'R': ('r programming', 'rstudio'),
+    'SQL': (), 'MySQL': (), 'PostgreSQL': ('postgres',), 'MongoDB': (), 'Redis': (),
+    'SQLite': (), 'Oracle': (),
+    'HTML': ('html5',), 'CSS': ('css3',), 'React': ('reactjs', 'react.js'),
+    'Angular': ('angularjs',), 'Vue': ('vuejs', 'vue.js'), 'Node.js': ('nodejs', 'node js'),
+    'Express': ('express.js', 'expressjs'), 'Django': (), 'Flask': (), 'FastAPI': (),
+    'Spring': ('spring boot', 'spring framework', 'spring mvc'), 'Bootstrap': (), 'jQuery': (), '.NET': ('dotnet', 'asp.net'),
+    'REST': ('rest api', 'restful'), 'GraphQL': (),
+    'Git': ('github', 'gitlab'), 'Docker': (), 'Kubernetes': ('k8s',), 'Linux': (),
+    'AWS': ('amazon web services',), 'Azure': (), 'GCP': ('google cloud',),
+    'CI/CD': ('jenkins', 'github actions'), 'Terraform': (),
+    'Machine Learning': ('ml',), 'Deep Learning': (), 'Data Analysis': ('data analytics',),
+    'NLP': ('natural language processing',), 'Computer Vision': ('opencv',),
+    'TensorFlow': (), 'PyTorch': (), 'scikit-learn': ('sklearn',), 'Pandas': (),
+    'NumPy': (), 'Tableau': (), 'Power BI': ('powerbi',), 'Excel': ('ms excel',),
+    'Android': (), 'iOS': (), 'Flutter': (), 'React Native': (),
+    'Data Structures': (), 'Algorithms': (), 'Operating Systems': (), 'DBMS': (),
+    'Computer Networks': ('networking',), 'OOP': ('object oriented programming', 'object-oriented programming'),
+    'AutoCAD': (), 'SolidWorks': (), 'ANSYS': (), 'Embedded Systems': (), 'Arduino': (),
+    'VLSI': (), 'Verilog': (), 'IoT': ('internet of things',),
+    'Communication': ('communication skills',), 'Leadership': (), 'Teamwork': ('team work',),
+    'Problem Solving': (),
+}
+
+# Skills named by a letter or a common word, found only by their other
+# spellings, and skills found only in the casing of their name
+_ALIASES_ONLY = {'R', 'Go', 'Spring', 'Express'}
+_CASE_SENSITIVE = {'REST', 'Swift', 'Excel', 'Oracle', 'Rust'}
+
+
+def _skill_pattern(names, flags=0):
+    alternatives = sorted(names, key=len, reverse=True)
+    return re.compile(
+        r'(?<![\w+#.])(' + '|'.join(re.escape(name) for name in alternatives) + r')(?![\w+#]|\.\w)',
+        flags,
+    )
+
+
+_SPELLINGS = {}
+for _name, _aliases in SKILLS.items():
+    if _name not in _ALIASES_ONLY and _name not in _CASE_SENSITIVE:
+        _SPELLINGS[_name.lower()] = _name
+    for _alias in _aliases:
+        _SPELLINGS[_alias.lower()] = _name
+_SKILL_RE = _skill_pattern(_SPELLINGS, re.IGNORECASE)
+_EXACT_SKILL_RE = _skill_pattern(_CASE_SENSITIVE)
+
+
+def find_skills(text):
+    """Return the canonical names of the skills mentioned in text, in SKILLS order"""
+    found = {_SPELLINGS[match.lower()] for match in _SKILL_RE.findall(text)}
+    found.update(_EXACT_SKILL_RE.findall(text))
+    return [name for name in SKILLS if name in found]
+
+
+def normalize(text):
+    """NFKC text without control characters, with runs of spaces and blank lines collapsed"""
+    text = unicodedata.normalize('NFKC', text)
+    text = ''.join(
+        char if char in '\n\t' or unicodedata.category(char)[0] != 'C' else ' '
+        for char in text
+    )
+    lines = (re.sub(r'[ \t ]+', ' ', line).strip() for line in text.splitlines())
+    text = re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip()
+    return text[:MAX_TEXT_LENGTH]
+
+
+# DOCX
+
+_WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+def docx_text(data):
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            if archive.getinfo('word/document.xml').file_size > MAX_INFLATED_SIZE:
+                raise ExtractionError("The document is too large.")
+            document = archive.read('word/document.xml')
+    except (zipfile.BadZipFile, KeyError) as exc:
+        raise ExtractionError(f"Not a Word document: {exc}")
+    parts = []
+    for _, element in ElementTree.iterparse(io.BytesIO(document), events=('end',)):
+        tag = element.tag
+        if tag == _WORD_NS + 't':
+            parts.append(element.text or '')
+        elif tag == _WORD_NS + 'tab':
+            parts.append('\t')
+        elif tag in (_WORD_NS + 'br', _WORD_NS + 'cr', _WORD_NS + 'p'):
+            parts.append('\n')
+            if tag == _WORD_NS + 'p':
+                element.clear()
+    return ''.join(parts)
+
+
+# DOC
+
+_UTF16_RUN = re.compile(rb'(?:[\x20-\x7e\t\r\n]\x00){6,}')
+_ANSI_RUN = re.compile(rb'[\x20-\x7e\t\r\n]{12,}')
+
+
+def doc_text(data):
+    runs = [run.decode('utf-16-le') for run in _UTF16_RUN.findall(data)]
+    if sum(map(len, runs)) < 200:
+        runs += [run.decode('latin-1') for run in _ANSI_RUN.findall(data)]
+    return '\n'.join(runs)
+
+
+# PDF
+
+_OBJECT = re.compile(rb'(\d+)\s+\d+\s+obj\b')
+_REFERENCE = re.compile(rb'(\d+)\s+\d+\s+R')
+_STREAM = re.compile(rb'stream\r?\n')
+_ESCAPES = {ord('n'): b'\n', ord('r'): b'\r', ord('t'): b'\t', ord('b'): b'\b', ord('f'): b'\f'}
+
+
+def _matching(data, start, opening, closing):
+    """Index just past the bracket closing the one at start"""
+    depth = 0
+    i = start
+    while i < len(data):
+        if data.startswith(opening, i):
+            depth += 1
+            i += len(opening)
+        elif data.startswith(closing, i):
+            depth -= 1
+            i += len(closing)
+            if depth == 0:
+                return i
+        elif data[i:i + 1] == b'(':
+            i = _literal_end(data, i)
+        else:
+            i += 1
+    return len(data)
+
+
+def _literal_end(data, start):
+    depth = 0
+    i = start
+    while i < len(data):
+        char = data[i]
+        if char == 0x5c:  # backslash
+            i += 2
+            continue
+        if char == 0x28:
+            depth += 1
+        elif char == 0x29:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return len(data)
+
+
+def _value(body, key):
+    """Raw value of /key in a dictionary body: a reference, dictionary, array or token"""
+    match = re.search(rb'/' + key + rb'(?![\w.+-])\s*', body)
+    if not match:
+        return None
+    start = match.end()
+    if body.startswith(b'<<', start):
+        return body[start:_matching(body, start, b'<<', b'>>')]
+    if body.startswith(b'[', start):
+        return body[start:_matching(body, start, b'[', b']')]
+    reference = _REFERENCE.match(body, start)
+    if reference:
+        return reference.group(0)
+    token = re.match(rb'/?[^\s/<>\[\]()]+', body[start:])
+    return token.group(0) if token else None
+
+
+class _Document:
+    def __init__(self, data):
+        self.objects = {}
+        for match in _OBJECT.finditer(data):
+            end = data.find(b'endobj', match.end())
+            if end != -1:
+                self.objects.setdefault(int(match.group(1)), data[match.end():end])
+        for body in list(self.objects.values()):
+            if re.search(rb'/Type\s*/ObjStm', self._dictionary(body)):
+                self._read_object_stream(body)
+
+    @staticmethod
+    def _dictionary(body):
+        start = body.find(b'<<')
+        return body[start:_matching(body, start, b'<<', b'>>')] if start != -1 else b''
+
+    def _read_object_stream(self, body):
+        data = self.stream(body)
+        first = _value(self._dictionary(body), b'First')
+        if not data or not first or not first.isdigit():
+            return
+        first = int(first)
+        header = data[:first].split()
+        offsets = [(int(header[i]), int(header[i + 1])) for i in range(0, len(header) - 1, 2)]
+        for index, (number, offset) in enumerate(offsets):
+            end = offsets[index + 1][1] if index + 1 < len(offsets) else len(data) - first
+            self.objects.setdefault(number, data[first + offset:first + end])
+
+    def resolve(self, value):
+        """Body of a referenced object, or the value itself"""
+        seen = 0
+        while value is not None and seen < 8:
+            reference = _REFERENCE.fullmatch(value.strip())
+            if not reference:
+                return value
+            value = self.objects.get(int(reference.group(1)))
+            seen += 1
+        return value
+
+    def stream(self, body):
+        """Decoded data of a stream object, or b'' for undecodable ones"""
+        if body is None:
+            return b''
+        match = _STREAM.search(body)
+        if not match:
+            return b''
+        dictionary = body[:match.start()]
+        data = body[match.end():]
+        end = data.rfind(b'endstream')
+        if end != -1:
+            data = data[:end].rstrip(b'\r\n')
+        filters = _value(dictionary, b'Filter') or b''
+        names = re.findall(rb'/(\w+)', self.resolve(filters) or b'')
+        for name in names:
+            if name in (b'FlateDecode', b'Fl'):
+                decompressor = zlib.decompressobj()
+                try:
+                    data = decompressor.decompress(data, MAX_INFLATED_SIZE)
+                except zlib.error:
+                    return b''
+            else:
+                return b''
+        return data
+
+    def pages(self):
+        """Page object bodies in page order"""
+        roots = [
+            body for body in self.objects.values()
+            if re.search(rb'/Type\s*/Pages\b', body) and not re.search(rb'/Parent\s', body)
+        ]
+        pages = []
+        seen = set()
+
+        def visit(body, depth):
+            if depth > 32:
+                return
+            kids = _value(body, b'Kids')
+            if kids is None:
+                pages.append(body)
+                return
+            for reference in _REFERENCE.finditer(self.resolve(kids) or b''):
+                number = int(reference.group(1))
+                if number not in seen and number in self.objects:
+                    seen.add(number)
+                    visit(self.objects[number], depth + 1)
+
+        for root in roots:
+            visit(root, 0)
+        return pages
+
+    def resources(self, page):
+        """Resource dictionary of a page, inherited from its parents if need be"""
+        body, depth = page, 0
+        while body is not None and depth < 32:
+            resources = self.resolve(_value(body, b'Resources'))
+            if resources is not None:
+                return resources
+            body = self.resolve(_value(body, b'Parent'))
+            depth += 1
+        return b''
+
+    def _named(self, resources, kind):
+        """{resource name: object body or None} of one kind of resource"""
+        named = {}
+        entries = self.resolve(_value(resources, kind)) or b''
+        for match in re.finditer(rb'/([^\s/<>\[\]()]+)\s*(\d+\s+\d+\s+R|<<)', entries[2:]):
+            named[match.group(1)] = self.resolve(match.group(2)) if match.group(2) != b'<<' else None
+        return named
+
+    def fonts(self, resources):
+        """{font resource name: ToUnicode map or None}"""
+        fonts = {}
+        for name, font in self._named(resources, b'Font').items():
+            to_unicode = _value(font or b'', b'ToUnicode')
+            fonts[name] = _cmap(self.stream(self.resolve(to_unicode))) if to_unicode else None
+        return fonts
+
+    def text(self, content, resources, depth=0):
+        """Text drawn by a content stream, including that of the forms it draws"""
+        forms = {
+            name: body for name, body in self._named(resources, b'XObject').items()
+            if body is not None and re.search(rb'/Subtype\s*/Form\b', self._dictionary(body))
+        }
+
+        def draw(name):
+            form = forms.get(name)
+            if form is None or depth >= 8:
+                return ''
+            form_resources = self.resolve(_value(self._dictionary(form), b'Resources')) or resources
+            return self.text(self.stream(form), form_resources, depth + 1)
+
+        return _content_text(content, self.fonts(resources), draw)
+
+    def contents(self, page):
+        contents = _value(page, b'Contents')
+        if contents is None:
+            return b''
+        resolved = self.resolve(contents)
+        if resolved is not None and resolved.lstrip().startswith(b'['):
+            references = _REFERENCE.findall(resolved)
+            return b'\n'.join(self.stream(self.objects.get(int(number))) for number in references)
+        return self.stream(resolved)
+
+
+def _hex_bytes(token):
+    digits = re.sub(rb'[^0-9A-Fa-f]', b'', token)
+    if len(digits) % 2:
+        digits += b'0'
+    return bytes.fromhex(digits.decode())
+
+
+def _unescape(literal):
+    out = bytearray()
+    i = 0
+    while i < len(literal):
+        char = literal[i]
+        if char != 0x5c:
+            out.append(char)
+            i += 1
+            continue
+        i += 1
+        if i >= len(literal):
+            break
+        char = literal[i]
+        if char in _ESCAPES:
+            out += _ESCAPES[char]
+            i += 1
+        elif 0x30 <= char <= 0x37:
+            digits = re.match(rb'[0-7]{1,3}', literal[i:i + 3]).group(0)
+            out.append(int(digits, 8) & 0xFF)
+            i += len(digits)
+        elif char in (0x0d, 0x0a):
+            i += 2 if literal[i:i + 2] == b'\r\n' else 1
+        else:
+            out.append(char)
+            i += 1
+    return bytes(out)
+
+
+def _cmap(data):
+    """(code width, {code bytes: text}) of a ToUnicode CMap"""
+    mapping = {}
+    width = 1
+    for block in re.findall(rb'beginbfchar(.*?)endbfchar', data, re.S):
+        for source, target in re.findall(rb'<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]*)>', block):
+            mapping[_hex_bytes(source)] = _hex_bytes(target).decode('utf-16-be', 'ignore')
+            width = max(width, len(source) // 2)
+    for block in re.findall(rb'beginbfrange(.*?)endbfrange', data, re.S):
+        for low, high, target in re.findall(rb'<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]+)>\s*(<[0-9A-Fa-f]*>|\[[^\]]*\])', block):
+            size = len(low) // 2
+            width = max(width, size)
+            low, high = int(low, 16), int(high, 16)
+            if high - low > 0xFFFF:
+                continue
+            if target.startswith(b'['):
+                targets = re.findall(rb'<([0-9A-Fa-f]*)>', target)
+                for offset, value in enumerate(targets):
+                    mapping[(low + offset).to_bytes(size, 'big')] = _hex_bytes(value).decode('utf-16-be', 'ignore')
+            else:
+                base = _hex_bytes(target[1:-1])
+                start = int.from_bytes(base, 'big') if base else 0
+                for offset in range(high - low + 1):
+                    text = (start + offset).to_bytes(max(len(base), 2), 'big').decode('utf-16-be', 'ignore')
+                    mapping[(low + offset).to_bytes(size, 'big')] = text
+    return (width, mapping) if mapping else None
+
+
+def _decode(raw, cmap):
+    if cmap is None:
+        return raw.decode('latin-1')
+    width, mapping = cmap
+    chars = []
+    for i in range(0, len(raw), width):
+        code = raw[i:i + width]
+        chars.append(mapping.get(code, ''))
+    return ''.join(chars)
+
+
+_TOKEN = re.compile(
+    rb'\((?:[^()\\]|\\.|\((?:[^()\\]|\\.)*\))*\)'  # literal string, one level of nesting
+    rb'|<[0-9A-Fa-f\s]*>'                         # hex string
+    rb'|<<|>>|\[|\]'
+    rb'|/[^\s/<>\[\]()%]*'
+    rb'|[+-]?(?:\d+\.?\d*|\.\d+)'
+    rb'|[A-Za-z\'"*]+[0-9]?'
+    rb'|%[^\r\n]*',
+    re.S,
+)
+
+
+def _content_text(content, fonts, draw):
+    parts = []
+    operands = []
+    cmap = None
+    size = 1.0
+    y = None
+    for match in _TOKEN.finditer(content):
+        token = match.group(0)
+        first = token[:1]
+        if first == b'(':
+            operands.append(('string', _unescape(token[1:-1])))
+        elif first == b'<' and token != b'<<':
+            operands.append(('string', _hex_bytes(token[1:-1])))
+        elif first == b'/':
+            operands.append(('name', token[1:]))
+        elif first == b'%' or token in (b'<<', b'>>'):
+            continue
+        elif token in (b'[', b']'):
+            operands.append(('bracket', token))
+        elif first in b'+-.0123456789':
+            operands.append(('number', float(token)))
+        else:
+            operator = token
+            if operator == b'Tf':
+                names = [value for kind, value in operands if kind == 'name']
+                if names:
+                    cmap = fonts.get(names[-1])
+                if operands and operands[-1][0] == 'number':
+                    size = abs(operands[-1][1]) or 1.0
+            elif operator in (b'Tj', b"'", b'"'):
+                if operator != b'Tj':
+                    parts.append('\n')
+                strings = [value for kind, value in operands if kind == 'string']
+                if strings:
+                    parts.append(_decode(strings[-1], cmap))
+            elif operator == b'TJ':
+                for kind, value in operands:
+                    if kind == 'string':
+                        parts.append(_decode(value, cmap))
+                    elif kind == 'number' and value < -200:
+                        parts.append(' ')
+            elif operator in (b'Td', b'TD'):
+                numbers = [value for kind, value in operands if kind == 'number']
+                if len(numbers) >= 2 and abs(numbers[-1]) > 0.1:
+                    parts.append('\n')
+                elif numbers and numbers[0] > size:
+                    # Moving on by more than a character: a gap between words
+                    parts.append(' ')
+            elif operator == b'Tm':
+                numbers = [value for kind, value in operands if kind == 'number']
+                if len(numbers) >= 6:
+                    if y is not None and abs(numbers[5] - y) > 0.1:
+                        parts.append('\n')
+                    elif y is not None:
+                        parts.append(' ')
+                    y = numbers[5]
+            elif operator in (b'T*', b'ET'):
+                parts.append('\n')
+            elif operator == b'Do':
+                names = [value for kind, value in operands if kind == 'name']
+                if names:
+                    parts.append('\n' + draw(names[-1]) + '\n')
+            operands = []
+    return ''.join(parts)
+
+
+def pdf_text(data):
+    if not data.startswith(b'%PDF'):
+        raise ExtractionError("Not a PDF file.")
+    if re.search(rb'/Encrypt\b', data):
+        raise ExtractionError("Encrypted PDF files cannot be read.")
+    document = _Document(data)
+    return '\n'.join(
+        document.text(document.contents(page), document.resources(page))
+        for page in document.pages()
+    )
+
+
+READERS = {
+    'pdf': pdf_text,
+    'docx': docx_text,
+    'doc': doc_text,
+}
+
+
+def extract(name, data):
+    """
+    Return (normalized text, [skill, ...]) of a resume file given its
+    name and content. Raises ExtractionError for unsupported or
+    unreadable files.
+    """
+    extension = name.rsplit('.', 1)[-1].lower()
+    if extension not in READERS:
+        raise ExtractionError(f"Unsupported file type: .{extension}")
+    text = normalize(READERS[extension](data))
+    if not text:
+        raise ExtractionError("No text found in the file.")
+    return text, find_skills(text)
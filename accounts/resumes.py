@@ -0,0 +1,180 @@
+"""
+Background resume text extraction.
+
+Saving a resume through ResumeUploadForm calls queue_extraction(), which
+takes the content hash from the stored file's name (see
+accounts/storage.py) and marks the student's ResumeText row pending,
+unless text was already extracted from a file with the same content.
+The request does no parsing.
+
+The process_resumes worker claims pending rows in batches and parses the
+files (accounts/resume_parser.py) in a pool of RESUME_EXTRACT_WORKERS
+processes, since parsing is CPU bound; at most one batch is in flight.
+A result is written only if the row still expects the content that was
+parsed, so a resume replaced during extraction is extracted again
+rather than overwritten with stale text. Text and skills of the previous
+resume are kept until then.
+
+A row left running by a worker that died is claimed again after
+STALE_AFTER, up to MAX_ATTEMPTS times; a file that keeps killing the
+worker is then marked failed. So is a stored file whose content does not
+match the hash in its name, which no retry would change.
+"""
+import hashlib
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import ResumeText
+from .resume_parser import ExtractionError, extract
+from .storage import file_hash, stored_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+
+# Rows claimed per batch, per worker process
+BATCH_PER_WORKER = 4
+
+# A running row that has not been updated for this long is claimed again
+STALE_AFTER = timedelta(minutes=10)
+
+# Claims of the same content before a stalled row is given up on
+MAX_ATTEMPTS = 3
+
+
+def extract_workers():
+    return getattr(settings, 'RESUME_EXTRACT_WORKERS', None) or min(DEFAULT_WORKERS, os.cpu_count() or 1)
+
+
+def queue_extraction(profile):
+    """
+    Queue extraction of a student's resume if its content has not been
+    extracted yet. Returns the ResumeText row, or None without a resume.
+    """
+    if not profile.resume:
+        ResumeText.objects.filter(student=profile).delete()
+        return None
+    digest = stored_hash(profile.resume.name)
+    if digest is None:
+        # Stored before resumes were content addressed
+        profile.resume.open('rb')
+        try:
+            digest = file_hash(profile.resume)
+        finally:
+            profile.resume.close()
+    record = ResumeText.objects.filter(student=profile).first()
+    if record is None:
+        return ResumeText.objects.create(student=profile, file_name=profile.resume.name, content_hash=digest)
+    if record.content_hash == digest and record.status != 'failed':
+        # Same content (pending, running or done), possibly under a new name
+        if record.file_name != profile.resume.name:
+            record.file_name = profile.resume.name
+            record.save(update_fields=['file_name', 'updated_at'])
+        return record
+    record.file_name = profile.resume.name
+    record.content_hash = digest
+    record.status = 'pending'
+    record.attempts = 0
+    record.last_error = ''
+    record.save(update_fields=['file_name', 'content_hash', 'status', 'attempts', 'last_error', 'updated_at'])
+    return record
+
+
+def _claim(batch_size):
+    """Mark up to batch_size pending (or stalled) rows as running and return them"""
+    stale = timezone.now() - STALE_AFTER
+    with transaction.atomic():
+        ResumeText.objects.filter(status='running', updated_at__lt=stale, attempts__gte=MAX_ATTEMPTS).update(
+            status='failed', updated_at=timezone.now(),
+            last_error=f"Extraction stalled {MAX_ATTEMPTS} times; upload the resume again to retry.",
+        )
+        records = ResumeText.objects.filter(
+            Q(status='pending') | Q(status='running', updated_at__lt=stale)
+        ).order_by('updated_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            records = records.select_for_update(skip_locked=True)
+        else:
+            records = records.select_for_update()
+        ids = list(records.values_list('pk', flat=True)[:batch_size])
+        if ids:
+            ResumeText.objects.filter(pk__in=ids).update(
+                status='running', attempts=F('attempts') + 1, updated_at=timezone.now(),
+            )
+    return list(ResumeText.objects.filter(pk__in=ids).select_related('student').order_by('id'))
+
+
+def _read(record):
+    """Return (content hash, bytes) of the student's current resume file"""
+    resume = record.student.resume
+    resume.open('rb')
+    try:
+        data = resume.read()
+    finally:
+        resume.close()
+    return hashlib.sha256(data).hexdigest(), data
+
+
+def _finish(record, expected_hash, **fields):
+    """Write the outcome unless the row was queued again for other content meanwhile"""
+    return ResumeText.objects.filter(pk=record.pk, content_hash=expected_hash).update(
+        updated_at=timezone.now(), **fields
+    )
+
+
+def _fail(record, expected_hash, exc):
+    logger.warning("Resume extraction of %s failed: %s", record.file_name, exc)
+    _finish(record, expected_hash, status='failed', last_error=f"{type(exc).__name__}: {exc}")
+
+
+def process_batch(pool, batch_size):
+    """Extract one batch of claimed rows in the pool; return the number claimed"""
+    records = _claim(batch_size)
+    futures = []
+    for record in records:
+        try:
+            digest, data = _read(record)
+        except (OSError, ValueError) as exc:
+            _fail(record, record.content_hash, exc)
+            continue
+        if digest != record.content_hash:
+            # The stored file is not the one queued; queue what is there now
+            queued = queue_extraction(record.student)
+            if queued is not None and queued.content_hash == record.content_hash:
+                # Named after content it does not have, which a retry would not change
+                _fail(record, record.content_hash, ExtractionError("The stored file does not match its content hash."))
+            continue
+        futures.append((record, pool.submit(extract, record.file_name, data)))
+
+    for record, future in futures:
+        try:
+            text, skills = future.result()
+        except Exception as exc:
+            _fail(record, record.content_hash, exc)
+            continue
+        _finish(
+            record, record.content_hash,
+            status='done', text=text, skills=', '.join(skills), extracted_hash=record.content_hash,
+            last_error='', extracted_at=timezone.now(),
+        )
+    return len(records)
+
+
+def process_pending(pool, batch_size):
+    """Extract queued resumes until none is left; return the number processed"""
+    processed = 0
+    while True:
+        claimed = process_batch(pool, batch_size)
+        if not claimed:
+            return processed
+        processed += claimed
+
+
+def extraction_pool(workers=None):
+    return ProcessPoolExecutor(max_workers=workers or extract_workers())
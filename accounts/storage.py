@@ -0,0 +1,111 @@
+"""
+Content-addressed resume storage.
+
+A resume is stored under the SHA-256 of its content,
+resumes/<2 hex digits>/<sha256>.<extension>, so uploading the same file
+again, by the same student or another one, reuses the stored copy. The
+hash is computed while the upload is received: the upload handlers below
+(FILE_UPLOAD_HANDLERS) hash each chunk as it is written and leave the
+digest on the uploaded file as ``content_hash``. Files that do not come
+from a request are hashed in chunks when saved.
+
+Since files are shared, a replaced resume is not deleted when the
+profile changes; the gc_resumes command removes files no profile refers
+to any more.
+"""
+import hashlib
+import os
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+RESUME_DIRECTORY = 'resumes'
+
+_CONTENT_NAME = re.compile(r'(?:^|/)([0-9a-f]{64})\.\w+$')
+
+
+def file_hash(file):
+    """SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def uploaded_hash(file):
+    """Digest left by the upload handlers, or computed from the file"""
+    return getattr(file, 'content_hash', None) or file_hash(file)
+
+
+def stored_hash(name):
+    """The content hash in a content-addressed name, or None for other names"""
+    match = _CONTENT_NAME.search(name or '')
+    return match.group(1) if match else None
+
+
+def content_path(digest, filename, directory=RESUME_DIRECTORY):
+    extension = os.path.splitext(filename)[1].lower()
+    return '/'.join((directory, digest[:2], digest + extension))
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage naming files by their content: a file saved as
+    <directory>/<name>.<ext> is stored as <directory>/<xx>/<sha256>.<ext>.
+    A file that already exists under that name has the same content, so it
+    is kept as is. Its modification time is refreshed instead, which keeps
+    gc_resumes from collecting it before the profile referring to it again
+    is saved.
+    """
+
+    def __init__(self, *args, **kwargs):
+        # Two concurrent saves of the same content write the same bytes
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(*args, **kwargs)
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        directory, filename = os.path.split(name)
+        return super().save(content_path(uploaded_hash(content), filename, directory), content, max_length)
+
+    def _save(self, name, content):
+        if self.exists(name):
+            try:
+                os.utime(self.path(name))
+                return name
+            except FileNotFoundError:
+                pass  # collected meanwhile
+        return super()._save(name, content)
+
+
+resume_storage = ContentAddressedStorage()
+
+
+class _HashingMixin:
+    def new_file(self, *args, **kwargs):
+        self.sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        passed_on = super().receive_data_chunk(raw_data, start)
+        if passed_on is None:
+            # This handler stored the chunk
+            self.sha256.update(raw_data)
+        return passed_on
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.content_hash = self.sha256.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(_HashingMixin, MemoryFileUploadHandler):
+    """MemoryFileUploadHandler that hashes the upload as it is received"""
+
+
+class HashingTemporaryFileUploadHandler(_HashingMixin, TemporaryFileUploadHandler):
+    """TemporaryFileUploadHandler that hashes the upload as it is received"""
@@ -0,0 +1,874 @@
+import os
+import smtplib
+import tempfile
+import time
+import zipfile
+from concurrent.futures import Future
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from jobs.tests import ViewTestCase
+from . import fanout, imports, replicas
+from .downloads import CHUNK_SIZE, byte_range, serve_file, stream_zip
+from .models import FanoutJob, Notification, OutboxEmail, ReplicaHeartbeat, ResumeText, StudentProfile, User
+from .outbox import RETRY_BASE_SECONDS, OutboxWorker
+from .replicas import STICKY_COOKIE, replica_reads
+from .resume_parser import ExtractionError, extract, find_skills
+from .resumes import MAX_ATTEMPTS, STALE_AFTER, process_batch, process_pending, queue_extraction
+from .storage import resume_storage
+from .utils import send_email, send_emails
+
+
+class FlakyEmailBackend(EmailBackend):
+    """locmem backend that can refuse recipients, drop the connection or not connect"""
+    refused = ()
+    drop_at = None
+    unreachable = False
+
+    def open(self):
+        if self.unreachable:
+            raise ConnectionRefusedError("Connection refused")
+        return super().open()
+
+    def send_messages(self, messages):
+        for message in messages:
+            if message.to[0] in self.refused:
+                raise smtplib.SMTPRecipientsRefused({message.to[0]: (550, b"No such user")})
+            if message.to[0] == self.drop_at:
+                raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND='accounts.tests.FlakyEmailBackend')
+class OutboxWorkerTests(TestCase):
+
+    def setUp(self):
+        self.worker = OutboxWorker(batch_size=10)
+        self.addCleanup(self.worker.close)
+
+    def backend(self, **attributes):
+        patcher = mock.patch.multiple(FlakyEmailBackend, **attributes)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_claims_due_messages_in_batches(self):
+        send_emails([("Hello", "Body", f"student{i}@example.com") for i in range(3)])
+        later = send_email("Later", "Body", "later@example.com")
+        OutboxEmail.objects.filter(pk=later.pk).update(next_attempt_at=timezone.now() + timedelta(hours=1))
+        self.worker.batch_size = 2
+
+        self.assertEqual(self.worker.deliver_batch(), (2, 0))
+        self.assertEqual(self.worker.deliver_batch(), (1, 0))
+        self.assertEqual(self.worker.deliver_batch(), (0, 0))
+
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            [f"student{i}@example.com" for i in range(3)],
+        )
+        self.assertEqual(OutboxEmail.objects.filter(status='sent', attempts=1).count(), 3)
+        self.assertEqual(OutboxEmail.objects.get(pk=later.pk).status, 'pending')
+
+    def test_sends_the_queued_message(self):
+        email = send_email("Interview scheduled", "Tomorrow at 10", "student@example.com")
+
+        self.assertEqual(self.worker.drain(), (1, 0))
+
+        message = mail.outbox[0]
+        self.assertEqual((message.subject, message.body, message.to), (email.subject, email.message, [email.recipient]))
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'sent')
+        self.assertIsNotNone(email.sent_at)
+
+    def test_refused_message_is_retried_with_backoff(self):
+        self.backend(refused=("nobody@example.com",))
+        email = send_email("Hello", "Body", "nobody@example.com")
+        other = send_email("Hello", "Body", "student@example.com")
+
+        self.assertEqual(self.worker.deliver_batch(), (1, 1))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('pending', 1))
+        self.assertIn("SMTPRecipientsRefused", email.last_error)
+        delay = email.next_attempt_at - timezone.now()
+        self.assertAlmostEqual(delay.total_seconds(), RETRY_BASE_SECONDS, delta=5)
+        self.assertEqual(OutboxEmail.objects.get(pk=other.pk).status, 'sent')
+
+        # Not due yet
+        self.assertEqual(self.worker.deliver_batch(), (0, 0))
+
+        OutboxEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(self.worker.deliver_batch(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.attempts, 2)
+        delay = email.next_attempt_at - timezone.now()
+        self.assertAlmostEqual(delay.total_seconds(), 2 * RETRY_BASE_SECONDS, delta=5)
+
+    @override_settings(OUTBOX_GIVE_UP_AFTER=3600)
+    def test_gives_up_after_the_retry_period(self):
+        self.backend(refused=("nobody@example.com",))
+        email = send_email("Hello", "Body", "nobody@example.com")
+        OutboxEmail.objects.filter(pk=email.pk).update(attempts=8, created_at=timezone.now() - timedelta(minutes=59))
+
+        self.worker.deliver_batch()
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('pending', 9))
+
+        OutboxEmail.objects.filter(pk=email.pk).update(
+            next_attempt_at=timezone.now(), created_at=timezone.now() - timedelta(hours=1),
+        )
+        self.worker.deliver_batch()
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('failed', 10))
+        self.assertEqual(self.worker.deliver_batch(), (0, 0))
+
+    def test_unreachable_server_leaves_the_batch_queued(self):
+        self.backend(unreachable=True)
+        send_emails([("Hello", "Body", f"student{i}@example.com") for i in range(3)])
+        before = list(OutboxEmail.objects.values_list('status', 'attempts', 'next_attempt_at', 'last_error'))
+
+        self.assertEqual(self.worker.drain(), (0, 0))
+
+        self.assertEqual(list(OutboxEmail.objects.values_list('status', 'attempts', 'next_attempt_at', 'last_error')),
+                         before)
+        self.assertIsNone(self.worker.connection)
+
+    @override_settings(OUTBOX_GIVE_UP_AFTER=0)
+    def test_dropped_connection_is_not_charged_to_the_messages(self):
+        self.backend(drop_at="student1@example.com")
+        first, dropped, rest = send_emails([("Hello", "Body", f"student{i}@example.com") for i in range(3)])
+
+        self.assertEqual(self.worker.deliver_batch(), (1, 0))
+
+        self.assertEqual(OutboxEmail.objects.get(pk=first.pk).status, 'sent')
+        dropped.refresh_from_db()
+        self.assertEqual((dropped.status, dropped.attempts), ('pending', 0))
+        self.assertGreater(dropped.next_attempt_at, timezone.now())
+        rest.refresh_from_db()
+        self.assertEqual((rest.status, rest.attempts, rest.last_error), ('pending', 0, ''))
+        self.assertIsNone(self.worker.connection)
+
+        # The rest goes out over a new connection
+        self.assertEqual(self.worker.deliver_batch(), (1, 0))
+        self.assertEqual(OutboxEmail.objects.get(pk=rest.pk).status, 'sent')
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_MAX_LAG=10, REPLICA_CHECK_INTERVAL=0)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    The 'replica' database of the test settings holds rows the primary
+    does not, which tells where a read went.
+    """
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        replicas._health.clear()
+        self.addCleanup(replicas._health.clear)
+        User.objects.db_manager('replica').create_user('replicated', user_type='officer')
+        self.beat(timezone.now())
+
+    def beat(self, at):
+        ReplicaHeartbeat.objects.using('replica').all().delete()
+        if at is not None:
+            ReplicaHeartbeat.objects.using('replica').create(beat=at)
+
+    def on_replica(self):
+        return User.objects.filter(username='replicated').exists()
+
+    def test_reads_in_scope_go_to_the_replica(self):
+        self.assertFalse(self.on_replica())
+        with replica_reads():
+            self.assertTrue(self.on_replica())
+        self.assertFalse(self.on_replica())
+
+    def test_writes_and_transactions_stay_on_the_primary(self):
+        with replica_reads():
+            User.objects.create_user('written', user_type='student')
+            with transaction.atomic():
+                self.assertFalse(self.on_replica())
+                self.assertTrue(User.objects.filter(username='written').exists())
+        self.assertTrue(User.objects.using('default').filter(username='written').exists())
+        self.assertFalse(User.objects.using('replica').filter(username='written').exists())
+
+    def test_lagging_or_missing_heartbeat_falls_back_to_the_primary(self):
+        self.beat(timezone.now() - timedelta(seconds=30))
+        with replica_reads():
+            self.assertFalse(self.on_replica())
+
+        self.beat(None)
+        with replica_reads():
+            self.assertFalse(self.on_replica())
+
+        self.beat(timezone.now())
+        with replica_reads():
+            self.assertTrue(self.on_replica())
+
+    @override_settings(REPLICA_STICKY_SECONDS=60)
+    def test_user_who_posted_reads_from_the_primary(self):
+        officer = User.objects.create_user('officer', user_type='officer')
+        self.client.force_login(officer)
+        url = reverse('chart_job_types')
+
+        def replica_reads_of(method):
+            with CaptureQueriesContext(connections['replica']) as queries:
+                method(url)
+            return [query for query in queries if 'replicaheartbeat' not in query['sql']]
+
+        self.assertTrue(replica_reads_of(self.client.get))
+
+        replica_reads_of(self.client.post)
+        self.assertEqual(self.client.cookies[STICKY_COOKIE]['max-age'], 60)
+        self.assertEqual(replica_reads_of(self.client.get), [])
+
+        with mock.patch('accounts.middleware.time.time', return_value=time.time() + 61):
+            self.assertTrue(replica_reads_of(self.client.get))
+
+
+RESUMES = os.path.join(os.path.dirname(__file__), 'test_resumes')
+
+
+def resume_file(name):
+    with open(os.path.join(RESUMES, name), 'rb') as file:
+        return file.read()
+
+
+class ResumeParserTests(SimpleTestCase):
+    """Text and skills of the resumes in test_resumes/"""
+
+    def test_pdf_with_plain_content_stream(self):
+        text, skills = extract('resume.pdf', resume_file('plain.pdf'))
+
+        self.assertEqual(text, "Asha Rao\nComputer Science (B.Tech)\nSkills: Python, Django, SQL and Machine Learning")
+        self.assertEqual(skills, ['Python', 'SQL', 'Django', 'Machine Learning'])
+
+    def test_pdf_with_flate_streams_and_unicode_map(self):
+        text, skills = extract('resume.pdf', resume_file('flate.pdf'))
+
+        # One page per paragraph; the second page is drawn in two-byte codes mapped by ToUnicode
+        self.assertEqual(text, (
+            "Ravi Kumar\nProjects: React and Node.js dashboard\n\n"
+            "Experience with Docker, Kubernetes\nCafé résumé on AWS"
+        ))
+        self.assertEqual(skills, ['React', 'Node.js', 'Docker', 'Kubernetes', 'AWS'])
+
+    def test_docx(self):
+        text, skills = extract('Resume.DOCX', resume_file('resume.docx'))
+
+        self.assertEqual(text, "Meera Iyer\nSkills: Java, Spring Boot, PostgreSQL and Git\nStrong communication skills\nTeam work")
+        self.assertEqual(skills, ['Java', 'PostgreSQL', 'Spring', 'Git', 'Communication', 'Teamwork'])
+
+    def test_unreadable_files(self):
+        pdf = resume_file('flate.pdf')
+        files = {
+            'truncated.pdf': pdf[:pdf.index(b'stream') + 20],  # cut off in the first compressed stream
+            'resume.pdf': b'%PDF-1.4 resume',
+            'resume.docx': resume_file('plain.pdf'),
+            'resume.txt': b'Python, SQL',
+        }
+        for name, data in files.items():
+            with self.subTest(name=name), self.assertRaises(ExtractionError):
+                extract(name, data)
+
+    def test_skills(self):
+        cases = {
+            "Built REST services with golang and k8s": ['Go', 'REST', 'Kubernetes'],
+            # Common words are skills only in the casing or spelling of the skill
+            "Will rest, go and express myself in R": [],
+            "Used ReactJS, C++ and C# on .NET; sklearn for ML": ['C++', 'C#', 'React', '.NET', 'Machine Learning', 'scikit-learn'],
+            "Wrote node.js scripts, not Node.jsx": ['Node.js'],
+            "Knows Java and JavaScript": ['Java', 'JavaScript'],
+        }
+        for text, skills in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(find_skills(text), skills)
+
+
+class ImmediatePool:
+    """Runs submitted calls at once, in this process"""
+
+    def submit(self, function, *args):
+        future = Future()
+        try:
+            future.set_result(function(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+
+class MediaTestCase(TestCase):
+    """A temporary MEDIA_ROOT"""
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings = override_settings(MEDIA_ROOT=media.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def store(self, data, name='resumes/resume.pdf', age=None):
+        name = resume_storage.save(name, ContentFile(data))
+        if age is not None:
+            stamp = time.time() - age
+            os.utime(resume_storage.path(name), (stamp, stamp))
+        return name
+
+
+class ResumeProcessingTests(MediaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.student = StudentProfile.objects.create(
+            user=User.objects.create_user('student', 'student@example.com', 'pw', user_type='student'),
+            roll_number='R1', department='CSE', year_of_graduation=2026,
+        )
+
+    def upload(self, name, data):
+        self.student.resume.save(name, ContentFile(data))
+        return queue_extraction(self.student)
+
+    def stall(self, record):
+        ResumeText.objects.filter(pk=record.pk).update(updated_at=timezone.now() - STALE_AFTER - timedelta(seconds=1))
+
+    def test_extracts_queued_resume(self):
+        record = self.upload('resume.pdf', resume_file('plain.pdf'))
+
+        self.assertEqual(process_pending(ImmediatePool(), 4), 1)
+
+        record.refresh_from_db()
+        self.assertEqual((record.status, record.attempts), ('done', 1))
+        self.assertEqual(record.skills, 'Python, SQL, Django, Machine Learning')
+        self.assertEqual(record.extracted_hash, record.content_hash)
+
+    def test_unreadable_resume_fails(self):
+        record = self.upload('resume.docx', resume_file('plain.pdf'))
+
+        process_pending(ImmediatePool(), 4)
+
+        record.refresh_from_db()
+        self.assertEqual(record.status, 'failed')
+        self.assertIn('ExtractionError', record.last_error)
+
+    def test_stalled_resume_is_retried_then_given_up(self):
+        record = self.upload('resume.pdf', resume_file('plain.pdf'))
+        # A worker that dies on the file claims it and never finishes
+        dying_pool = mock.Mock(**{'submit.side_effect': lambda *args: Future()})
+        future_result = mock.patch.object(Future, 'result', side_effect=SystemExit)
+
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            with future_result, self.assertRaises(SystemExit):
+                process_batch(dying_pool, 4)
+            record.refresh_from_db()
+            self.assertEqual((record.status, record.attempts), ('running', attempt))
+            self.assertEqual(process_batch(ImmediatePool(), 4), 0)  # not stale yet
+            self.stall(record)
+
+        self.assertEqual(process_batch(ImmediatePool(), 4), 0)
+        record.refresh_from_db()
+        self.assertEqual(record.status, 'failed')
+        self.assertIn('stalled', record.last_error)
+
+        # Uploading the resume again starts over
+        self.student.resume = None
+        queue_extraction(self.student)
+        record = self.upload('resume.pdf', resume_file('plain.pdf'))
+        self.assertEqual((record.status, record.attempts), ('pending', 0))
+        process_pending(ImmediatePool(), 4)
+        record.refresh_from_db()
+        self.assertEqual(record.status, 'done')
+
+    def test_file_not_matching_its_hash_fails(self):
+        record = self.upload('resume.pdf', resume_file('plain.pdf'))
+        with open(self.student.resume.path, 'wb') as file:
+            file.write(resume_file('flate.pdf'))
+
+        process_pending(ImmediatePool(), 4)
+
+        record.refresh_from_db()
+        self.assertEqual(record.status, 'failed')
+        self.assertIn('content hash', record.last_error)
+
+    def test_resume_replaced_during_extraction_is_extracted_again(self):
+        record = self.upload('resume.pdf', resume_file('plain.pdf'))
+        replaced = StudentProfile.objects.get(pk=self.student.pk)
+
+        def replace(name, data):
+            replaced.resume.save('resume.docx', ContentFile(resume_file('resume.docx')))
+            queue_extraction(replaced)
+            return extract(name, data)
+
+        pool = mock.Mock(**{'submit.side_effect': lambda function, *args: ImmediatePool().submit(replace, *args)})
+        process_batch(pool, 4)
+        record.refresh_from_db()
+        self.assertEqual((record.status, record.text), ('pending', ''))
+
+        process_pending(ImmediatePool(), 4)
+        record.refresh_from_db()
+        self.assertEqual((record.status, record.attempts), ('done', 1))
+        self.assertIn('Meera Iyer', record.text)
+
+
+class UnreadCounterTests(TestCase):
+    """User.unread_notifications against the Notification rows it counts"""
+
+    def setUp(self):
+        self.users = [User.objects.create_user(f'user{i}', f'user{i}@example.com', 'pw') for i in range(2)]
+
+    def assertCounted(self, *expected):
+        for user, count in zip(self.users, expected):
+            user.refresh_from_db()
+            self.assertEqual(
+                (user.unread_notifications, user.notifications.filter(read=False).count()), (count, count)
+            )
+
+    def test_bulk_create_counts_unread_rows(self):
+        Notification.objects.bulk_create([
+            Notification(user=self.users[0], title="One", message="Body"),
+            Notification(user=self.users[0], title="Two", message="Body"),
+            Notification(user=self.users[0], title="Read", message="Body", read=True),
+            Notification(user=self.users[1], title="One", message="Body"),
+        ])
+        self.users[1].notifications.create(title="Two", message="Body")
+
+        self.assertCounted(2, 2)
+
+    def test_mark_read_twice_counts_once(self):
+        Notification.objects.bulk_create(
+            Notification(user=user, title=str(i), message="Body") for user in self.users for i in range(3)
+        )
+        user = User.objects.get(pk=self.users[0].pk)  # as loaded by a request
+        ids = list(user.notifications.values_list('pk', flat=True)[:2])
+        other_ids = list(self.users[1].notifications.values_list('pk', flat=True))
+
+        self.assertEqual(Notification.objects.mark_read(user, ids), 2)
+        self.assertEqual(user.unread_notifications, 1)
+        # Again, as from a second tab, and with another user's ids
+        self.assertEqual(Notification.objects.mark_read(user, ids + other_ids), 0)
+        self.assertEqual(user.unread_notifications, 1)
+
+        self.assertCounted(1, 3)
+
+    def test_counter_never_goes_negative(self):
+        notification = self.users[0].notifications.create(title="One", message="Body")
+        User.objects.filter(pk=self.users[0].pk).update(unread_notifications=0)  # drifted
+
+        Notification.objects.mark_read(self.users[0], [notification.pk])
+
+        self.users[0].refresh_from_db()
+        self.assertEqual(self.users[0].unread_notifications, 0)
+        call_command('recount_notifications', stdout=StringIO())
+        self.assertCounted(0, 0)
+
+
+class FanoutTests(TestCase):
+
+    def setUp(self):
+        self.students = [
+            User.objects.create_user(f'student{i}', f'student{i}@example.com', 'pw', user_type='student')
+            for i in range(5)
+        ]
+        StudentProfile.objects.bulk_create(
+            StudentProfile(user=user, roll_number=f'R{i}', department='CSE' if i < 3 else 'ECE', year_of_graduation=2026)
+            for i, user in enumerate(self.students)
+        )
+        self.officer = User.objects.create_user('officer', 'officer@example.com', 'pw', user_type='officer')
+        Notification.objects.create(user=self.students[0], title="Welcome", message="Hello")
+
+    def notified(self):
+        """{user id: notifications titled "Drive"}, checking each user's unread counter"""
+        counts = {}
+        for user in User.objects.all():
+            with self.subTest(user=user.username):
+                self.assertEqual(user.unread_notifications, user.notifications.filter(read=False).count())
+            counts[user.pk] = user.notifications.filter(title="Drive").count()
+        return counts
+
+    def test_small_audience_is_notified_now(self):
+        self.assertEqual(fanout.fan_out('department', "Drive", "Acme is hiring", value='CSE'), 3)
+
+        self.assertEqual(self.notified(), {
+            **{user.pk: 1 for user in self.students[:3]}, **{user.pk: 0 for user in self.students[3:]},
+            self.officer.pk: 0,
+        })
+        self.assertFalse(FanoutJob.objects.exists())
+
+    def test_notifications_are_written_in_chunks(self):
+        with CaptureQueriesContext(connections['default']) as queries:
+            delivered = fanout.deliver(fanout.audience_users('students'), "Drive", "Acme is hiring", chunk_size=2)
+
+        self.assertEqual(delivered, 5)
+        inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "accounts_notification"')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(self.notified(), {**{user.pk: 1 for user in self.students}, self.officer.pk: 0})
+
+    @override_settings(FANOUT_ASYNC_THRESHOLD=5)
+    def test_large_audience_is_queued_and_delivered_by_the_worker(self):
+        job = fanout.fan_out('students', "Drive", "Acme is hiring")
+
+        self.assertIsInstance(job, FanoutJob)
+        self.assertEqual(set(self.notified().values()), {0})
+
+        self.assertEqual(fanout.process_pending(chunk_size=2), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.delivered, job.last_user_id), ('done', 5, self.students[-1].pk))
+        self.assertEqual(self.notified(), {**{user.pk: 1 for user in self.students}, self.officer.pk: 0})
+
+    def test_interrupted_job_resumes_from_its_checkpoint(self):
+        job = FanoutJob.objects.create(audience='students', title="Drive", message="Acme is hiring")
+        notify_users = fanout.notify_users
+        calls = []
+
+        def dies_on_second_chunk(*args):
+            calls.append(args)
+            if len(calls) == 2:
+                raise KeyboardInterrupt  # the worker is killed, not an error it records
+            return notify_users(*args)
+
+        with mock.patch.object(fanout, 'notify_users', side_effect=dies_on_second_chunk), \
+                self.assertRaises(KeyboardInterrupt):
+            fanout.process_pending(chunk_size=2)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.delivered, job.last_user_id), ('running', 2, self.students[1].pk))
+
+        # Not picked up again until it is stale
+        self.assertEqual(fanout.process_pending(chunk_size=2), 0)
+        FanoutJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - fanout.STALE_AFTER - timedelta(seconds=1))
+        self.assertEqual(fanout.process_pending(chunk_size=2), 1)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.delivered), ('done', 5))
+        self.assertEqual(self.notified(), {**{user.pk: 1 for user in self.students}, self.officer.pk: 0})
+
+    def test_failed_chunk_marks_the_job_failed(self):
+        job = FanoutJob.objects.create(audience='department', audience_value='CSE', title="Drive", message="Hiring")
+
+        with mock.patch.object(fanout, 'notify_users', side_effect=[2, ValueError("Disk full")]), \
+                self.assertLogs('accounts.fanout', 'ERROR'):
+            fanout.process_pending(chunk_size=2)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.delivered, job.last_error), ('failed', 2, "ValueError: Disk full"))
+
+
+class ByteRangeTests(SimpleTestCase):
+
+    def test_ranges(self):
+        cases = {
+            None: None,
+            'bytes=0-9': (0, 10),
+            'bytes=10-': (10, 100),
+            'bytes = 90 - 200': (90, 100),  # clamped to the end of the file
+            'bytes=-10': (90, 100),
+            'bytes=-500': (0, 100),
+            'bytes=99-99': (99, 100),
+            'bytes=100-': False,
+            'bytes=100-200': False,
+            'bytes=-0': False,
+            'bytes=9-0': None,  # reversed
+            'bytes=-': None,
+            'bytes=0-1,5-6': None,  # several ranges are answered with the whole file
+            'items=0-9': None,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(byte_range(header, 100), expected)
+
+
+class ServeFileTests(MediaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.data = bytes(range(100))
+        self.name = self.store(self.data, age=60)
+        self.mtime = int(os.stat(resume_storage.path(self.name)).st_mtime)
+        self.etag = f'"{self.name.rsplit("/", 1)[1].split(".")[0]}"'
+
+    def get(self, **headers):
+        request = RequestFactory().get('/resume/', **headers)
+        response = serve_file(request, resume_storage, self.name, 'Asha Rao.pdf')
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_whole_file(self):
+        response, body = self.get()
+
+        self.assertEqual((response.status_code, body), (200, self.data))
+        self.assertEqual(response['ETag'], self.etag)
+        self.assertEqual(response['Last-Modified'], http_date(self.mtime))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Content-Disposition'], 'inline; filename="Asha Rao.pdf"')
+
+    def test_partial_content(self):
+        for header, start, end in (('bytes=10-19', 10, 20), ('bytes=-5', 95, 100), ('bytes=90-500', 90, 100)):
+            with self.subTest(header=header):
+                response, body = self.get(HTTP_RANGE=header)
+                self.assertEqual((response.status_code, body), (206, self.data[start:end]))
+                self.assertEqual(response['Content-Range'], f'bytes {start}-{end - 1}/100')
+                self.assertEqual(response['Content-Length'], str(end - start))
+
+    def test_unsatisfiable_and_ignored_ranges(self):
+        response, _ = self.get(HTTP_RANGE='bytes=100-')
+        self.assertEqual((response.status_code, response['Content-Range']), (416, 'bytes */100'))
+
+        for header in ('bytes=19-10', 'bytes=0-', 'bytes=0-1,5-6'):
+            with self.subTest(header=header):
+                response, body = self.get(HTTP_RANGE=header)
+                self.assertEqual((response.status_code, body), (200, self.data))
+
+    def test_if_range(self):
+        current = (self.etag, http_date(self.mtime))
+        changed = ('"0123"', http_date(self.mtime - 3600), 'W/' + self.etag)
+        for if_range in current + changed:
+            with self.subTest(if_range=if_range):
+                response, body = self.get(HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE=if_range)
+                # A range of another version of the file would be corrupt; send all of it
+                expected = (206, self.data[10:20]) if if_range in current else (200, self.data)
+                self.assertEqual((response.status_code, body), expected)
+
+    def test_not_modified(self):
+        for headers in ({'HTTP_IF_NONE_MATCH': self.etag}, {'HTTP_IF_MODIFIED_SINCE': http_date(self.mtime)}):
+            with self.subTest(headers=headers):
+                response, body = self.get(**headers)
+                self.assertEqual((response.status_code, body), (304, b''))
+                self.assertEqual(response['ETag'], self.etag)
+
+        response, _ = self.get(HTTP_IF_NONE_MATCH='"0123"')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(RESUME_SENDFILE='x-accel-redirect', RESUME_SENDFILE_PREFIX='/protected/')
+    def test_sendfile(self):
+        response, body = self.get(HTTP_RANGE='bytes=10-19')
+
+        self.assertEqual((response.status_code, body), (200, b''))
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected/{self.name}')
+
+    def test_missing_file(self):
+        os.remove(resume_storage.path(self.name))
+
+        with self.assertRaises(Http404):
+            self.get()
+
+
+class StreamZipTests(MediaTestCase):
+
+    def test_archive_of_stored_files(self):
+        large = os.urandom(CHUNK_SIZE * 2 + 10)
+        entries = [
+            ('asha-rao.pdf', self.store(b'%PDF-1.4 ' + large)),
+            ('missing.pdf', 'resumes/00/missing.pdf'),
+            ('ravi-kumar.txt', self.store(b'Python ' * 1000, 'resumes/resume.txt')),
+        ]
+
+        with self.assertLogs('accounts.downloads', 'WARNING'):
+            chunks = list(stream_zip(resume_storage, entries))
+
+        # Written as it is read, not buffered whole
+        self.assertGreater(len(chunks), 3)
+        self.assertLess(max(len(chunk) for chunk in chunks), CHUNK_SIZE * 2)
+        with zipfile.ZipFile(BytesIO(b''.join(chunks))) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(archive.namelist(), ['asha-rao.pdf', 'ravi-kumar.txt'])
+            self.assertEqual(archive.read('asha-rao.pdf'), b'%PDF-1.4 ' + large)
+            self.assertEqual(archive.read('ravi-kumar.txt'), b'Python ' * 1000)
+            # PDFs are already compressed
+            self.assertEqual(
+                [info.compress_type for info in archive.infolist()], [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED]
+            )
+
+    def test_empty_archive(self):
+        with self.assertLogs('accounts.downloads', 'WARNING'):
+            data = b''.join(stream_zip(resume_storage, [('missing.pdf', 'resumes/00/missing.pdf')]))
+
+        with zipfile.ZipFile(BytesIO(data)) as archive:
+            self.assertEqual(archive.namelist(), [])
+
+
+class ResumeStorageTests(MediaTestCase):
+
+    def test_same_content_is_stored_once(self):
+        first = self.store(b'%PDF-1.4 resume', 'resumes/asha.pdf', age=7200)
+
+        second = self.store(b'%PDF-1.4 resume', 'resumes/ravi.PDF')
+        other = self.store(b'%PDF-1.4 other resume', 'resumes/asha.pdf')
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertRegex(first, r'^resumes/[0-9a-f]{2}/[0-9a-f]{64}\.pdf$')
+        self.assertEqual(resume_storage.open(first).read(), b'%PDF-1.4 resume')
+        self.assertEqual(sum(len(files) for _, _, files in os.walk(resume_storage.path('resumes'))), 2)
+        # Stored again just now, so gc_resumes keeps it for its grace period
+        self.assertGreater(os.stat(resume_storage.path(first)).st_mtime, time.time() - 60)
+
+    def test_gc_deletes_stale_unreferenced_files(self):
+        referenced = self.store(b'referenced', age=7200)
+        recent = self.store(b'recent', age=60)
+        stale = self.store(b'stale', age=7200)
+        StudentProfile.objects.create(
+            user=User.objects.create_user('student', 'student@example.com', 'pw', user_type='student'),
+            roll_number='R1', department='CSE', year_of_graduation=2026, resume=referenced,
+        )
+
+        out = StringIO()
+        call_command('gc_resumes', '--dry-run', stdout=out)
+        self.assertEqual(out.getvalue().splitlines(), [stale, "Would delete 1 unreferenced resume file(s), 5 bytes"])
+        self.assertTrue(resume_storage.exists(stale))
+
+        call_command('gc_resumes', stdout=StringIO())
+        self.assertEqual(
+            [resume_storage.exists(name) for name in (referenced, recent, stale)], [True, True, False]
+        )
+
+        call_command('gc_resumes', '--grace', '0', stdout=StringIO())
+        self.assertEqual([resume_storage.exists(name) for name in (referenced, recent)], [True, False])
+
+
+class AccountViewBudgetTests(ViewTestCase):
+    """Every budgeted view of accounts/views.py, within its budget"""
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings = override_settings(MEDIA_ROOT=media.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_pages(self):
+        self.get_pages(self.students[0].user, [
+            reverse('student_profile'), reverse('resume_builder'), reverse('notifications'),
+        ])
+        self.get_pages(self.company_user, [reverse('company_profile'), reverse('notifications')])
+        self.get_pages(self.officer, [reverse('bulk_import'), reverse('notifications')])
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('register')).status_code, 200)
+
+    def test_register(self):
+        for user_type, profile in (('student', 'student_profile'), ('company', 'company_profile')):
+            with self.subTest(user_type=user_type):
+                response = self.client.post(reverse('register'), {
+                    'username': f'new{user_type}', 'email': f'new{user_type}@example.com', 'user_type': user_type,
+                    'password1': 'correct horse battery', 'password2': 'correct horse battery',
+                })
+                self.assertRedirects(response, reverse(profile), fetch_redirect_response=False)
+                self.client.logout()
+
+    def test_student_profile(self):
+        self.client.force_login(self.students[0].user)
+
+        self.client.post(reverse('student_profile'), {
+            'username': 'student0', 'email': 'student0@example.com', 'first_name': 'Asha', 'last_name': 'Rao',
+            'phone_number': '', 'roll_number': 'R0', 'department': 'CSE', 'year_of_graduation': 2026,
+            'cgpa': '8.5', 'skills': 'Python, SQL', 'bio': '', 'linkedin_profile': '', 'github_profile': '',
+        })
+
+        self.students[0].refresh_from_db()
+        self.assertEqual(self.students[0].skills, 'Python, SQL')
+
+    def test_company_profile(self):
+        self.client.force_login(self.company_user)
+
+        self.client.post(reverse('company_profile'), {
+            'username': 'acme', 'email': 'hr@acme.example', 'first_name': '', 'last_name': '', 'phone_number': '',
+            'company_name': 'Acme Tools', 'industry': 'Software', 'description': 'Tools',
+            'website': 'https://acme.example', 'address': 'Pune', 'established_year': 1999,
+        })
+
+        self.company.refresh_from_db()
+        self.assertEqual(self.company.company_name, 'Acme Tools')
+
+    def test_resume_upload_and_download(self):
+        student = self.students[0]
+        self.client.force_login(student.user)
+
+        self.client.post(reverse('resume_builder'), {
+            'resume': SimpleUploadedFile('resume.pdf', b'%PDF-1.4 resume', content_type='application/pdf'),
+        })
+        student.refresh_from_db()
+        self.assertTrue(student.resume)
+
+        for user in (student.user, self.company_user, self.officer):
+            self.client.force_login(user)
+            with self.subTest(user=user.username):
+                response = self.client.get(reverse('resume_download', args=[student.pk]))
+                self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4 resume')
+
+    def test_notifications(self):
+        user = self.students[0].user
+        Notification.objects.bulk_create(
+            Notification(user=user, title=f"Update {i}", message="Body") for i in range(25)
+        )
+        self.client.force_login(user)
+
+        response = self.client.get(reverse('notifications'))
+        self.client.get(reverse('notifications'), {'cursor': response.context['page'].next_cursor})
+
+        self.assertFalse(user.notifications.filter(read=False).exists())
+
+    def test_logout(self):
+        self.client.force_login(self.students[0].user)
+
+        self.client.get(reverse('logout'))
+
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    def test_bulk_import(self):
+        rows = "username,email,roll_number,department,year_of_graduation\n" + "".join(
+            f"import{i},import{i}@example.com,I{i},CSE,2026\n" for i in range(3)
+        )
+        self.client.force_login(self.officer)
+
+        for dry_run in ('on', ''):
+            self.client.post(reverse('bulk_import'), {
+                'user_type': 'student', 'dry_run': dry_run,
+                'file': SimpleUploadedFile('students.csv', rows.encode(), content_type='text/csv'),
+            })
+
+        self.assertEqual(StudentProfile.objects.filter(roll_number__startswith='I').count(), 3)
+
+    @override_settings(IMPORT_HASH_WORKERS=4)
+    def test_bulk_import_hashes_in_the_request(self):
+        rows = "username,email,password,roll_number,department,year_of_graduation\n" + "".join(
+            f"import{i},import{i}@example.com,secret{i},I{i},CSE,2026\n" for i in range(3)
+        )
+        self.client.force_login(self.officer)
+
+        with mock.patch.object(imports, 'POOL_THRESHOLD', 1), \
+                mock.patch('accounts.imports.ProcessPoolExecutor') as pool:
+            self.client.post(reverse('bulk_import'), {
+                'user_type': 'student', 'file': SimpleUploadedFile('students.csv', rows.encode(), content_type='text/csv'),
+            })
+
+        pool.assert_not_called()
+        self.assertTrue(User.objects.get(username='import2').check_password('secret2'))
+
+    def test_bulk_import_of_a_large_file_is_refused(self):
+        header = "username,email,password,roll_number,department,year_of_graduation\n"
+        files = {
+            'rows': header + "".join(f"import{i},import{i}@example.com,,I{i},CSE,2026\n" for i in range(3)),
+            'passwords': header + "".join(f"import{i},import{i}@example.com,pw,I{i},CSE,2026\n" for i in range(2)),
+        }
+        self.client.force_login(self.officer)
+
+        for kind, rows in files.items():
+            with self.subTest(kind=kind), mock.patch.object(imports, 'REQUEST_MAX_ROWS', 2), \
+                    mock.patch.object(imports, 'REQUEST_MAX_PASSWORDS', 2):
+                response = self.client.post(reverse('bulk_import'), {
+                    'user_type': 'student', 'dry_run': 'on',
+                    'file': SimpleUploadedFile('students.csv', rows.encode(), content_type='text/csv'),
+                })
+                [(line, message)] = response.context['errors']
+                self.assertIn('import_users command', message)
+
+        self.assertFalse(User.objects.filter(username__startswith='import').exists())
@@ -27,6 +27,10 @@ urlpatterns = [
     path('profile/student/', views.student_profile, name='student_profile'),
     path('profile/company/', views.company_profile, name='company_profile'),
     path('resume-builder/', views.resume_builder, name='resume_builder'),
+    path('resume/<int:student_id>/', views.resume_download, name='resume_download'),
+    
+    # Bulk user import
+    path('import/', views.bulk_import, name='bulk_import'),
     
     # Notification URLs
     path('notifications/', views.notifications, name='notifications'),
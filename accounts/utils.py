@@ -1,12 +1,31 @@
-from django.core.mail import send_mail
 from django.conf import settings
 
+from .models import OutboxEmail
+
 
 def send_email(subject, message, recipient):
-    send_mail(
+    """
+    Queue an email in the outbox.
+    The row is written in the caller's transaction, so the email goes out
+    only if the surrounding change commits; delivery happens in the
+    process_outbox worker.
+    """
+    return OutboxEmail.objects.create(
         subject=subject,
         message=message,
         from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[recipient],
-        fail_silently=False,
+        recipient=recipient,
+    )
+
+
+def send_emails(emails):
+    """Queue many (subject, message, recipient) emails with one INSERT"""
+    return OutboxEmail.objects.bulk_create(
+        OutboxEmail(
+            subject=subject,
+            message=message,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipient=recipient,
+        )
+        for subject, message, recipient in emails
     )
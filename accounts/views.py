@@ -1,3 +1,6 @@
+import io
+import os
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required
@@ -6,11 +9,31 @@ from django.urls import reverse_lazy
 from django.views.generic import CreateView, UpdateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http import HttpResponseRedirect
+from django.utils.text import slugify
 from .models import User, StudentProfile, CompanyProfile, Notification
+from .decorators import query_budget
+from .middleware import require_profile
+from . import imports
+from .downloads import serve_file
+from .storage import resume_storage
+from .pagination import CursorPaginator
+from .resumes import queue_extraction
+from dashboard.feed import announcements_for, merged_feed, mark_announcements_seen
+from jobs.models import JobApplication
 from .forms import (
     UserRegistrationForm, StudentProfileForm, CompanyProfileForm, 
-    UserUpdateForm, ResumeUploadForm
+    UserUpdateForm, ResumeUploadForm, UserImportForm
 )
+
+NOTIFICATIONS_PER_PAGE = 20
+
+# Queries of a user import besides its chunk, and of the chunk; a web
+# request imports at most imports.REQUEST_MAX_ROWS rows, one chunk
+IMPORT_BASE_BUDGET = 12
+IMPORT_CHUNK_BUDGET = 30
+
+
+@query_budget(15)
 def register(request):
     """
     Handle user registration with different user types
@@ -43,6 +66,7 @@ def register(request):
     
     return render(request, 'accounts/register.html', {'form': form})
 @login_required
+@query_budget(10)
 def student_profile(request):
     """
     Handle student profile creation and updates
@@ -52,9 +76,8 @@ def student_profile(request):
         return redirect('home')
     
     # Try to get existing profile, or initialize with default values if creating new one
-    try:
-        profile = StudentProfile.objects.get(user=request.user)
-    except StudentProfile.DoesNotExist:
+    profile = request.profile
+    if not profile:
         # Create with default values for required fields
         profile = StudentProfile(
             user=request.user,
@@ -85,6 +108,7 @@ def student_profile(request):
     
     return render(request, 'accounts/profile.html', context)
 @login_required
+@query_budget(10)
 def company_profile(request):
     """
     Handle company profile creation and updates
@@ -93,7 +117,7 @@ def company_profile(request):
         messages.error(request, "You don't have access to this page.")
         return redirect('home')
     
-    profile = CompanyProfile.objects.get_or_create(user=request.user)[0]
+    profile = request.profile or CompanyProfile.objects.get_or_create(user=request.user)[0]
     
     if request.method == 'POST':
         user_form = UserUpdateForm(request.POST, instance=request.user)
@@ -116,6 +140,7 @@ def company_profile(request):
     
     return render(request, 'accounts/profile.html', context)
 @login_required
+@query_budget(8)
 def resume_builder(request):
     """
     Resume builder and uploader for students
@@ -124,32 +149,69 @@ def resume_builder(request):
         messages.error(request, "Only students can access the resume builder.")
         return redirect('home')
     
-    profile = get_object_or_404(StudentProfile, user=request.user)
+    profile = require_profile(request)
     
     if request.method == 'POST':
         form = ResumeUploadForm(request.POST, request.FILES, instance=profile)
         if form.is_valid():
-            form.save()
+            profile = form.save()
+            # Text and skills are extracted by the process_resumes worker
+            queue_extraction(profile)
             messages.success(request, 'Your resume has been updated successfully!')
             return redirect('student_dashboard')
     else:
         form = ResumeUploadForm(instance=profile)
     
     return render(request, 'accounts/resume_builder.html', {'form': form})
+def can_view_resume(user, student):
+    """Students see their own resume, officers every resume, companies those of their applicants"""
+    if user.is_officer or user.pk == student.user_id:
+        return True
+    return user.is_company and JobApplication.objects.filter(student=student, job__company__user=user).exists()
+
+
 @login_required
+@query_budget(5)
+def resume_download(request, student_id):
+    """
+    Serve a student's resume to the users allowed to see it
+    """
+    student = get_object_or_404(StudentProfile.objects.select_related('user'), pk=student_id)
+    if not can_view_resume(request.user, student):
+        messages.error(request, "You do not have permission to view this resume.")
+        return redirect('home')
+    if not student.resume:
+        messages.error(request, "This student has not uploaded a resume.")
+        return redirect('home')
+    extension = os.path.splitext(student.resume.name)[1].lower()
+    name = slugify(student.user.get_full_name() or student.user.username)
+    return serve_file(request, resume_storage, student.resume.name, f"{name}-resume{extension}")
+
+
+@login_required
+@query_budget(9)
 def notifications(request):
-    """View all notifications"""
-    user_notifications = request.user.notifications.all()
+    """View notifications merged with the announcements for the user"""
+    paginator = CursorPaginator(request.user.notifications.all(), NOTIFICATIONS_PER_PAGE, ('-created_at', '-id'))
+    page = paginator.get_page(request.GET)
+    
+    # Active announcements are current by nature, so they are merged into
+    # the first page only
+    announcements = announcements_for(request.user) if not page.has_previous() else []
+    feed = merged_feed(request.user, page, announcements)
     
-    # Mark all as read
-    unread = user_notifications.filter(read=False)
-    if unread:
-        unread.update(read=True)
+    # Mark only what is displayed as read
+    unread_ids = [notification.id for notification in page if not notification.read]
+    if unread_ids:
+        Notification.objects.mark_read(request.user, unread_ids)
+    mark_announcements_seen(request.user, announcements)
     
     return render(request, 'accounts/notifications.html', {
-        'notifications': user_notifications
+        'notifications': feed,
+        'page': page,
     })
 @login_required
+@query_budget(6)
 def logout_view(request):
     """Handle user logout and clear session"""
     # Clear all session data
@@ -160,4 +222,58 @@ def logout_view(request):
     
     # Redirect to login page
     messages.success(request, 'You have been logged out successfully.')
-    return redirect('login')
\ No newline at end of file
+    return redirect('login')
+
+
+@login_required
+@query_budget(IMPORT_BASE_BUDGET + IMPORT_CHUNK_BUDGET)
+def bulk_import(request):
+    """
+    Import students or companies from a small CSV file (placement
+    officers only); larger files are imported with the import_users
+    command.
+    """
+    if not request.user.is_officer:
+        messages.error(request, "Only placement officers can import users.")
+        return redirect('home')
+
+    errors = []
+    if request.method == 'POST':
+        form = UserImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            user_type = form.cleaned_data['user_type']
+            file = io.TextIOWrapper(form.cleaned_data['file'], encoding='utf-8-sig', newline='')
+            try:
+                result = imports.import_users(
+                    file, user_type, dry_run=form.cleaned_data['dry_run'], in_request=True,
+                )
+            except UnicodeDecodeError:
+                messages.error(request, "The file is not UTF-8 encoded CSV.")
+            except imports.ImportValidationError as exc:
+                errors = exc.errors
+                messages.error(request, f"Nothing was imported: {exc}.")
+            else:
+                noun = {'student': ('student', 'students'), 'company': ('company', 'companies')}
+                noun = noun[user_type][result.rows != 1]
+                if form.cleaned_data['dry_run']:
+                    messages.info(request, f"The file is valid: {result.rows} {noun} would be imported.")
+                else:
+                    messages.success(
+                        request,
+                        f"Imported {result.rows} {noun} in {result.seconds:.1f}s "
+                        f"({result.rows_per_second:.0f} rows/s).",
+                    )
+                return redirect('bulk_import')
+    else:
+        form = UserImportForm()
+
+    return render(request, 'accounts/bulk_import.html', {
+        'form': form,
+        'errors': errors,
+        'max_rows': imports.REQUEST_MAX_ROWS,
+        'max_passwords': imports.REQUEST_MAX_PASSWORDS,
+        'columns': {
+            user_type: (imports.USER_COLUMNS + columns, required)
+            for user_type, (_, columns, required) in imports.KINDS.items()
+        },
+    })
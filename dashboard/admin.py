@@ -12,6 +12,11 @@ class PlacementStatisticsAdmin(admin.ModelAdmin):
     list_display = ('department', 'season', 'total_students', 'placed_students', 'placement_percentage', 'average_package')
     list_filter = ('season', 'department')
     search_fields = ('department',)
+    # Maintained from the application data by dashboard/placement_stats.py
+    readonly_fields = (
+        'total_students', 'placed_students', 'highest_package', 'average_package',
+        'total_companies_visited', 'offers', 'package_total',
+    )
 
 @admin.register(Announcement)
 class AnnouncementAdmin(admin.ModelAdmin):
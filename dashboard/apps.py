@@ -10,4 +10,7 @@ from django.apps import AppConfig
 
 class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'dashboard'
\ No newline at end of file
+    name = 'dashboard'
+    
+    def ready(self):
+        import dashboard.signals
@@ -0,0 +1,86 @@
+"""
+Data of the dashboard charts.
+
+Each function returns ``{'labels': [...], 'datasets': [{'key', 'label',
+'data'}, ...]}``, served as JSON by the chart endpoints in
+dashboard/views.py and drawn by static/js/charts.js. Every function
+reads only counters, PlacementStatistics or activity rollups.
+"""
+from django.db.models import Count, Q
+
+from jobs.models import JobApplication, JobPosting
+from .models import PlacementStatistics
+from .rollups import activity
+from .snapshots import STATUS_KEYS, officer_counts
+
+APPLICATION_STATUSES = (
+    ('applied', 'Pending'),
+    ('under_review', 'Under Review'),
+    ('shortlisted', 'Shortlisted'),
+    ('selected', 'Selected'),
+    ('rejected', 'Rejected'),
+)
+
+ACTIVITY_SERIES = (
+    ('jobs', 'Job Postings'),
+    ('applications', 'Applications'),
+    ('interviews', 'Interviews'),
+    ('selections', 'Selections'),
+)
+
+
+def application_status(company=None):
+    """Applications by status: all of them, or those to one company's jobs"""
+    if company is None:
+        counts = officer_counts()
+        data = [counts.get(f'applications:{status}', 0) for status, _ in APPLICATION_STATUSES]
+    else:
+        counts = JobApplication.objects.filter(job__company=company).aggregate(**{
+            status: Count('id', filter=Q(status=status)) for status in STATUS_KEYS
+        })
+        data = [counts[status] for status, _ in APPLICATION_STATUSES]
+    return {
+        'labels': [label for _, label in APPLICATION_STATUSES],
+        'datasets': [{'key': 'applications', 'label': 'Applications', 'data': data}],
+    }
+
+
+def placement_rate(season):
+    """Placement percentage per department of a season"""
+    stats = PlacementStatistics.objects.filter(season=season).order_by('department') if season else []
+    return {
+        'labels': [stat.department for stat in stats],
+        'datasets': [{
+            'key': 'placement_rate',
+            'label': 'Placement Rate (%)',
+            'data': [round(stat.placement_percentage, 1) for stat in stats],
+        }],
+    }
+
+
+def _season_activity(season):
+    return activity(season.start_date, season.end_date) if season else None
+
+
+def job_types(season):
+    """Job postings of a season by job type"""
+    counts = _season_activity(season)['by_job_type']['jobs'] if season else {}
+    choices = [(job_type, label) for job_type, label in JobPosting.JOB_TYPE_CHOICES if counts.get(job_type)]
+    return {
+        'labels': [label for _, label in choices],
+        'datasets': [{'key': 'jobs', 'label': 'Job Postings', 'data': [counts[job_type] for job_type, _ in choices]}],
+    }
+
+
+def monthly_activity(season):
+    """Job postings, applications, interviews and selections per month of a season"""
+    season_activity = _season_activity(season)
+    if season_activity is None:
+        return {'labels': [], 'datasets': []}
+    return {
+        'labels': [month.strftime('%b %Y') for month in season_activity['months']],
+        'datasets': [
+            {'key': metric, 'label': label, 'data': season_activity['monthly'][metric]}
+            for metric, label in ACTIVITY_SERIES
+        ],
+    }
@@ -0,0 +1,204 @@
+"""
+Streaming exports of applications, interviews and placement statistics.
+
+Rows are read as value tuples in primary key order, one keyset batch of
+chunk_size rows per query, so neither model instances nor the whole
+result set are held in memory on any backend (MySQLdb buffers a whole
+result set even through QuerySet.iterator()). Each batch is written as
+soon as it is read: CSV rows as text, XLSX rows into a zip stream (see
+dashboard/xlsx.py). The export views send the output through a
+StreamingHttpResponse and the export_data command writes it to a file.
+
+Filters follow the listing pages: status, season (students graduating
+in the season, as in dashboard/placement_stats.py), company and
+department.
+"""
+import csv
+from collections import namedtuple
+from datetime import datetime
+
+from django.utils import timezone
+
+from jobs.models import Interview, JobApplication
+from .models import PlacementSeason, PlacementStatistics
+from .xlsx import xlsx_chunks
+
+CHUNK_SIZE = 2000
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# columns are (header, field) pairs; filters map a filter name to its field
+Dataset = namedtuple('Dataset', 'title queryset columns filters')
+
+DATASETS = {
+    'applications': Dataset(
+        'Applications',
+        JobApplication.objects.all,
+        (
+            ('ID', 'pk'),
+            ('Applied At', 'applied_at'),
+            ('Status', 'status'),
+            ('First Name', 'student__user__first_name'),
+            ('Last Name', 'student__user__last_name'),
+            ('Email', 'student__user__email'),
+            ('Roll Number', 'student__roll_number'),
+            ('Department', 'student__department'),
+            ('Graduation Year', 'student__year_of_graduation'),
+            ('CGPA', 'student__cgpa'),
+            ('Company', 'job__company__company_name'),
+            ('Job', 'job__title'),
+            ('Job Type', 'job__job_type'),
+            ('Updated At', 'updated_at'),
+        ),
+        {
+            'status': 'status',
+            'season': 'student__year_of_graduation',
+            'company': 'job__company_id',
+            'department': 'student__department',
+        },
+    ),
+    'interviews': Dataset(
+        'Interviews',
+        Interview.objects.all,
+        (
+            ('ID', 'pk'),
+            ('Date and Time', 'date_time'),
+            ('Type', 'interview_type'),
+            ('Status', 'status'),
+            ('Location', 'location'),
+            ('Meeting Link', 'meeting_link'),
+            ('Interviewer', 'interviewer'),
+            ('First Name', 'application__student__user__first_name'),
+            ('Last Name', 'application__student__user__last_name'),
+            ('Roll Number', 'application__student__roll_number'),
+            ('Department', 'application__student__department'),
+            ('Company', 'application__job__company__company_name'),
+            ('Job', 'application__job__title'),
+            ('Application Status', 'application__status'),
+        ),
+        {
+            'status': 'status',
+            'season': 'application__student__year_of_graduation',
+            'company': 'application__job__company_id',
+            'department': 'application__student__department',
+        },
+    ),
+    'statistics': Dataset(
+        'Placement Statistics',
+        PlacementStatistics.objects.all,
+        (
+            ('Season', 'season__year'),
+            ('Department', 'department'),
+            ('Total Students', 'total_students'),
+            ('Placed Students', 'placed_students'),
+            ('Offers', 'offers'),
+            ('Highest Package', 'highest_package'),
+            ('Average Package', 'average_package'),
+            ('Companies', 'total_companies_visited'),
+        ),
+        {
+            'season': 'season_id',
+            'department': 'department',
+        },
+    ),
+}
+
+
+class ExportError(ValueError):
+    pass
+
+
+def export_queryset(name, status=None, season=None, company=None, department=None):
+    """
+    Return the Dataset and filtered queryset of an export. Raises
+    ExportError for an unknown dataset or season.
+    """
+    dataset = DATASETS.get(name)
+    if dataset is None:
+        raise ExportError(f"Unknown export {name!r}; choose from {', '.join(DATASETS)}.")
+    values = {'status': status, 'season': season, 'company': company, 'department': department}
+    queryset = dataset.queryset()
+    for key, value in values.items():
+        if not value or key not in dataset.filters:
+            continue
+        if key == 'season':
+            season_obj = PlacementSeason.objects.filter(pk=value).first() if str(value).isdigit() else None
+            if season_obj is None:
+                raise ExportError(f"Unknown placement season {value!r}.")
+            # Statistics rows belong to a season; students graduate in its end year
+            value = season_obj.pk if name == 'statistics' else season_obj.end_date.year
+        elif key == 'company' and not str(value).isdigit():
+            raise ExportError(f"Invalid company id {value!r}.")
+        queryset = queryset.filter(**{dataset.filters[key]: value})
+    return dataset, queryset
+
+
+def export_rows(dataset, queryset, chunk_size=CHUNK_SIZE):
+    """Yield the value tuples of the dataset's columns, one keyset batch per query"""
+    fields = [field for _, field in dataset.columns]
+    rows = queryset.order_by('pk').values_list('pk', *fields)
+    last_pk = None
+    while True:
+        batch = list((rows if last_pk is None else rows.filter(pk__gt=last_pk))[:chunk_size])
+        for row in batch:
+            yield row[1:]
+        if len(batch) < chunk_size:
+            return
+        last_pk = batch[-1][0]
+
+
+# Leading characters that make a spreadsheet read a cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def cell_value(value):
+    """
+    Datetimes are exported in local time, without seconds. Text that a
+    spreadsheet would run as a formula (names, feedback and other text
+    users typed in) is prefixed with a quote, which keeps it text.
+    """
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime('%Y-%m-%d %H:%M')
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class _Echo:
+    """File-like object returning what is written, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def csv_chunks(dataset, rows, rows_per_chunk=500):
+    """
+    Yield the CSV output as UTF-8 chunks of rows_per_chunk rows; the byte
+    order mark makes Excel read it as UTF-8
+    """
+    writer = csv.writer(_Echo())
+    chunk = ['\ufeff', writer.writerow([header for header, _ in dataset.columns])]
+    for row in rows:
+        chunk.append(writer.writerow(row))
+        if len(chunk) >= rows_per_chunk:
+            yield ''.join(chunk).encode()
+            chunk = []
+    if chunk:
+        yield ''.join(chunk).encode()
+
+
+def export_chunks(dataset, queryset, file_format, chunk_size=CHUNK_SIZE):
+    """Yield the export in the given format ('csv' or 'xlsx') as byte chunks"""
+    rows = (tuple(map(cell_value, row)) for row in export_rows(dataset, queryset, chunk_size))
+    if file_format == 'xlsx':
+        return xlsx_chunks(dataset.title, [header for header, _ in dataset.columns], rows)
+    return csv_chunks(dataset, rows)
+
+
+def export_filename(name, file_format):
+    return f"{name}-{timezone.localdate():%Y%m%d}.{file_format}"
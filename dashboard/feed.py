@@ -0,0 +1,128 @@
+"""
+Read-time announcement feed.
+
+Announcements are not copied into per-user Notification rows. A user's
+feed is the merge, at read time, of their own notifications and the
+active announcements for their audience; whether an announcement is new
+is decided by a per-user watermark (User.announcements_seen_at) rather
+than a per-row read flag.
+
+Active announcements are cached in process per audience. An entry is
+dropped when an announcement is saved or deleted (see
+dashboard/signals.py) and is never kept past the earliest expiry among
+its announcements or ANNOUNCEMENT_CACHE_TTL seconds, which bounds how
+stale other processes can be. Callers that know the current
+``announcements`` version (see dashboard/versions.py) pass it to reload
+an entry cached under an older one.
+"""
+import threading
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Announcement
+
+DEFAULT_CACHE_TTL = 60
+
+# Most announcements held per audience
+ANNOUNCEMENT_LIMIT = 50
+
+AUDIENCE_BY_USER_TYPE = {
+    'student': 'students',
+    'company': 'companies',
+    'officer': 'officers',
+}
+
+FeedItem = namedtuple('FeedItem', 'kind title message created_at unread obj')
+
+_cache = {}  # audience -> (valid_until, version, [Announcement, ...])
+_lock = threading.Lock()
+
+
+def invalidate():
+    """Drop every cached announcement list"""
+    with _lock:
+        _cache.clear()
+
+
+def active_announcements(audience=None, version=None):
+    """
+    Return the active, unexpired announcements for an audience (all of
+    them when audience is None), newest first. The list is shared between
+    requests and must not be modified.
+    """
+    now = timezone.now()
+    entry = _cache.get(audience)
+    if entry is not None and entry[0] > now and (version is None or entry[1] == version):
+        return entry[2]
+
+    # is_active=True would compile to a bare "WHERE is_active", which the
+    # index on (is_active, created_at) cannot serve
+    announcements = Announcement.objects.filter(is_active__in=(True,)).filter(
+        Q(expires_at__isnull=True) | Q(expires_at__gt=now)
+    ).select_related('created_by').order_by('-created_at')
+    if audience is not None:
+        announcements = announcements.filter(audience__in=('all', audience))
+    announcements = list(announcements[:ANNOUNCEMENT_LIMIT])
+
+    ttl = getattr(settings, 'ANNOUNCEMENT_CACHE_TTL', DEFAULT_CACHE_TTL)
+    valid_until = min(
+        [now + timedelta(seconds=ttl)]
+        + [announcement.expires_at for announcement in announcements if announcement.expires_at]
+    )
+    with _lock:
+        _cache[audience] = (valid_until, version, announcements)
+    return announcements
+
+
+def announcements_for(user, version=None):
+    """Return the active announcements addressed to a user"""
+    return active_announcements(AUDIENCE_BY_USER_TYPE.get(user.user_type, 'all'), version)
+
+
+def is_unseen(user, announcement):
+    seen_at = user.announcements_seen_at
+    return seen_at is None or announcement.created_at > seen_at
+
+
+def unseen_announcement_count(user):
+    """Number of a user's announcements newer than their watermark"""
+    return sum(1 for announcement in announcements_for(user) if is_unseen(user, announcement))
+
+
+def merged_feed(user, notifications, announcements=None):
+    """
+    Merge notifications with a user's announcements into FeedItems,
+    newest first.
+    """
+    if announcements is None:
+        announcements = announcements_for(user)
+    items = [
+        FeedItem('notification', notification.title, notification.message,
+                 notification.created_at, not notification.read, notification)
+        for notification in notifications
+    ]
+    items.extend(
+        FeedItem('announcement', announcement.title, announcement.content,
+                 announcement.created_at, is_unseen(user, announcement), announcement)
+        for announcement in announcements
+    )
+    items.sort(key=lambda item: item.created_at, reverse=True)
+    return items
+
+
+def mark_announcements_seen(user, announcements):
+    """Advance the user's watermark to the newest of the given announcements"""
+    if not announcements:
+        return
+    newest = max(announcement.created_at for announcement in announcements)
+    if user.announcements_seen_at is not None and user.announcements_seen_at >= newest:
+        return
+    get_user_model().objects.filter(pk=user.pk).filter(
+        Q(announcements_seen_at__isnull=True) | Q(announcements_seen_at__lt=newest)
+    ).update(announcements_seen_at=newest)
+    user.announcements_seen_at = newest
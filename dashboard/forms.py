@@ -1,5 +1,5 @@
 from django import forms
-from .models import PlacementSeason, PlacementStatistics, Announcement, Event
+from .models import PlacementSeason, Announcement, Event
 from accounts.models import CompanyProfile
 
 class PlacementSeasonForm(forms.ModelForm):
@@ -23,26 +23,6 @@ class PlacementSeasonForm(forms.ModelForm):
         return cleaned_data
 
 
-class PlacementStatisticsForm(forms.ModelForm):
-    """Form for updating placement statistics"""
-    class Meta:
-        model = PlacementStatistics
-        fields = [
-            'department', 'total_students', 'placed_students', 
-            'highest_package', 'average_package', 'total_companies_visited'
-        ]
-    
-    def clean(self):
-        cleaned_data = super().clean()
-        total_students = cleaned_data.get('total_students')
-        placed_students = cleaned_data.get('placed_students')
-        
-        if total_students and placed_students and placed_students > total_students:
-            raise forms.ValidationError("Placed students cannot be greater than total students.")
-        
-        return cleaned_data
-
-
 class AnnouncementForm(forms.ModelForm):
     """Form for creating announcements"""
     class Meta:
@@ -0,0 +1,169 @@
+"""
+Versioned template fragment cache for the dashboards.
+
+The {% versioned_cache name vary_on... %} tag (dashboard/templatetags/
+dashboard_cache.py) stores a rendered fragment under its name and the
+values it varies on. Each dashboard fragment varies on the role or user
+it is rendered for and on the data versions it shows (see
+dashboard/versions.py), which are bumped once a save to a job posting,
+application, interview, announcement, event or profile commits. A
+changed version gives the fragment a new key, so entries are never
+served stale and need no expiry; old entries are culled by the cache.
+
+Fragments of a student or company dashboard only show the owner's own
+applications, interviews (and, for a company, job postings), so they
+read those versions per owner: a save bumps the global version, which
+the officer fragments use, and the versions of the student and company
+it belongs to (see owner_versions()).
+
+The versions are read from the database in one query per request, so
+processes with separate caches (locmem) or a shared one (file based,
+memcached) agree on them. Fragments listing upcoming items or open jobs
+also vary on ``clock``, which advances every DASHBOARD_FRAGMENT_CLOCK
+seconds so that items whose time has passed drop out.
+
+Hits and misses are counted per fragment in the same cache (see
+fragment_stats()). Each count is a cache write, a file write with the
+file based cache, so only a sample of DASHBOARD_FRAGMENT_STATS_SAMPLE of
+the renders is counted, each as 1 / DASHBOARD_FRAGMENT_STATS_SAMPLE.
+"""
+import hashlib
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from jobs.models import Interview, JobApplication, JobPosting
+from .versions import current
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CLOCK = 300
+
+DEFAULT_STATS_SAMPLE = 1
+
+KEY_PREFIX = 'dashboard-fragment'
+
+# Versions the dashboard fragments vary on
+FRAGMENT_VERSIONS = (
+    'job_postings', 'job_applications', 'interviews', 'announcements', 'events', 'profiles',
+    'applications', 'placement',
+)
+
+# Versions the fragments of a student or company dashboard read per owner
+OWNER_VERSIONS = {
+    'student': ('job_applications', 'interviews'),
+    'company': ('job_postings', 'job_applications', 'interviews'),
+}
+
+# Every fragment name used with {% versioned_cache %}
+FRAGMENTS = (
+    'student_application_count',  # profile card of the student dashboard
+    'student_stats',
+    'student_interviews',
+    'student_applications',
+    'student_recommended_jobs',
+    'company_totals',
+    'company_stats',
+    'company_application_stats',
+    'company_interviews',
+    'company_recent_applications',
+    'company_announcements',
+    'officer_events',
+    'officer_totals',
+    'officer_department_stats',
+    'officer_application_stats',
+    'officer_recent_activity',
+    'officer_announcements',
+)
+
+
+def fragment_cache():
+    return caches[getattr(settings, 'DASHBOARD_FRAGMENT_CACHE', 'default')]
+
+
+def owner_version(name, owner, pk):
+    """Name of the version of a student's or company's own rows"""
+    return f'{name}:{owner}:{pk}'
+
+
+def owner_versions(instance):
+    """Per-owner versions to bump with the global one when a row changes"""
+    if isinstance(instance, JobPosting):
+        return [owner_version('job_postings', 'company', instance.company_id)]
+    if isinstance(instance, JobApplication):
+        name, application = 'job_applications', instance
+    elif isinstance(instance, Interview):
+        name, application = 'interviews', instance.application
+    else:
+        return []
+    return [
+        owner_version(name, 'student', application.student_id),
+        owner_version(name, 'company', application.job.company_id),
+    ]
+
+
+def fragment_versions(owner=None, pk=None):
+    """
+    Return {name: version} for the dashboard fragments, plus the clock.
+    For a student or company (owner='student' or 'company' and its pk),
+    the versions of OWNER_VERSIONS are the owner's own.
+    """
+    names = {name: name for name in FRAGMENT_VERSIONS}
+    for name in OWNER_VERSIONS.get(owner, ()):
+        names[name] = owner_version(name, owner, pk)
+    stored = current(*names.values())
+    versions = {name: stored[stored_name] for name, stored_name in names.items()}
+    versions['clock'] = int(time.time() // getattr(settings, 'DASHBOARD_FRAGMENT_CLOCK', DEFAULT_CLOCK))
+    return versions
+
+
+def fragment_key(name, vary_on):
+    digest = hashlib.md5(':'.join(str(value) for value in vary_on).encode()).hexdigest()
+    return f'{KEY_PREFIX}:{name}:{digest}'
+
+
+def _count(name, outcome):
+    sample = getattr(settings, 'DASHBOARD_FRAGMENT_STATS_SAMPLE', DEFAULT_STATS_SAMPLE)
+    if random.random() >= sample:
+        return
+    cache = fragment_cache()
+    key = f'{KEY_PREFIX}-stats:{name}:{outcome}'
+    delta = round(1 / sample)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # No counter yet; a concurrent first add may lose one count
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+def get_fragment(name, vary_on):
+    """Return the cached fragment, or None; counts the hit or miss"""
+    content = fragment_cache().get(fragment_key(name, vary_on))
+    _count(name, 'misses' if content is None else 'hits')
+    logger.debug("Fragment %s: %s", name, 'miss' if content is None else 'hit')
+    return content
+
+
+def set_fragment(name, vary_on, content):
+    fragment_cache().set(fragment_key(name, vary_on), content, timeout=None)
+
+
+def fragment_stats():
+    """
+    Return {fragment name: {'hits': n, 'misses': n}} counted in the cache,
+    estimated from the sampled renders
+    """
+    keys = {
+        f'{KEY_PREFIX}-stats:{name}:{outcome}': (name, outcome)
+        for name in FRAGMENTS for outcome in ('hits', 'misses')
+    }
+    values = fragment_cache().get_many(list(keys))
+    stats = {name: {'hits': 0, 'misses': 0} for name in FRAGMENTS}
+    for key, value in values.items():
+        name, outcome = keys[key]
+        stats[name][outcome] = value
+    return stats
@@ -0,0 +1,240 @@
+"""
+iCalendar feeds of interviews and events.
+
+Each user has a feed URL carrying a signed token of their id and
+calendar key, so that calendar clients, which cannot log in, can
+subscribe to it; reset_feed_token() gives the user a new key, which
+revokes the URL they had. A feed
+lists the user's interviews (their own as a student, those for their
+jobs as a company, all of them as an officer) and the active placement
+events open to them, from CALENDAR_FEED_PAST_DAYS ago onwards.
+
+The serialized feed is cached under the data versions it is built from
+(see dashboard/versions.py); a student's or company's feed reads the
+versions of their own interviews (and, for a company, job postings), as
+the dashboard fragments do. It is rebuilt only after one of those
+changes, an event, job posting or profile changes, or after CALENDAR_FEED_TTL
+seconds, which moves the start of the feed forward. The cached entry
+keeps its ETag and build time, so a client polling with If-None-Match
+or If-Modified-Since costs two queries and gets a 304.
+"""
+import hashlib
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import caches
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from jobs.models import Interview
+from .fragments import owner_version
+from .models import Event
+from .versions import current
+
+KEY_PREFIX = 'calendar-feed'
+
+# Bump when the serialization changes, so that cached feeds are rebuilt
+FEED_FORMAT = 1
+
+# Versions the feeds are built from
+FEED_VERSIONS = ('interviews', 'events', 'job_postings', 'profiles')
+
+# Versions the feed of a student or company reads per owner
+FEED_OWNER_VERSIONS = {
+    'student': ('interviews',),
+    'company': ('interviews', 'job_postings'),
+}
+
+DEFAULT_TTL = 3600
+DEFAULT_PAST_DAYS = 30
+
+# Events have no end time; calendars show them this long
+EVENT_MINUTES = 60
+
+# Domain part of the entries' UIDs, which must not change between builds
+UID_DOMAIN = 'campus-placement-system'
+
+_SALT = 'dashboard.ical.feed'
+
+
+def feed_token(user):
+    """Signed token of a user's feed URL"""
+    return signing.Signer(salt=_SALT).sign(f'{user.pk}.{user.calendar_key}')
+
+
+def feed_user(token):
+    """Return the active user a current feed token was signed for, or None"""
+    try:
+        pk, _, key = signing.Signer(salt=_SALT).unsign(token).partition('.')
+    except signing.BadSignature:
+        return None
+    return get_user_model().objects.filter(pk=pk, calendar_key=key, is_active=True).select_related(
+        'student_profile', 'company_profile',
+    ).first()
+
+
+def reset_feed_token(user):
+    """Give the user a new calendar key, which revokes their feed URL"""
+    user.calendar_key = get_random_string(32)
+    user.save(update_fields=['calendar_key'])
+    return feed_token(user)
+
+
+def _escape(text):
+    return (
+        str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n').replace('\r', '\\n')
+    )
+
+
+def _fold(line):
+    """Split a content line into lines of at most 75 octets"""
+    data = line.encode()
+    if len(data) <= 75:
+        return line
+    lines = []
+    start, limit = 0, 75
+    while start < len(data):
+        end = min(start + limit, len(data))
+        # Do not split a UTF-8 sequence
+        while end < len(data) and data[end] & 0xC0 == 0x80:
+            end -= 1
+        lines.append(data[start:end].decode())
+        start, limit = end, 74  # continuation lines start with a space
+    return '\r\n '.join(lines)
+
+
+def _stamp(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _vevent(uid, start, end, stamp, summary, description='', location='', url=None, status='CONFIRMED'):
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{uid}@{UID_DOMAIN}',
+        f'DTSTAMP:{_stamp(stamp)}',
+        f'DTSTART:{_stamp(start)}',
+        f'DTEND:{_stamp(end)}',
+        f'SUMMARY:{_escape(summary)}',
+        f'STATUS:{status}',
+    ]
+    if description:
+        lines.append(f'DESCRIPTION:{_escape(description)}')
+    if location:
+        lines.append(f'LOCATION:{_escape(location)}')
+    if url:
+        lines.append(f'URL:{url}')
+    lines.append('END:VEVENT')
+    return lines
+
+
+def feed_interviews(user, since):
+    interviews = Interview.objects.filter(date_time__gte=since)
+    if user.is_student:
+        interviews = interviews.filter(application__student__user=user)
+    elif user.is_company:
+        interviews = interviews.filter(application__job__company__user=user)
+    elif not user.is_officer:
+        return Interview.objects.none()
+    return interviews.select_related('application__student__user', 'application__job__company').order_by('date_time', 'id')
+
+
+def feed_events(user, since):
+    events = Event.objects.filter(is_active=True, date_time__gte=since)
+    if user.is_company:
+        events = events.filter(Q(company__isnull=True) | Q(company__user=user))
+    return events.select_related('company').order_by('date_time', 'id')
+
+
+def _interview_lines(user, interview):
+    application = interview.application
+    job = application.job
+    if user.is_student:
+        summary = f"Interview: {job.title} at {job.company.company_name}"
+    else:
+        summary = f"Interview: {application.student.user.get_full_name()} for {job.title}"
+    description = [
+        f"Company: {job.company.company_name}",
+        f"Job Title: {job.title}",
+        f"Mode: {interview.get_interview_type_display()}",
+    ]
+    if interview.interviewer:
+        description.append(f"Interviewer: {interview.interviewer}")
+    if interview.meeting_link:
+        description.append(f"Meeting Link: {interview.meeting_link}")
+    if interview.notes:
+        description.append(f"\n{interview.notes}")
+    return _vevent(
+        f'interview-{interview.pk}', interview.date_time, interview.end_time, interview.updated_at,
+        summary, '\n'.join(description), interview.location or interview.meeting_link or '',
+        url=interview.meeting_link,
+        status='CANCELLED' if interview.status == 'cancelled' else 'CONFIRMED',
+    )
+
+
+def _event_lines(event):
+    summary = f"{event.title} ({event.company.company_name})" if event.company else event.title
+    return _vevent(
+        f'event-{event.pk}', event.date_time, event.date_time + timedelta(minutes=EVENT_MINUTES),
+        event.created_at, summary, event.description, event.location,
+    )
+
+
+def serialize(user, now=None):
+    """Return the iCalendar text of a user's feed"""
+    now = now or timezone.now()
+    since = now - timedelta(days=getattr(settings, 'CALENDAR_FEED_PAST_DAYS', DEFAULT_PAST_DAYS))
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Campus Placement System//Interviews and Events//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        'X-WR-CALNAME:Placement Interviews and Events',
+    ]
+    for interview in feed_interviews(user, since).iterator(chunk_size=500):
+        lines += _interview_lines(user, interview)
+    for event in feed_events(user, since):
+        lines += _event_lines(event)
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(map(_fold, lines)) + '\r\n'
+
+
+def feed_cache():
+    return caches[getattr(settings, 'CALENDAR_FEED_CACHE', 'default')]
+
+
+def feed_versions(user):
+    """Names of the versions a user's feed is built from"""
+    if user.is_student:
+        owner, profile = 'student', getattr(user, 'student_profile', None)
+    elif user.is_company:
+        owner, profile = 'company', getattr(user, 'company_profile', None)
+    else:
+        return FEED_VERSIONS
+    if profile is None:
+        return FEED_VERSIONS
+    owned = FEED_OWNER_VERSIONS[owner]
+    return tuple(
+        owner_version(name, owner, profile.pk) if name in owned else name for name in FEED_VERSIONS
+    )
+
+
+def feed(user):
+    """
+    Return (last_modified, etag, body) of a user's feed, from the cache
+    when its data versions have not changed
+    """
+    versions = sorted(current(*feed_versions(user)).items())
+    key = f'{KEY_PREFIX}:{FEED_FORMAT}:{user.pk}:{hashlib.md5(str(versions).encode()).hexdigest()}'
+    cache = feed_cache()
+    entry = cache.get(key)
+    if entry is None:
+        now = timezone.now()
+        body = serialize(user, now)
+        entry = (now.replace(microsecond=0), f'"{hashlib.md5(body.encode()).hexdigest()}"', body)
+        cache.set(key, entry, timeout=getattr(settings, 'CALENDAR_FEED_TTL', DEFAULT_TTL))
+    return entry
@@ -0,0 +1,235 @@
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import CompanyProfile, Notification, StudentProfile, User
+from dashboard.models import Announcement
+from jobs.models import Interview, JobApplication, JobPosting
+
+# Indexes added for the queries below, dropped for the "before" measurements
+BENCHMARKED_INDEXES = {
+    JobPosting: ('job_status_created_idx', 'job_status_deadline_idx'),
+    JobApplication: ('application_job_status_idx', 'application_student_idx', 'application_status_idx'),
+    Interview: ('interview_date_status_idx',),
+    Notification: ('notification_user_created_idx',),
+    Announcement: ('announcement_active_idx',),
+}
+
+BATCH_SIZE = 2000
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """Let bulk_create store the given auto_now_add fields as set on the objects"""
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def field(model, name):
+    return model._meta.get_field(name)
+
+
+def seed(scale, rng, stdout):
+    """Create a placement drive of the given scale; return sample ids for the queries"""
+    now = timezone.now()
+    n_companies, n_students, n_jobs = 200 * scale, 5000 * scale, 2000 * scale
+
+    def ago(days):
+        return now - timedelta(days=days * rng.random())
+
+    User.objects.bulk_create(
+        [User(username=f'bench-company-{i}', user_type='company', password='!') for i in range(n_companies)]
+        + [User(username=f'bench-student-{i}', user_type='student', password='!') for i in range(n_students)],
+        batch_size=BATCH_SIZE,
+    )
+    users = dict(User.objects.filter(username__startswith='bench-').values_list('username', 'pk'))
+    CompanyProfile.objects.bulk_create([
+        CompanyProfile(user_id=users[f'bench-company-{i}'], company_name=f'Company {i}', industry='IT',
+                       description='-', website='https://example.com', address='-')
+        for i in range(n_companies)
+    ], batch_size=BATCH_SIZE)
+    StudentProfile.objects.bulk_create([
+        StudentProfile(user_id=users[f'bench-student-{i}'], roll_number=f'BENCH{i:07}', department='CSE',
+                       year_of_graduation=2026)
+        for i in range(n_students)
+    ], batch_size=BATCH_SIZE)
+    companies = list(CompanyProfile.objects.values_list('pk', flat=True))
+    students = list(StudentProfile.objects.values_list('pk', 'user_id'))
+
+    with explicit_timestamps(field(JobPosting, 'created_at')):
+        JobPosting.objects.bulk_create([
+            JobPosting(
+                company_id=rng.choice(companies), title=f'Job {i}', job_type='full_time', description='-',
+                requirements='-', responsibilities='-', location='-',
+                status=rng.choices(('open', 'closed', 'draft'), (2, 7, 1))[0],
+                application_deadline=(now + timedelta(days=rng.randint(-300, 30))).date(),
+                created_at=ago(365),
+            )
+            for i in range(n_jobs)
+        ], batch_size=BATCH_SIZE)
+    jobs = list(JobPosting.objects.values_list('pk', flat=True))
+
+    statuses = [status for status, _ in JobApplication.STATUS_CHOICES]
+    with explicit_timestamps(field(JobApplication, 'applied_at')):
+        JobApplication.objects.bulk_create([
+            JobApplication(job_id=job_id, student_id=student_id, applied_at=ago(365),
+                           status=rng.choices(statuses, (5, 2, 1, 5, 1))[0])
+            for student_id, _ in students
+            for job_id in rng.sample(jobs, 20)
+        ], batch_size=BATCH_SIZE)
+    applications = list(JobApplication.objects.values_list('pk', flat=True))
+
+    Interview.objects.bulk_create([
+        Interview(application_id=application_id, interview_type='online',
+                  date_time=now + timedelta(days=rng.uniform(-365, 60)),
+                  status=rng.choices(('scheduled', 'completed', 'cancelled'), (2, 7, 1))[0])
+        for application_id in rng.sample(applications, len(applications) // 5)
+    ], batch_size=BATCH_SIZE)
+
+    with explicit_timestamps(field(Notification, 'created_at')):
+        Notification.objects.bulk_create([
+            Notification(user_id=user_id, title='-', message='-', read=rng.random() < 0.8, created_at=ago(365))
+            for _, user_id in students
+            for _ in range(20)
+        ], batch_size=BATCH_SIZE)
+
+    officer = User.objects.create(username='bench-officer', user_type='officer', password='!')
+    audiences = [audience for audience, _ in Announcement.AUDIENCE_CHOICES]
+    with explicit_timestamps(field(Announcement, 'created_at')):
+        Announcement.objects.bulk_create([
+            Announcement(title='-', content='-', created_by=officer, audience=rng.choice(audiences),
+                         is_active=rng.random() < 0.05, created_at=ago(730),
+                         expires_at=ago(-30) if rng.random() < 0.5 else None)
+            for _ in range(2000 * scale)
+        ], batch_size=BATCH_SIZE)
+
+    stdout.write(
+        f"Seeded {n_companies} companies, {n_students} students, {n_jobs} jobs, {len(applications)} applications, "
+        f"{Interview.objects.count()} interviews, {Notification.objects.count()} notifications"
+    )
+    student_id, user_id = rng.choice(students)
+    return {'student': student_id, 'user': user_id, 'job': rng.choice(jobs)}
+
+
+def hot_queries(sample):
+    """(label, queryset) of the queries the indexes are for, as the views issue them"""
+    now = timezone.now()
+    today = timezone.make_aware(datetime.combine(timezone.localdate(), datetime.min.time()))
+    return [
+        ("Open jobs, newest first (job_list)",
+         JobPosting.objects.filter(status='open').order_by('-created_at', '-id')[:11]),
+        ("Open jobs taking applications (student_dashboard)",
+         JobPosting.objects.filter(status='open', application_deadline__gte=now.date()).order_by('-created_at')[:5]),
+        ("A student's applications (applications)",
+         JobApplication.objects.filter(student=sample['student']).order_by('-applied_at', '-id')[:16]),
+        ("A job's shortlist (schedule_interviews)",
+         JobApplication.objects.filter(job=sample['job'], status='shortlisted').order_by('applied_at', 'id')),
+        ("Shortlisted applications, newest first (officer applications)",
+         JobApplication.objects.filter(status='shortlisted').order_by('-applied_at', '-id')[:16]),
+        ("Upcoming interviews, on the date of date_time (interviews, before)",
+         Interview.objects.filter(date_time__date__gte=today.date()).order_by('date_time', 'id')[:11]),
+        ("Upcoming interviews, from the start of today (interviews)",
+         Interview.objects.filter(date_time__gte=today).order_by('date_time', 'id')[:11]),
+        ("Scheduled interviews in a week (overlap checks)",
+         Interview.objects.filter(status='scheduled', date_time__gte=now, date_time__lt=now + timedelta(days=7))),
+        ("A user's notifications, newest first (notifications)",
+         Notification.objects.filter(user=sample['user']).order_by('-created_at', '-id')[:21]),
+        ("Active announcements of an audience (feed)",
+         Announcement.objects.filter(is_active__in=(True,)).filter(Q(expires_at__isnull=True) | Q(expires_at__gt=now))
+         .filter(audience__in=('all', 'students')).order_by('-created_at')[:50]),
+    ]
+
+
+def analyze(connection):
+    """Refresh the planner's statistics"""
+    tables = [model._meta.db_table for model in BENCHMARKED_INDEXES]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(f"ANALYZE TABLE {', '.join(map(connection.ops.quote_name, tables))}")
+            cursor.fetchall()
+        else:
+            cursor.execute("ANALYZE")
+
+
+def measure(queries, repeat):
+    """Return (median milliseconds, plan) of each query"""
+    results = []
+    for _, queryset in queries:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset.all())
+            timings.append((time.perf_counter() - started) * 1000)
+        plan = ' | '.join(line.strip() for line in queryset.explain().splitlines() if line.strip())
+        results.append((statistics.median(timings), plan))
+    return results
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the plans and latencies of the hot queries with and without the "
+        "composite indexes, on a large drive seeded into a test database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=1,
+                            help="Size of the seeded drive; 1 is 5000 students with 20 applications each")
+        parser.add_argument('--repeat', type=int, default=5,
+                            help="Runs of each query; the median is reported")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed of the generated data")
+        parser.add_argument('--database', default='default', help="Database whose test database is used")
+        parser.add_argument('--noinput', '--no-input', action='store_false', dest='interactive',
+                            help="Drop an existing test database without asking")
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        old_name = connection.settings_dict['NAME']
+        # The data is seeded into, and the indexes dropped from, a database
+        # created for the run, never the one in use
+        connection.creation.create_test_db(verbosity=0, autoclobber=not options['interactive'], serialize=False)
+        try:
+            self.run(connection, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run(self, connection, options):
+        sample = seed(options['scale'], random.Random(options['seed']), self.stdout)
+        queries = hot_queries(sample)
+        indexes = [
+            (model, index) for model, names in BENCHMARKED_INDEXES.items()
+            for index in model._meta.indexes if index.name in names
+        ]
+
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.remove_index(model, index)
+        analyze(connection)
+        before = measure(queries, options['repeat'])
+
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.add_index(model, index)
+        analyze(connection)
+        after = measure(queries, options['repeat'])
+
+        for (label, _), (before_ms, before_plan), (after_ms, after_plan) in zip(queries, before, after):
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(f"  before {before_ms:9.2f} ms  {before_plan}")
+            self.stdout.write(f"  after  {after_ms:9.2f} ms  {after_plan}")
+        total_before = sum(ms for ms, _ in before)
+        total_after = sum(ms for ms, _ in after)
+        self.stdout.write(self.style.SUCCESS(
+            f"Total {total_before:.2f} ms before, {total_after:.2f} ms after the indexes"
+        ))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.replicas import replica_reads
+from dashboard import placement_stats
+from dashboard.models import PlacementSeason
+
+
+class Command(BaseCommand):
+    help = "Compare the incrementally maintained placement statistics with a full recompute"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--season', help="Season year, e.g. 2023-2024 (default: every season)")
+        parser.add_argument(
+            '--chunk-size', type=int, default=placement_stats.CHUNK_SIZE,
+            help="Rows fetched per database round-trip",
+        )
+
+    @replica_reads()
+    def handle(self, *args, **options):
+        season = None
+        if options['season']:
+            try:
+                season = PlacementSeason.objects.get(year=options['season'])
+            except PlacementSeason.DoesNotExist:
+                raise CommandError(f"No placement season {options['season']}.")
+        mismatches = placement_stats.check(season, chunk_size=options['chunk_size'])
+        for label, field, stored, expected in mismatches:
+            self.stdout.write(f"{label}: {field} is {stored}, expected {expected}")
+        if mismatches:
+            raise CommandError(
+                f"{len(mismatches)} mismatch(es) found; run rebuild_placement_stats to repair."
+            )
+        self.stdout.write(self.style.SUCCESS("Placement statistics are consistent."))
@@ -0,0 +1,54 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.replicas import replica_reads
+from dashboard import exports
+
+
+class Command(BaseCommand):
+    help = "Export applications, interviews or placement statistics as CSV or XLSX"
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(exports.DATASETS))
+        parser.add_argument('--format', choices=list(exports.FORMATS), default='csv')
+        parser.add_argument(
+            '--output', '-o',
+            help="File to write; defaults to <dataset>-<date>.<format>, '-' writes to standard output",
+        )
+        parser.add_argument('--status', help="Application or interview status")
+        parser.add_argument('--season', help="Placement season id")
+        parser.add_argument('--company', help="Company profile id")
+        parser.add_argument('--department')
+        parser.add_argument(
+            '--chunk-size', type=int, default=exports.CHUNK_SIZE,
+            help="Rows fetched per database round-trip",
+        )
+
+    @replica_reads()
+    def handle(self, *args, **options):
+        dataset, file_format = options['dataset'], options['format']
+        try:
+            dataset_info, queryset = exports.export_queryset(
+                dataset,
+                status=options['status'],
+                season=options['season'],
+                company=options['company'],
+                department=options['department'],
+            )
+        except exports.ExportError as exc:
+            raise CommandError(str(exc))
+
+        chunks = exports.export_chunks(dataset_info, queryset, file_format, options['chunk_size'])
+        path = options['output'] or exports.export_filename(dataset, file_format)
+        if path == '-':
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+        size = 0
+        with open(path, 'wb') as output:
+            for chunk in chunks:
+                output.write(chunk)
+                size += len(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {path} ({size} bytes)."))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard import placement_stats
+from dashboard.models import PlacementSeason
+
+
+class Command(BaseCommand):
+    help = "Recompute placement statistics from student profiles and selected applications"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--season', help="Season year, e.g. 2023-2024 (default: every season)")
+        parser.add_argument(
+            '--chunk-size', type=int, default=placement_stats.CHUNK_SIZE,
+            help="Rows fetched per database round-trip",
+        )
+
+    def handle(self, *args, **options):
+        season = None
+        if options['season']:
+            try:
+                season = PlacementSeason.objects.get(year=options['season'])
+            except PlacementSeason.DoesNotExist:
+                raise CommandError(f"No placement season {options['season']}.")
+        groups = placement_stats.rebuild(season, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt statistics for {groups} department(s)."))
@@ -0,0 +1,32 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from dashboard import rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the activity rollups behind the statistics page from the source tables"
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument('--since', help="Recompute from the month of this date (YYYY-MM-DD)")
+        group.add_argument('--days', type=int, help="Recompute from the month of this many days ago")
+        parser.add_argument(
+            '--chunk-size', type=int, default=rollups.CHUNK_SIZE,
+            help="Rows fetched per database round-trip",
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError(f"Invalid date {options['since']!r}, expected YYYY-MM-DD.")
+        elif options['days'] is not None:
+            since = timezone.localdate() - timedelta(days=options['days'])
+        written = rollups.refresh(since, chunk_size=options['chunk_size'])
+        scope = f"from {since.replace(day=1)}" if since else "for the whole history"
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} rollup row(s) {scope}."))
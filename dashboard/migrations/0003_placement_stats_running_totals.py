@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_unread_notification_counter'),
+        ('dashboard', '0002_dashboard_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='placementstatistics',
+            name='offers',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='placementstatistics',
+            name='package_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.CreateModel(
+            name='PlacementCompany',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('selections', models.PositiveIntegerField(default=0)),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='placement_stats', to='accounts.companyprofile')),
+                ('statistics', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='companies', to='dashboard.placementstatistics')),
+            ],
+            options={
+                'unique_together': {('statistics', 'company')},
+            },
+        ),
+    ]
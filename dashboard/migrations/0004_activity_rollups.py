@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0003_placement_stats_running_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Day'), ('month', 'Month')], max_length=5)),
+                ('bucket', models.DateField()),
+                ('metric', models.CharField(choices=[('jobs', 'Job Postings'), ('applications', 'Applications'), ('interviews', 'Interviews'), ('selections', 'Selections')], max_length=20)),
+                ('category_id', models.PositiveIntegerField(default=0)),
+                ('job_type', models.CharField(max_length=20)),
+                ('department', models.CharField(blank=True, max_length=100)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period', 'metric', 'bucket'], name='rollup_period_metric_idx')],
+                'unique_together': {('period', 'bucket', 'metric', 'category_id', 'job_type', 'department')},
+            },
+        ),
+    ]
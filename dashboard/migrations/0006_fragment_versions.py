@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 10:00
+
+from django.db import migrations
+
+VERSIONS = ('job_postings', 'job_applications', 'interviews', 'announcements', 'events', 'profiles')
+
+
+def create_versions(apps, schema_editor):
+    DashboardCounter = apps.get_model('dashboard', 'DashboardCounter')
+    DashboardCounter.objects.bulk_create(
+        [DashboardCounter(key='version', name=name, value=0) for name in VERSIONS],
+        ignore_conflicts=True,
+    )
+
+
+def delete_versions(apps, schema_editor):
+    DashboardCounter = apps.get_model('dashboard', 'DashboardCounter')
+    DashboardCounter.objects.filter(key='version', name__in=VERSIONS).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0005_data_versions'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_versions, delete_versions),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0006_fragment_versions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='announcement',
+            index=models.Index(fields=['is_active', 'created_at'], name='announcement_active_idx'),
+        ),
+    ]
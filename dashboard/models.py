@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from accounts.models import StudentProfile, CompanyProfile
 from jobs.models import JobPosting, JobApplication
 
@@ -28,6 +29,9 @@ class PlacementStatistics(models.Model):
     highest_package = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     average_package = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     total_companies_visited = models.PositiveIntegerField(default=0)
+    # Running sums behind average_package (see dashboard/placement_stats.py)
+    offers = models.PositiveIntegerField(default=0)
+    package_total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
     
     class Meta:
         unique_together = ('season', 'department')
@@ -43,6 +47,22 @@ class PlacementStatistics(models.Model):
         return 0
 
 
+class PlacementCompany(models.Model):
+    """
+    Selections made by one company in a department and season; the number
+    of rows per PlacementStatistics is its total_companies_visited
+    """
+    statistics = models.ForeignKey(PlacementStatistics, on_delete=models.CASCADE, related_name='companies')
+    company = models.ForeignKey(CompanyProfile, on_delete=models.CASCADE, related_name='placement_stats')
+    selections = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ('statistics', 'company')
+    
+    def __str__(self):
+        return f"{self.company} - {self.statistics}"
+
+
 class Announcement(models.Model):
     """
     System-wide announcements
@@ -64,6 +84,10 @@ class Announcement(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Active announcements, newest first, up to the feed's limit
+            models.Index(fields=['is_active', 'created_at'], name='announcement_active_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -87,3 +111,67 @@ class Event(models.Model):
     
     def __str__(self):
         return self.title
+
+
+class DashboardSnapshot(models.Model):
+    """
+    Materialized dashboard summary, recomputed on a TTL
+    (see dashboard/snapshots.py)
+    """
+    key = models.CharField(max_length=50, unique=True)
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    computed_at = models.DateTimeField()
+    
+    def __str__(self):
+        return f"{self.key} snapshot ({self.computed_at})"
+
+
+class DashboardCounter(models.Model):
+    """
+    A running total belonging to a DashboardSnapshot, adjusted in place as
+    applications, jobs and profiles change
+    """
+    key = models.CharField(max_length=50)
+    name = models.CharField(max_length=50)
+    value = models.BigIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ('key', 'name')
+    
+    def __str__(self):
+        return f"{self.key}.{self.name} = {self.value}"
+
+
+class ActivityRollup(models.Model):
+    """
+    Number of job postings, applications, interviews or selections in one
+    day or month bucket, per category, job type and department
+    (see dashboard/rollups.py)
+    """
+    PERIOD_CHOICES = (
+        ('day', 'Day'),
+        ('month', 'Month'),
+    )
+    METRIC_CHOICES = (
+        ('jobs', 'Job Postings'),
+        ('applications', 'Applications'),
+        ('interviews', 'Interviews'),
+        ('selections', 'Selections'),
+    )
+    
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    bucket = models.DateField()  # the day, or the first day of the month
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES)
+    category_id = models.PositiveIntegerField(default=0)  # JobCategory id, 0 when uncategorised
+    job_type = models.CharField(max_length=20)
+    department = models.CharField(max_length=100, blank=True)  # empty for job postings
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        unique_together = ('period', 'bucket', 'metric', 'category_id', 'job_type', 'department')
+        indexes = [
+            models.Index(fields=['period', 'metric', 'bucket'], name='rollup_period_metric_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.metric} {self.period} {self.bucket}: {self.count}"
@@ -0,0 +1,446 @@
+"""
+PlacementStatistics maintained from real data.
+
+Figures are kept per (season, department). A student belongs to the
+season whose end date falls in their year of graduation. Their
+selected applications are offers:
+
+* total_students - student profiles in the group
+* placed_students - students with at least one selected application
+* highest_package / average_package - over the group's offers, in
+  thousands a year, using the top of the job's parsed salary (see
+  jobs/salary.py); average_package is kept as package_total / offers
+* total_companies_visited - companies with at least one selection,
+  tracked through PlacementCompany rows
+
+The signals in dashboard/signals.py apply each change as a delta in the
+transaction that makes it. rebuild() recomputes everything by streaming
+students and selections in chunks, and check() compares the stored
+figures with such a recompute.
+"""
+import operator
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal
+from functools import reduce
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, Exists, F, FloatField, IntegerField, Max, Q, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce, Greatest
+from django.db.models.lookups import GreaterThan, LessThanOrEqual
+
+from accounts.models import StudentProfile
+from jobs.models import JobApplication
+from jobs.salary import default_currency
+from .models import PlacementCompany, PlacementSeason, PlacementStatistics
+from .versions import bump
+
+CHUNK_SIZE = 2000
+
+CENT = Decimal('0.01')
+
+
+def offer_package(salary_max, currency):
+    """
+    Package of a job offer in thousands a year: the top of the job's
+    salary, when it is quoted in SALARY_DEFAULT_CURRENCY
+    """
+    if salary_max is None or currency != default_currency():
+        return None
+    return (salary_max / 1000).quantize(CENT)
+
+
+def season_for_year(year):
+    """Return the placement season ending in a graduation year, if any"""
+    return PlacementSeason.objects.filter(end_date__year=year).order_by('-end_date').first()
+
+
+def _group_rows(season, department):
+    """Queryset of the statistics row of a group, created when missing"""
+    PlacementStatistics.objects.bulk_create(
+        [PlacementStatistics(season=season, department=department)], ignore_conflicts=True
+    )
+    return PlacementStatistics.objects.filter(season=season, department=department)
+
+
+def _group_id(season, department):
+    """Id of the statistics row of a group, created when missing"""
+    statistics_id = PlacementStatistics.objects.filter(
+        season=season, department=department
+    ).values_list('pk', flat=True).first()
+    if statistics_id is None:
+        statistics_id = _group_rows(season, department).values_list('pk', flat=True).get()
+    return statistics_id
+
+
+def _average_package(offers=F('offers'), package_total=F('package_total')):
+    """Expression of average_package, from the new offers and package_total of an UPDATE"""
+    return Case(
+        # Cast so that SQLite does not divide whole amounts as integers
+        When(GreaterThan(offers, 0), then=Cast(package_total, FloatField()) / offers),
+        default=None,
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+
+
+def _derived_fields(statistics_id, offers=F('offers'), package_total=F('package_total')):
+    """
+    Expressions recomputing average_package and total_companies_visited,
+    from the given offers and package_total when they change in the same
+    UPDATE
+    """
+    companies = (
+        PlacementCompany.objects.filter(statistics=statistics_id)
+        .order_by().values('statistics').annotate(n=Count('id')).values('n')
+    )
+    return {
+        'average_package': _average_package(offers, package_total),
+        'total_companies_visited': Coalesce(Subquery(companies), 0),
+    }
+
+
+def _highest_package(season, department):
+    """Subquery of the largest offer package of a group"""
+    salaries = _group_selections(season, department).filter(
+        job__salary_max__isnull=False, job__salary_currency=default_currency(),
+    ).order_by().values('status').annotate(top=Max('job__salary_max')).values('top')
+    return Cast(Subquery(salaries) / Value(1000), DecimalField(max_digits=10, decimal_places=2))
+
+
+def student_added(student, delta=1):
+    """Count a new (or, with delta=-1, removed) student profile"""
+    season = season_for_year(student.year_of_graduation)
+    if season is None:
+        return
+    _group_rows(season, student.department).update(total_students=F('total_students') + delta)
+    bump('placement')
+
+
+def students_added(students):
+    """Count a batch of new student profiles, with one update per group"""
+    groups = Counter((student.year_of_graduation, student.department) for student in students)
+    for (year, department), count in sorted(groups.items()):
+        season = season_for_year(year)
+        if season is not None:
+            _group_rows(season, department).update(total_students=F('total_students') + count)
+    bump('placement')
+
+
+def selection_changed(application, delta):
+    """
+    Apply an application entering (delta=1) or leaving (delta=-1) the
+    selected status, with a single UPDATE of the group's row.
+    """
+    student = application.student
+    season = season_for_year(student.year_of_graduation)
+    if season is None:
+        return
+    statistics_id = _group_id(season, student.department)
+    package = offer_package(application.job.salary_max, application.job.salary_currency)
+
+    company_rows = PlacementCompany.objects.filter(statistics_id=statistics_id, company_id=application.job.company_id)
+    if delta > 0:
+        PlacementCompany.objects.bulk_create(
+            [PlacementCompany(statistics_id=statistics_id, company_id=application.job.company_id)],
+            ignore_conflicts=True,
+        )
+        company_rows.update(selections=F('selections') + 1)
+    else:
+        company_rows.update(selections=F('selections') - 1)
+        company_rows.filter(selections=0).delete()
+
+    other_offers = JobApplication.objects.filter(
+        student=student, status='selected'
+    ).exclude(pk=application.pk)
+    updates = {
+        # The student's first offer places them, their last one unplaces them
+        'placed_students': F('placed_students') + Case(
+            When(Exists(other_offers), then=Value(0)), default=Value(delta),
+        ),
+    }
+    offers, package_total = F('offers'), F('package_total')
+    if package is not None:
+        offers = updates['offers'] = F('offers') + delta
+        package_total = updates['package_total'] = F('package_total') + delta * package
+        if delta > 0:
+            updates['highest_package'] = Greatest(Coalesce(F('highest_package'), Value(package)), Value(package))
+        else:
+            # The maximum cannot be decremented; rescan the group's offers
+            # when this one was it
+            updates['highest_package'] = Case(
+                When(LessThanOrEqual(F('highest_package'), Value(package)),
+                     then=_highest_package(season, student.department)),
+                default=F('highest_package'),
+            )
+    updates.update(_derived_fields(statistics_id, offers, package_total))
+    PlacementStatistics.objects.filter(pk=statistics_id).update(**updates)
+    bump('placement')
+
+
+# More selection changes than this in one pipeline run (bulk status
+# changes) rebuild the groups they touch instead of applying each change
+# as a delta. A rebuild takes fewer queries than a delta but reads the
+# whole group.
+REBUILD_THRESHOLD = 3
+
+
+def selections_changed(changes):
+    """
+    Apply a list of (application, delta) selection changes, rebuilding
+    the affected groups when there are more than REBUILD_THRESHOLD.
+    """
+    if len(changes) <= REBUILD_THRESHOLD:
+        for application, delta in changes:
+            selection_changed(application, delta)
+        return
+    groups = {
+        (application.student.year_of_graduation, application.student.department)
+        for application, _ in changes
+    }
+    for year, department in sorted(groups):
+        recompute_group(year, department)
+
+
+def _season_selections(season):
+    return JobApplication.objects.filter(status='selected', student__year_of_graduation=season.end_date.year)
+
+
+def _group_selections(season, department):
+    return _season_selections(season).filter(student__department=department)
+
+
+@dataclass
+class GroupTotals:
+    total_students: int = 0
+    placed: set = field(default_factory=set)
+    companies: Counter = field(default_factory=Counter)
+    offers: int = 0
+    package_total: Decimal = Decimal(0)
+    highest_package: Decimal = None
+
+    def add_offer(self, student_id, company_id, package):
+        self.placed.add(student_id)
+        self.companies[company_id] += 1
+        if package is not None:
+            self.offers += 1
+            self.package_total += package
+            if self.highest_package is None or package > self.highest_package:
+                self.highest_package = package
+
+    def as_fields(self):
+        return {
+            'total_students': self.total_students,
+            'placed_students': len(self.placed),
+            'total_companies_visited': len(self.companies),
+            'offers': self.offers,
+            'package_total': self.package_total,
+            'highest_package': self.highest_package,
+            'average_package': (self.package_total / self.offers).quantize(CENT) if self.offers else None,
+        }
+
+
+def compute(seasons, departments=None, chunk_size=CHUNK_SIZE):
+    """
+    Recompute the totals of the given seasons from scratch, streaming
+    students and selected applications in chunks. Returns
+    {(season_id, department): GroupTotals}.
+    """
+    seasons_by_year = {season.end_date.year: season for season in seasons}
+    totals = defaultdict(GroupTotals)
+    scope = Q(year_of_graduation__in=list(seasons_by_year))
+    if departments is not None:
+        scope &= Q(department__in=list(departments))
+
+    students = StudentProfile.objects.filter(scope).order_by().values_list('department', 'year_of_graduation')
+    for department, year in students.iterator(chunk_size=chunk_size):
+        totals[(seasons_by_year[year].pk, department)].total_students += 1
+
+    selections = JobApplication.objects.filter(
+        status='selected', student__in=StudentProfile.objects.filter(scope)
+    ).order_by().values_list(
+        'student_id', 'student__department', 'student__year_of_graduation',
+        'job__company_id', 'job__salary_max', 'job__salary_currency',
+    )
+    rows = selections.iterator(chunk_size=chunk_size)
+    for student_id, department, year, company_id, salary_max, currency in rows:
+        totals[(seasons_by_year[year].pk, department)].add_offer(
+            student_id, company_id, offer_package(salary_max, currency)
+        )
+    return totals
+
+
+def _seasons(season=None):
+    """Seasons to process, one per graduation year (the latest ending one wins)"""
+    if season is not None:
+        return [season]
+    by_year = {}
+    for candidate in PlacementSeason.objects.order_by('end_date'):
+        by_year[candidate.end_date.year] = candidate
+    return list(by_year.values())
+
+
+@transaction.atomic
+def rebuild(season=None, departments=None, chunk_size=CHUNK_SIZE):
+    """
+    Overwrite the statistics of one season (or every season) with a full
+    recompute. Groups without students are reset to zero. Returns the
+    number of groups written.
+    """
+    seasons = _seasons(season)
+    totals = compute(seasons, departments, chunk_size)
+
+    existing = PlacementStatistics.objects.filter(season__in=seasons)
+    if departments is not None:
+        existing = existing.filter(department__in=list(departments))
+    for statistics in existing:
+        if (statistics.season_id, statistics.department) not in totals:
+            totals[(statistics.season_id, statistics.department)] = GroupTotals()
+
+    for (season_id, department), group in totals.items():
+        statistics, _ = PlacementStatistics.objects.update_or_create(
+            season_id=season_id, department=department, defaults=group.as_fields(),
+        )
+        PlacementCompany.objects.filter(statistics=statistics).delete()
+        PlacementCompany.objects.bulk_create(
+            PlacementCompany(statistics=statistics, company_id=company_id, selections=selections)
+            for company_id, selections in group.companies.items()
+        )
+    return len(totals)
+
+
+def recompute_group(year, department):
+    """Rebuild the group of a graduation year and department, if it has a season"""
+    season = season_for_year(year)
+    if season is not None:
+        rebuild(season, departments=[department])
+
+
+def package_changed(job_id, old_package, new_package):
+    """
+    Move the offers of a job from its old package to its new one (either
+    may be None, for a salary that is not counted), with one UPDATE of the
+    groups of the students selected for it
+    """
+    if old_package == new_package:
+        return
+    selections = JobApplication.objects.filter(job_id=job_id, status='selected').order_by().values(
+        'student__year_of_graduation', 'student__department'
+    ).annotate(n=Count('id')).values_list('student__year_of_graduation', 'student__department', 'n')
+    selections = list(selections)
+    seasons = {
+        season.end_date.year: season
+        for season in PlacementSeason.objects.filter(
+            end_date__year__in={year for year, _, _ in selections}
+        ).order_by('end_date')
+    }
+    groups = {
+        (seasons[year], department): n for year, department, n in selections if year in seasons
+    }
+    if not groups:
+        return
+
+    def per_group(delta, output_field):
+        return Case(
+            *[When(season=season, department=department, then=Value(n * delta))
+              for (season, department), n in groups.items()],
+            default=Value(0), output_field=output_field,
+        )
+
+    offers = F('offers') + per_group((new_package is not None) - (old_package is not None), IntegerField())
+    package_total = F('package_total') + per_group(
+        (new_package or 0) - (old_package or 0), DecimalField(max_digits=14, decimal_places=2)
+    )
+    PlacementStatistics.objects.filter(
+        reduce(operator.or_, (Q(season=season, department=department) for season, department in groups))
+    ).update(
+        offers=offers,
+        package_total=package_total,
+        # The job's offers may have been the maximum; rescan each group
+        highest_package=Case(
+            *[When(season=season, department=department, then=_highest_package(season, department))
+              for season, department in groups],
+            default=F('highest_package'),
+        ),
+        average_package=_average_package(offers, package_total),
+    )
+    bump('placement')
+
+
+CHECKED_FIELDS = (
+    'total_students', 'placed_students', 'total_companies_visited',
+    'offers', 'package_total', 'highest_package', 'average_package',
+)
+
+# Compared to the cent, since databases round the stored average
+DECIMAL_FIELDS = ('package_total', 'highest_package', 'average_package')
+
+
+def check(season=None, chunk_size=CHUNK_SIZE):
+    """
+    Compare stored statistics with a full recompute. Returns a list of
+    (statistics label, field, stored value, expected value).
+    """
+    seasons = _seasons(season)
+    totals = compute(seasons, chunk_size=chunk_size)
+    mismatches = []
+    stored = {
+        (statistics.season_id, statistics.department): statistics
+        for statistics in PlacementStatistics.objects.filter(season__in=seasons).select_related('season')
+    }
+    for key in set(stored) | set(totals):
+        statistics = stored.get(key)
+        expected = totals.get(key, GroupTotals()).as_fields()
+        label = str(statistics) if statistics else f"{key[1]} - season {key[0]} (missing)"
+        for name in CHECKED_FIELDS:
+            value = getattr(statistics, name) if statistics else None
+            if abs(Decimal(value or 0) - Decimal(expected[name] or 0)) > (CENT if name in DECIMAL_FIELDS else 0):
+                mismatches.append((label, name, value, expected[name]))
+    return mismatches
+
+
+PERCENTILES = (25, 50, 75, 90)
+
+
+def package_distribution(season, percentiles=PERCENTILES):
+    """
+    Distribution of a season's offer packages per department, from one
+    query and one vectorized pass over all offers. Returns a list of
+    dicts with department, offers, max, mean, median and p<N> for each
+    percentile, ordered by department.
+    """
+    rows = list(_season_selections(season).filter(
+        job__salary_max__isnull=False, job__salary_currency=default_currency(),
+    ).order_by().values_list('student__department', 'job__salary_max'))
+    if not rows:
+        return []
+
+    departments, group = np.unique([department for department, _ in rows], return_inverse=True)
+    packages = np.array([float(salary_max) for _, salary_max in rows]) / 1000
+    # Sort by department, then package, so each department is a sorted slice
+    order = np.lexsort((packages, group))
+    packages, group = packages[order], group[order]
+    counts = np.bincount(group, minlength=len(departments))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    columns = {
+        'offers': counts,
+        'max': packages[starts + counts - 1],
+        'mean': np.add.reduceat(packages, starts) / counts,
+    }
+
+    def at(percentile):
+        # Linear interpolation between closest ranks, as numpy.percentile
+        position = starts + (counts - 1) * (percentile / 100)
+        lower = np.floor(position).astype(int)
+        upper = np.ceil(position).astype(int)
+        return packages[lower] + (packages[upper] - packages[lower]) * (position - lower)
+
+    for percentile in percentiles:
+        columns[f'p{percentile}'] = at(percentile)
+    columns['median'] = columns['p50'] if 50 in percentiles else at(50)
+
+    return [
+        {'department': str(department), **{name: values[index].item() for name, values in columns.items()}}
+        for index, department in enumerate(departments)
+    ]
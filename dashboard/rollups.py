@@ -0,0 +1,250 @@
+"""
+Day and month rollups of placement activity.
+
+ActivityRollup rows count job postings, applications, interviews and
+selections per bucket and per (category, job type, department), so the
+statistics page reads a number of rows bounded by the length of the
+period it shows, whatever the size of the history.
+
+Each event is attributed to a fixed date, so removing it later subtracts
+from the bucket it was added to and a refresh gives the same figures:
+
+* jobs - the posting's created_at
+* applications and selections - the application's applied_at; a
+  selection counts while the application is selected
+* interviews - the interview's created_at
+
+Dates are local dates (settings.TIME_ZONE) worked out in Python rather
+than with database date functions, which differ between backends and, on
+MySQL, need the time zone tables loaded.
+
+The signals in dashboard/signals.py apply each change once its
+transaction commits. refresh() recomputes every bucket from a month
+onwards by streaming the source rows; it does the backfill and repairs
+any drift (refresh_activity_rollups command).
+"""
+import operator
+from collections import Counter, defaultdict, namedtuple
+from datetime import datetime, time, timedelta
+from functools import reduce
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from jobs.models import Interview, JobApplication, JobPosting
+from .models import ActivityRollup
+from .versions import bump, defer
+
+CHUNK_SIZE = 2000
+
+# Keys matched per UPDATE when applying deltas
+MATCH_BATCH = 200
+
+METRICS = ('jobs', 'applications', 'interviews', 'selections')
+
+KEY_FIELDS = ('period', 'bucket', 'metric', 'category_id', 'job_type', 'department')
+
+Event = namedtuple('Event', 'metric moment category_id job_type department')
+
+
+def local_date(moment):
+    return timezone.localdate(moment) if timezone.is_aware(moment) else moment.date()
+
+
+def next_month(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _keys(event):
+    day = local_date(event.moment)
+    dims = (event.metric, event.category_id or 0, event.job_type, event.department or '')
+    return ('day', day) + dims, ('month', day.replace(day=1)) + dims
+
+
+def tally(events, sign=1, counts=None):
+    """Add each event to its day and month keys; returns a Counter"""
+    counts = Counter() if counts is None else counts
+    for event in events:
+        for key in _keys(event):
+            counts[key] += sign
+    return counts
+
+
+# Events of single rows, used by the signals
+
+def job_event(job):
+    return Event('jobs', job.created_at, job.category_id, job.job_type, '')
+
+
+def application_events(application):
+    job = application.job
+    event = Event('applications', application.applied_at, job.category_id, job.job_type,
+                  application.student.department)
+    if application.status == 'selected':
+        return [event, event._replace(metric='selections')]
+    return [event]
+
+
+def selection_event(application):
+    return application_events(application)[0]._replace(metric='selections')
+
+
+def interview_event(interview):
+    application = interview.application
+    return Event('interviews', interview.created_at, application.job.category_id,
+                 application.job.job_type, application.student.department)
+
+
+def source_events(since=None, job=None, student=None, chunk_size=CHUNK_SIZE):
+    """
+    Stream the events of the stored rows: all of them, those from a date
+    onwards, or those of one job posting or student.
+    """
+    jobs = JobPosting.objects.all()
+    applications = JobApplication.objects.all()
+    interviews = Interview.objects.all()
+    if since is not None:
+        start = timezone.make_aware(datetime.combine(since, time.min))
+        jobs = jobs.filter(created_at__gte=start)
+        applications = applications.filter(applied_at__gte=start)
+        interviews = interviews.filter(created_at__gte=start)
+    if job is not None:
+        jobs = jobs.filter(pk=job)
+        applications = applications.filter(job=job)
+        interviews = interviews.filter(application__job=job)
+    if student is not None:
+        jobs = jobs.none()
+        applications = applications.filter(student=student)
+        interviews = interviews.filter(application__student=student)
+
+    rows = jobs.order_by().values_list('created_at', 'category_id', 'job_type')
+    for created_at, category_id, job_type in rows.iterator(chunk_size=chunk_size):
+        yield Event('jobs', created_at, category_id, job_type, '')
+
+    rows = applications.order_by().values_list(
+        'applied_at', 'status', 'job__category_id', 'job__job_type', 'student__department'
+    )
+    for applied_at, status, category_id, job_type, department in rows.iterator(chunk_size=chunk_size):
+        yield Event('applications', applied_at, category_id, job_type, department)
+        if status == 'selected':
+            yield Event('selections', applied_at, category_id, job_type, department)
+
+    rows = interviews.order_by().values_list(
+        'created_at', 'application__job__category_id', 'application__job__job_type',
+        'application__student__department',
+    )
+    for created_at, category_id, job_type, department in rows.iterator(chunk_size=chunk_size):
+        yield Event('interviews', created_at, category_id, job_type, department)
+
+
+def _match(keys):
+    return reduce(operator.or_, (Q(**dict(zip(KEY_FIELDS, key))) for key in keys))
+
+
+def write(counts):
+    """Add {key: delta} to the rollups, with one UPDATE per distinct delta and batch"""
+    _write(counts)
+    bump('activity')
+
+
+def _write(counts):
+    counts = {key: delta for key, delta in counts.items() if delta}
+    if not counts:
+        return
+    ActivityRollup.objects.bulk_create(
+        [ActivityRollup(**dict(zip(KEY_FIELDS, key))) for key in counts], ignore_conflicts=True
+    )
+    keys_by_delta = defaultdict(list)
+    for key, delta in counts.items():
+        keys_by_delta[delta].append(key)
+    for delta, keys in keys_by_delta.items():
+        for start in range(0, len(keys), MATCH_BATCH):
+            ActivityRollup.objects.filter(_match(keys[start:start + MATCH_BATCH])).update(
+                count=F('count') + delta
+            )
+
+
+def apply(events, sign=1):
+    """Count (sign=1) or uncount (sign=-1) events once the transaction commits"""
+    counts = tally(events, sign)
+    if counts:
+        defer(_write, counts)
+        bump('activity')
+
+
+def move(job=None, student=None, **previous):
+    """
+    Re-attribute the events of a job posting or student whose dimensions
+    changed; previous holds the old values (category_id and job_type, or
+    department).
+    """
+    counts = Counter()
+    for event in source_events(job=job, student=student):
+        tally([event], 1, counts)
+        tally([event._replace(**previous)], -1, counts)
+    write(counts)
+
+
+@transaction.atomic
+def refresh(since=None, chunk_size=CHUNK_SIZE):
+    """
+    Recompute every bucket from the month of since (all of them when
+    since is None). Returns the number of rows written.
+    """
+    if since is not None:
+        since = since.replace(day=1)
+    counts = tally(source_events(since=since, chunk_size=chunk_size))
+    rows = ActivityRollup.objects.all()
+    if since is not None:
+        rows = rows.filter(bucket__gte=since)
+    rows.delete()
+    written = ActivityRollup.objects.bulk_create(
+        [ActivityRollup(count=count, **dict(zip(KEY_FIELDS, key))) for key, count in counts.items() if count],
+        batch_size=chunk_size,
+    )
+    bump('activity')
+    return len(written)
+
+
+def _bucket_filter(start, end):
+    """
+    Buckets covering the dates start..end: month rows for the whole
+    months, day rows for the partial months at either end
+    """
+    full_from = start if start.day == 1 else next_month(start)
+    full_to = next_month(end) if next_month(end) - timedelta(days=1) == end else end.replace(day=1)
+    if full_from >= full_to:
+        return Q(period='day', bucket__gte=start, bucket__lte=end)
+    return (
+        Q(period='month', bucket__gte=full_from, bucket__lt=full_to)
+        | Q(period='day', bucket__gte=start, bucket__lt=full_from)
+        | Q(period='day', bucket__gte=full_to, bucket__lte=end)
+    )
+
+
+def activity(start, end):
+    """
+    Summarize the dates start..end. Returns a dict with ``months`` (the
+    first day of every month in the range), ``monthly`` ({metric: [count
+    per month]}) and ``by_job_type`` ({metric: {job_type: count}}).
+    """
+    months = []
+    month = start.replace(day=1)
+    while month <= end:
+        months.append(month)
+        month = next_month(month)
+
+    monthly = {metric: dict.fromkeys(months, 0) for metric in METRICS}
+    by_job_type = {metric: Counter() for metric in METRICS}
+    rows = ActivityRollup.objects.filter(_bucket_filter(start, end)).order_by().values_list(
+        'bucket', 'metric', 'job_type'
+    ).annotate(total=Sum('count'))
+    for bucket, metric, job_type, total in rows:
+        monthly[metric][bucket.replace(day=1)] += total
+        by_job_type[metric][job_type] += total
+    return {
+        'months': months,
+        'monthly': {metric: list(counts.values()) for metric, counts in monthly.items()},
+        'by_job_type': by_job_type,
+    }
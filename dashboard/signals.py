@@ -0,0 +1,267 @@
+from collections import Counter
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from accounts.imports import users_imported
+from accounts.models import CompanyProfile, StudentProfile
+from jobs.models import Interview, JobApplication, JobPosting
+from jobs.scheduler import interviews_scheduled
+from jobs.transitions import application_status_changed
+from .feed import invalidate
+from .fragments import owner_versions
+from . import placement_stats, rollups
+from .models import Announcement, Event, PlacementSeason, PlacementStatistics
+from .snapshots import apply_deltas
+from .versions import batched, bump
+
+
+@receiver(post_save, sender=Announcement)
+@receiver(post_delete, sender=Announcement)
+def invalidate_announcement_cache(sender, instance, **kwargs):
+    """Drop cached announcement lists once the change is visible to readers"""
+    transaction.on_commit(invalidate)
+
+
+# Officer dashboard counters (see dashboard/snapshots.py)
+
+@receiver(post_save, sender=JobApplication)
+def count_new_application(sender, instance, created, **kwargs):
+    if created:
+        apply_deltas({'applications': 1, f'applications:{instance.status}': 1})
+
+
+@receiver(post_delete, sender=JobApplication)
+def count_deleted_application(sender, instance, **kwargs):
+    apply_deltas({'applications': -1, f'applications:{instance.status}': -1})
+
+
+def count_status_changes(changes):
+    deltas = Counter()
+    for change in changes:
+        deltas[f'applications:{change.old_status}'] -= 1
+        deltas[f'applications:{change.new_status}'] += 1
+    apply_deltas(deltas)
+
+
+@receiver(post_save, sender=JobPosting)
+def count_job_posting(sender, instance, created, **kwargs):
+    was_open = not created and instance._loaded_status == 'open'
+    instance._loaded_status = instance.status
+    apply_deltas({
+        'jobs': 1 if created else 0,
+        'active_jobs': (instance.status == 'open') - was_open,
+    })
+
+
+@receiver(post_delete, sender=JobPosting)
+def count_deleted_job_posting(sender, instance, **kwargs):
+    apply_deltas({'jobs': -1, 'active_jobs': -(instance.status == 'open')})
+
+
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_save, sender=CompanyProfile)
+def count_new_profile(sender, instance, created, **kwargs):
+    if created:
+        apply_deltas({'students' if sender is StudentProfile else 'companies': 1})
+
+
+@receiver(post_delete, sender=StudentProfile)
+@receiver(post_delete, sender=CompanyProfile)
+def count_deleted_profile(sender, instance, **kwargs):
+    apply_deltas({'students' if sender is StudentProfile else 'companies': -1})
+
+
+@receiver(interviews_scheduled)
+def scheduled_interviews_changed(sender, **kwargs):
+    apply_deltas({})
+
+
+@receiver(users_imported)
+def count_imported_profiles(sender, user_type, profiles, **kwargs):
+    apply_deltas({'students' if user_type == 'student' else 'companies': len(profiles)})
+
+
+@receiver(post_save, sender=Interview)
+@receiver(post_delete, sender=Interview)
+def interview_changed(sender, instance, **kwargs):
+    """Interviews only appear in the recent lists"""
+    apply_deltas({})
+
+
+# Placement statistics (see dashboard/placement_stats.py)
+
+@receiver(post_save, sender=StudentProfile)
+def track_student_statistics(sender, instance, created, **kwargs):
+    loaded_group = instance._loaded_group
+    instance._loaded_group = (instance.department, instance.year_of_graduation)
+    if created:
+        placement_stats.student_added(instance)
+    elif loaded_group is not None and loaded_group != instance._loaded_group:
+        # Moving a student between groups also moves their offers
+        for department, year in (loaded_group, instance._loaded_group):
+            transaction.on_commit(partial(placement_stats.recompute_group, year, department))
+        if loaded_group[0] != instance.department:
+            # Their activity rollups move with them too
+            transaction.on_commit(partial(rollups.move, student=instance.pk, department=loaded_group[0]))
+
+
+@receiver(users_imported)
+def track_imported_students(sender, user_type, profiles, **kwargs):
+    if user_type == 'student':
+        placement_stats.students_added(profiles)
+
+
+@receiver(post_delete, sender=StudentProfile)
+def untrack_student_statistics(sender, instance, **kwargs):
+    transaction.on_commit(partial(
+        placement_stats.recompute_group, instance.year_of_graduation, instance.department
+    ))
+
+
+@receiver(post_save, sender=JobApplication)
+def track_new_selection(sender, instance, created, **kwargs):
+    if created and instance.status == 'selected':
+        placement_stats.selection_changed(instance, 1)
+
+
+@receiver(post_delete, sender=JobApplication)
+def untrack_selection(sender, instance, **kwargs):
+    if instance.status == 'selected':
+        placement_stats.selection_changed(instance, -1)
+
+
+def track_selection_changes(changes):
+    placement_stats.selections_changed([
+        (change.application, 1 if change.new_status == 'selected' else -1)
+        for change in changes
+        if 'selected' in (change.new_status, change.old_status)
+    ])
+
+
+@receiver(post_save, sender=JobPosting)
+def track_package_changes(sender, instance, created, **kwargs):
+    if instance.salary_changed:
+        previous = instance.previous_salary
+        transaction.on_commit(partial(
+            placement_stats.package_changed, instance.pk,
+            placement_stats.offer_package(previous['salary_max'], previous['salary_currency']),
+            placement_stats.offer_package(instance.salary_max, instance.salary_currency),
+        ))
+
+
+@receiver(post_save, sender=PlacementSeason)
+def rebuild_season_statistics(sender, instance, **kwargs):
+    """A new or re-dated season picks up the students graduating in it"""
+    transaction.on_commit(partial(placement_stats.rebuild, instance))
+    bump('placement', 'activity')
+
+
+@receiver(post_save, sender=PlacementStatistics)
+@receiver(post_delete, sender=PlacementStatistics)
+def placement_statistics_changed(sender, instance, **kwargs):
+    bump('placement')
+
+
+# Activity rollups (see dashboard/rollups.py)
+
+@receiver(post_save, sender=JobPosting)
+def roll_up_job_posting(sender, instance, created, **kwargs):
+    loaded_dimensions = instance._loaded_dimensions
+    instance._loaded_dimensions = (instance.category_id, instance.job_type)
+    if created:
+        rollups.apply([rollups.job_event(instance)])
+    elif loaded_dimensions is not None and loaded_dimensions != instance._loaded_dimensions:
+        category_id, job_type = loaded_dimensions
+        transaction.on_commit(partial(rollups.move, job=instance.pk, category_id=category_id, job_type=job_type))
+
+
+@receiver(post_delete, sender=JobPosting)
+def unroll_job_posting(sender, instance, **kwargs):
+    rollups.apply([rollups.job_event(instance)], -1)
+
+
+@receiver(post_save, sender=JobApplication)
+def roll_up_application(sender, instance, created, **kwargs):
+    if created:
+        rollups.apply(rollups.application_events(instance))
+
+
+@receiver(post_delete, sender=JobApplication)
+def unroll_application(sender, instance, **kwargs):
+    rollups.apply(rollups.application_events(instance), -1)
+
+
+def roll_up_selections(changes):
+    selected = [change.application for change in changes if change.new_status == 'selected']
+    unselected = [change.application for change in changes if change.old_status == 'selected']
+    rollups.apply(map(rollups.selection_event, selected))
+    rollups.apply(map(rollups.selection_event, unselected), -1)
+
+
+@receiver(post_save, sender=Interview)
+def roll_up_interview(sender, instance, created, **kwargs):
+    if created:
+        rollups.apply([rollups.interview_event(instance)])
+
+
+@receiver(interviews_scheduled)
+def roll_up_scheduled_interviews(sender, interviews, **kwargs):
+    rollups.apply(map(rollups.interview_event, interviews))
+
+
+@receiver(post_delete, sender=Interview)
+def unroll_interview(sender, instance, **kwargs):
+    rollups.apply([rollups.interview_event(instance)], -1)
+
+
+# Dashboard fragment versions (see dashboard/fragments.py). Connected last,
+# so that the counter and snapshot updates above are committed first.
+
+FRAGMENT_VERSION_BY_MODEL = {
+    JobPosting: 'job_postings',
+    JobApplication: 'job_applications',
+    Interview: 'interviews',
+    Announcement: 'announcements',
+    Event: 'events',
+    StudentProfile: 'profiles',
+    CompanyProfile: 'profiles',
+}
+
+
+@receiver([post_save, post_delete], sender=JobPosting)
+@receiver([post_save, post_delete], sender=JobApplication)
+@receiver([post_save, post_delete], sender=Interview)
+@receiver([post_save, post_delete], sender=Announcement)
+@receiver([post_save, post_delete], sender=Event)
+@receiver([post_save, post_delete], sender=StudentProfile)
+@receiver([post_save, post_delete], sender=CompanyProfile)
+def bump_fragment_version(sender, instance, **kwargs):
+    bump(FRAGMENT_VERSION_BY_MODEL[sender], *owner_versions(instance))
+
+
+@receiver(users_imported)
+def profiles_imported(sender, **kwargs):
+    bump('profiles')
+
+
+@receiver(interviews_scheduled)
+def interviews_booked(sender, interviews, **kwargs):
+    bump('interviews', *(name for interview in interviews for name in owner_versions(interview)))
+
+
+# Status changes (see jobs/transitions.py): the counter, statistics and
+# rollup updates above and the version bump, their deferred writes made in
+# one batch
+
+@receiver(application_status_changed)
+def application_statuses_changed(sender, changes, **kwargs):
+    with batched():
+        count_status_changes(changes)
+        track_selection_changes(changes)
+        roll_up_selections(changes)
+        bump('job_applications', *(
+            name for change in changes for name in owner_versions(change.application)
+        ))
@@ -0,0 +1,312 @@
+"""
+Materialized officer dashboard summary.
+
+The officer dashboard reads one DashboardSnapshot row (recent jobs,
+applications and interviews, plus the time it was computed) and the
+DashboardCounter rows holding its totals, instead of counting the
+applications table on every load.
+
+Counters are kept current by apply_deltas(), called from the model
+signals in dashboard/signals.py, as a single UPDATE per change. Every
+change also bumps the ``changes`` counter; when it no longer matches the
+value recorded in the snapshot, the recent lists are reloaded on the
+next read. Each counter is split over COUNTER_SHARDS rows, and a change
+updates the rows of one shard picked at random, so concurrent changes
+seldom wait for the same row lock; readers add the shards up.
+
+The whole snapshot is recomputed once it is older than
+OFFICER_SNAPSHOT_TTL seconds, which also corrects any drift. Only one
+request recomputes it: the first to lock the snapshot row. The others
+serve the expired snapshot meanwhile.
+"""
+import random
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import BigIntegerField, Case, Count, F, Q, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from accounts.models import CompanyProfile, StudentProfile
+from accounts.replicas import primary_reads
+from jobs.models import Interview, JobApplication, JobPosting
+from .models import DashboardCounter, DashboardSnapshot
+from .versions import bump, defer
+
+OFFICER_KEY = 'officer'
+DEFAULT_TTL = 300
+RECENT_LIMIT = 5
+
+# Rows each officer counter is split over; shard 0 has the counter's name
+COUNTER_SHARDS = 8
+
+# Keys of the application_stats dict used by the officer templates
+STATUS_KEYS = {
+    'applied': 'pending',
+    'under_review': 'under_review',
+    'shortlisted': 'shortlisted',
+    'selected': 'selected',
+    'rejected': 'rejected',
+}
+
+
+def compute_counts():
+    """Return every counter from scratch; applications are counted in one pass"""
+    jobs = JobPosting.objects.aggregate(
+        jobs=Count('id'),
+        active_jobs=Count('id', filter=Q(status='open')),
+    )
+    applications = JobApplication.objects.aggregate(
+        applications=Count('id'),
+        **{
+            f'applications:{status}': Count('id', filter=Q(status=status))
+            for status in STATUS_KEYS
+        }
+    )
+    return {
+        'companies': CompanyProfile.objects.count(),
+        'students': StudentProfile.objects.count(),
+        **jobs,
+        **applications,
+    }
+
+
+def _job_row(job):
+    return {
+        'id': job.id,
+        'title': job.title,
+        'status': job.status,
+        'get_status_display': job.get_status_display(),
+        'get_job_type_display': job.get_job_type_display(),
+        'created_at': job.created_at,
+        'company': {'company_name': job.company.company_name},
+    }
+
+
+def _student_row(student):
+    user = student.user
+    return {
+        'user': {
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'get_full_name': user.get_full_name(),
+        },
+    }
+
+
+def _application_row(application):
+    return {
+        'id': application.id,
+        'status': application.status,
+        'get_status_display': application.get_status_display(),
+        'applied_at': application.applied_at,
+        'student': _student_row(application.student),
+        'job': {
+            'id': application.job.id,
+            'title': application.job.title,
+            'company': {'company_name': application.job.company.company_name},
+        },
+    }
+
+
+def _interview_row(interview):
+    return {
+        'id': interview.id,
+        'date_time': interview.date_time,
+        'interview_type': interview.interview_type,
+        'get_interview_type_display': interview.get_interview_type_display(),
+        'application': _application_row(interview.application),
+    }
+
+
+def compute_recent():
+    """Return the recent activity lists as JSON-serializable rows"""
+    jobs = JobPosting.objects.select_related('company').order_by('-created_at')[:RECENT_LIMIT]
+    applications = JobApplication.objects.select_related(
+        'student__user', 'job__company'
+    ).order_by('-applied_at')[:RECENT_LIMIT]
+    # Keep spare interviews so the list survives some of them passing
+    interviews = Interview.objects.filter(
+        date_time__gte=timezone.now()
+    ).select_related(
+        'application__student__user', 'application__job__company'
+    ).order_by('date_time')[:RECENT_LIMIT * 2]
+    return {
+        'recent_jobs': [_job_row(job) for job in jobs],
+        'recent_applications': [_application_row(application) for application in applications],
+        'upcoming_interviews': [_interview_row(interview) for interview in interviews],
+    }
+
+
+def _parse_dates(row, keys):
+    """Turn ISO strings under the given keys back into datetimes, in place"""
+    for key, value in row.items():
+        if key in keys and isinstance(value, str):
+            row[key] = parse_datetime(value)
+        elif isinstance(value, dict):
+            _parse_dates(value, keys)
+    return row
+
+
+def shard_name(name, shard):
+    return name if shard == 0 else f'{name}#{shard}'
+
+
+def read_counters():
+    """Return {counter name: value} of the stored officer counters, shards added up"""
+    counts = Counter()
+    for name, value in DashboardCounter.objects.filter(key=OFFICER_KEY).values_list('name', 'value'):
+        counts[name.partition('#')[0]] += value
+    return dict(counts)
+
+
+def _claim(snapshot):
+    """Lock an expired snapshot row; False when another request is refreshing it or already has"""
+    rows = DashboardSnapshot.objects.filter(pk=snapshot.pk, computed_at=snapshot.computed_at)
+    if connection.features.has_select_for_update_skip_locked:
+        rows = rows.select_for_update(skip_locked=True)
+    else:
+        rows = rows.select_for_update()
+    return rows.exists()
+
+
+# The counters are maintained incrementally from the recomputed values, so
+# these must not be read from a lagging replica
+@primary_reads()
+def refresh_officer_snapshot(expired=None):
+    """
+    Recompute the officer snapshot and its counters from scratch. Given the
+    expired snapshot, return None instead if another request is
+    recomputing it.
+    """
+    with transaction.atomic():
+        if expired is not None and not _claim(expired):
+            return None
+        counts = compute_counts()
+        data = {**compute_recent(), 'changes_seen': 0}
+        computed_at = timezone.now()
+        DashboardCounter.objects.bulk_create(
+            [
+                DashboardCounter(key=OFFICER_KEY, name=shard_name(name, shard), value=value if shard == 0 else 0)
+                for name, value in {**counts, 'changes': 0}.items()
+                for shard in range(COUNTER_SHARDS)
+            ],
+            update_conflicts=True,
+            unique_fields=['key', 'name'],
+            update_fields=['value'],
+        )
+        snapshot = DashboardSnapshot(key=OFFICER_KEY, data=data, computed_at=computed_at)
+        DashboardSnapshot.objects.bulk_create(
+            [snapshot],
+            update_conflicts=True,
+            unique_fields=['key'],
+            update_fields=['data', 'computed_at'],
+        )
+    bump('applications')
+    return snapshot, {**counts, 'changes': 0}
+
+
+@primary_reads()
+def _refresh_recent(snapshot, changes):
+    snapshot.data = {**compute_recent(), 'changes_seen': changes}
+    DashboardSnapshot.objects.filter(key=snapshot.key).update(data=snapshot.data)
+
+
+def officer_counts():
+    """Return the officer counters, counting from scratch if they were never stored"""
+    return read_counters() or compute_counts()
+
+
+def officer_summary(refresh=False):
+    """
+    Return the officer dashboard summary: totals, the application status
+    breakdown, the recent activity lists and computed_at.
+    """
+    snapshot = DashboardSnapshot.objects.filter(key=OFFICER_KEY).first()
+    ttl = getattr(settings, 'OFFICER_SNAPSHOT_TTL', DEFAULT_TTL)
+    refreshed, refreshing = None, False
+    if refresh or snapshot is None:
+        refreshed = refresh_officer_snapshot()
+    elif snapshot.computed_at < timezone.now() - timedelta(seconds=ttl):
+        refreshed = refresh_officer_snapshot(expired=snapshot)
+        # Otherwise the snapshot row stays locked until the refresh commits
+        refreshing = refreshed is None
+    if refreshed is not None:
+        snapshot, counts = refreshed
+    else:
+        counts = read_counters()
+        if not refreshing and counts.get('changes', 0) != snapshot.data.get('changes_seen'):
+            _refresh_recent(snapshot, counts.get('changes', 0))
+
+    now = timezone.now()
+    data = snapshot.data
+    interviews = [
+        _parse_dates(row, ('date_time', 'applied_at'))
+        for row in data.get('upcoming_interviews', [])
+    ]
+    application_stats = {'total': counts.get('applications', 0)}
+    application_stats.update(
+        (key, counts.get(f'applications:{status}', 0)) for status, key in STATUS_KEYS.items()
+    )
+    return {
+        'total_companies': counts.get('companies', 0),
+        'total_students': counts.get('students', 0),
+        'total_jobs': counts.get('jobs', 0),
+        'active_jobs': counts.get('active_jobs', 0),
+        'application_stats': application_stats,
+        'recent_jobs': [_parse_dates(row, ('created_at',)) for row in data.get('recent_jobs', [])],
+        'recent_applications': [
+            _parse_dates(row, ('applied_at',)) for row in data.get('recent_applications', [])
+        ],
+        'upcoming_interviews': [row for row in interviews if row['date_time'] >= now][:RECENT_LIMIT],
+        'computed_at': snapshot.computed_at,
+    }
+
+
+def _add_to_counters(names):
+    """Add {shard row name: delta} to the existing officer counter rows; return how many were updated"""
+    return DashboardCounter.objects.filter(key=OFFICER_KEY, name__in=list(names)).update(
+        value=F('value') + Case(
+            *[When(name=name, then=Value(delta)) for name, delta in names.items()],
+            default=Value(0),
+            output_field=BigIntegerField(),
+        )
+    )
+
+
+def update_counters(deltas):
+    """
+    Add {counter name: delta} to the officer counters, in one shard. The
+    shards of a counter without rows yet (before the first refresh, or a
+    new counter) are created at zero, then added to.
+    """
+    shard = random.randrange(COUNTER_SHARDS)
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    names = {shard_name(name, shard): delta for name, delta in deltas.items()}
+    if not names or _add_to_counters(names) == len(names):
+        return
+    existing = set(DashboardCounter.objects.filter(key=OFFICER_KEY, name__in=list(names)).values_list('name', flat=True))
+    missing = [name for name in deltas if shard_name(name, shard) not in existing]
+    DashboardCounter.objects.bulk_create(
+        [
+            DashboardCounter(key=OFFICER_KEY, name=shard_name(name, other), value=0)
+            for name in missing
+            for other in range(COUNTER_SHARDS)
+        ],
+        ignore_conflicts=True,
+    )
+    _add_to_counters({shard_name(name, shard): deltas[name] for name in missing})
+
+
+def apply_deltas(deltas):
+    """
+    Add {counter name: delta} to the officer counters once the current
+    transaction commits. Any change also marks the recent lists stale.
+    """
+    deltas = Counter({name: delta for name, delta in deltas.items() if delta})
+    deltas['changes'] += 1
+    defer(update_counters, deltas)
+    if any(name.startswith('applications') for name in deltas):
+        bump('applications')
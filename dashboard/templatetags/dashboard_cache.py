@@ -0,0 +1,48 @@
+from django import template
+
+from dashboard.fragments import FRAGMENTS, get_fragment, set_fragment
+
+register = template.Library()
+
+# Stands in for the CSRF token in cached fragments; the token is per user
+# and rotates at login, so it is filled in on every render
+CSRF_PLACEHOLDER = 'versioned-cache-csrf-token'
+
+
+class VersionedCacheNode(template.Node):
+    def __init__(self, nodelist, name, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        vary_on = [value.resolve(context) for value in self.vary_on]
+        content = get_fragment(self.name, vary_on)
+        if content is None:
+            with context.push(csrf_token=CSRF_PLACEHOLDER):
+                content = self.nodelist.render(context)
+            set_fragment(self.name, vary_on, content)
+        if CSRF_PLACEHOLDER in content:
+            content = content.replace(CSRF_PLACEHOLDER, str(context.get('csrf_token', '')))
+        return content
+
+
+@register.tag('versioned_cache')
+def do_versioned_cache(parser, token):
+    """
+    Cache a fragment under its name and the values it varies on (see
+    dashboard/fragments.py).
+    Usage:
+        {% versioned_cache 'student_applications' versions.job_applications student.pk %}
+            ...
+        {% endversioned_cache %}
+    """
+    nodelist = parser.parse(('endversioned_cache',))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a fragment name.")
+    name = bits[1].strip('\'"')
+    if name not in FRAGMENTS:
+        raise template.TemplateSyntaxError(f"Unknown fragment {name!r}; list it in dashboard.fragments.FRAGMENTS.")
+    return VersionedCacheNode(nodelist, name, [parser.compile_filter(bit) for bit in bits[2:]])
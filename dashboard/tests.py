@@ -0,0 +1,412 @@
+import csv
+import io
+import zipfile
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+from xml.etree import ElementTree
+
+import numpy as np
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CompanyProfile, StudentProfile, User
+from jobs.models import Interview, JobApplication, JobPosting
+from jobs.tests import ViewTestCase
+from . import exports, feed, fragments, ical, placement_stats, snapshots
+from .ical import feed_token
+from .models import Announcement, DashboardCounter, Event, PlacementSeason, PlacementStatistics
+
+SHEET_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+
+class DashboardViewBudgetTests(ViewTestCase):
+    """Every budgeted view of dashboard/views.py, within its budget"""
+
+    def setUp(self):
+        super().setUp()
+        JobApplication.objects.filter(pk=self.applications[0].pk).update(status='selected')
+        placement_stats.rebuild(self.season)
+        self.interview(self.applications[1])
+
+    def test_dashboards(self):
+        # Twice each, with the fragments cold and then cached
+        for _ in range(2):
+            self.get_pages(self.students[0].user, [reverse('student_dashboard')])
+            self.get_pages(self.company_user, [reverse('company_dashboard')])
+            self.get_pages(self.officer, [reverse('officer_dashboard'), reverse('officer_dashboard') + '?refresh=1'])
+
+    def test_statistics_and_charts(self):
+        charts = [
+            reverse(name) + query
+            for name in ('chart_application_status', 'chart_placement_rate', 'chart_job_types', 'chart_monthly_activity')
+            for query in ('', f'?season={self.season.pk}')
+        ]
+        self.get_pages(self.officer, [
+            reverse('statistics'), reverse('statistics') + f'?season={self.season.pk}',
+            reverse('fragment_cache_stats'), *charts,
+        ])
+        self.get_pages(self.students[0].user, [reverse('statistics')])
+
+    def test_calendar_feed(self):
+        for user in (self.students[1].user, self.company_user, self.officer):
+            url = reverse('calendar_feed', args=[feed_token(user)])
+            with self.subTest(user=user.username):
+                response = self.client.get(url)
+                self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+                self.assertEqual(response.status_code, 304)
+
+    def test_exports(self):
+        self.client.force_login(self.officer)
+        for dataset in exports.DATASETS:
+            for file_format, content_type in exports.FORMATS.items():
+                with self.subTest(dataset=dataset, format=file_format):
+                    response = self.client.get(reverse('export_data', args=[dataset]), {'format': file_format})
+                    self.assertEqual(response['Content-Type'], content_type)
+                    b''.join(response.streaming_content)
+
+    def test_forms(self):
+        self.get_pages(self.officer, [
+            reverse('create_announcement'), reverse('create_event'), reverse('create_season'),
+            reverse('update_statistics'), reverse('update_statistics', args=['CSE']),
+        ])
+
+    def test_create_announcement(self):
+        self.client.force_login(self.officer)
+
+        self.client.post(reverse('create_announcement'), {
+            'title': 'Placement week', 'content': 'Starts Monday', 'audience': 'students',
+            'expires_at': (timezone.localtime() + timedelta(days=7)).strftime('%Y-%m-%dT%H:%M'), 'is_active': 'on',
+        })
+
+        self.assertTrue(Announcement.objects.filter(title='Placement week', created_by=self.officer).exists())
+
+    def test_create_event(self):
+        self.client.force_login(self.officer)
+
+        self.client.post(reverse('create_event'), {
+            'title': 'Acme talk', 'description': 'About Acme', 'location': 'Hall A', 'company': self.company.pk,
+            'date_time': (timezone.localtime() + timedelta(days=5)).strftime('%Y-%m-%dT%H:%M'), 'is_active': 'on',
+        })
+
+        self.assertTrue(Event.objects.filter(title='Acme talk', company=self.company).exists())
+
+    def test_create_season(self):
+        self.client.force_login(self.officer)
+
+        self.client.post(reverse('create_season'), {
+            'year': '2026-2027', 'start_date': date(2026, 7, 1), 'end_date': date(2027, 6, 30), 'is_active': 'on',
+        })
+
+        self.assertTrue(PlacementSeason.objects.get(year='2026-2027').is_active)
+
+    def test_update_statistics(self):
+        # A hand edit that recompute repairs
+        PlacementStatistics.objects.filter(season=self.season, department='CSE').update(
+            total_students=60, placed_students=45, offers=9, package_total=0,
+        )
+        self.client.force_login(self.officer)
+
+        response = self.client.post(reverse('update_statistics', args=['CSE']), {
+            'total_students': 60, 'placed_students': 45, 'highest_package': '12.00',
+        })
+
+        self.assertRedirects(response, reverse('statistics'), fetch_redirect_response=False)
+        self.assertEqual(placement_stats.check(self.season), [])
+        statistics = PlacementStatistics.objects.get(season=self.season, department='CSE')
+        self.assertEqual(
+            (statistics.total_students, statistics.placed_students, statistics.offers, statistics.highest_package),
+            (1, 1, 1, Decimal('800.00')),
+        )
+
+    def test_recompute_every_department(self):
+        PlacementStatistics.objects.filter(season=self.season).update(total_students=0)
+        self.client.force_login(self.officer)
+
+        self.client.post(reverse('update_statistics'))
+
+        self.assertEqual(placement_stats.check(self.season), [])
+
+
+class FragmentTests(ViewTestCase):
+
+    def test_every_listed_fragment_is_rendered(self):
+        fragments.fragment_cache().clear()
+        dashboards = ((self.students[0].user, 'student_dashboard'), (self.company_user, 'company_dashboard'),
+                      (self.officer, 'officer_dashboard'))
+
+        for _ in range(2):
+            for user, dashboard in dashboards:
+                self.client.force_login(user)
+                self.assertEqual(self.client.get(reverse(dashboard)).status_code, 200)
+
+        # A name listed in FRAGMENTS but used by no template would stay at zero
+        self.assertEqual(
+            {name: counts for name, counts in fragments.fragment_stats().items() if counts != {'hits': 1, 'misses': 1}},
+            {},
+        )
+
+
+class AnnouncementFeedTests(ViewTestCase):
+
+    def setUp(self):
+        super().setUp()
+        feed.invalidate()
+        self.addCleanup(feed.invalidate)
+        self.student = self.students[0].user
+
+    def announce(self, title, audience='students'):
+        self.client.force_login(self.officer)
+        self.client.post(reverse('create_announcement'), {
+            'title': title, 'content': f"{title} details", 'audience': audience, 'is_active': 'on',
+        })
+        return Announcement.objects.get(title=title)
+
+    def unread_count(self, user):
+        """The navigation bar badge of the user"""
+        self.client.force_login(user)
+        return self.client.get(reverse('student_profile' if user.is_student else 'company_profile')).context[
+            'unread_notification_count'
+        ]
+
+    def test_announcements_count_until_the_feed_is_read(self):
+        self.student.notifications.create(title="Shortlisted", message="For Developer")
+        self.assertEqual(self.unread_count(self.student), 1)
+
+        announcement = self.announce("Drive on Monday")
+        self.announce("Company briefing", audience='companies')
+        self.assertEqual(self.unread_count(self.student), 2)
+        self.assertEqual(self.unread_count(self.company_user), 1)
+
+        self.client.force_login(self.student)
+        response = self.client.get(reverse('notifications'))
+        items = [(item.kind, item.title, item.unread) for item in response.context['notifications']]
+        self.assertEqual(items, [('announcement', "Drive on Monday", True), ('notification', "Shortlisted", True)])
+
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.announcements_seen_at, announcement.created_at)
+        self.assertEqual(self.unread_count(self.student), 0)
+
+        self.announce("Drive moved to Tuesday")
+        self.assertEqual(self.unread_count(self.student), 1)
+
+    def test_announcements_are_read_from_the_process_cache(self):
+        self.announce("Drive on Monday")
+        self.assertEqual(self.unread_count(self.student), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.unread_count(self.student), 1)
+        self.assertFalse([query for query in queries if 'dashboard_announcement' in query['sql']])
+
+        # Saving an announcement drops the cached lists
+        Announcement.objects.filter(title="Drive on Monday").get().delete()
+        self.assertEqual(self.unread_count(self.student), 0)
+
+
+class PackageDistributionTests(ViewTestCase):
+
+    def setUp(self):
+        super().setUp()
+        JobApplication.objects.filter(job=self.job).update(status='selected')
+        for title, salary in (('Lead', '10 LPA'), ('Architect', '20 LPA'), ('Remote', '$90,000'), ('Trainee', 'Negotiable')):
+            job = JobPosting.objects.create(
+                company=self.company, title=title, category=self.category, job_type='full_time',
+                description='Build things', requirements='Python', responsibilities='Code', location='Pune',
+                salary_range=salary, application_deadline=date.today() + timedelta(days=10),
+            )
+            JobApplication.objects.create(job=job, student=self.students[0], status='selected')
+
+    def test_distribution_per_department(self):
+        cse, ece = placement_stats.package_distribution(self.season)
+
+        # Offers in other currencies or without a salary are left out
+        self.assertEqual((cse['department'], cse['offers'], cse['max']), ('CSE', 3, 2000.0))
+        self.assertAlmostEqual(cse['mean'], 3800 / 3)
+        packages = [800, 1000, 2000]
+        for percentile in placement_stats.PERCENTILES:
+            self.assertAlmostEqual(cse[f'p{percentile}'], np.percentile(packages, percentile))
+        self.assertEqual(cse['median'], 1000.0)
+        self.assertEqual(
+            ece, {'department': 'ECE', 'offers': 1, 'max': 800.0, 'mean': 800.0, 'median': 800.0,
+                  'p25': 800.0, 'p50': 800.0, 'p75': 800.0, 'p90': 800.0},
+        )
+
+    def test_median_without_the_50th_percentile(self):
+        cse, _ = placement_stats.package_distribution(self.season, percentiles=(10, 90))
+
+        self.assertNotIn('p50', cse)
+        self.assertEqual((cse['p10'], cse['median'], cse['p90']), (840.0, 1000.0, 1800.0))
+
+    def test_season_without_offers(self):
+        JobApplication.objects.update(status='applied')
+
+        self.assertEqual(placement_stats.package_distribution(self.season), [])
+
+
+class ExportTests(ViewTestCase):
+    """Contents of the streamed CSV and XLSX exports"""
+
+    def setUp(self):
+        super().setUp()
+        # Text a spreadsheet would otherwise run as formulas
+        User.objects.filter(pk=self.students[0].user_id).update(first_name='=HYPERLINK("http://evil.example")')
+        User.objects.filter(pk=self.students[1].user_id).update(first_name='Ravi', last_name='-1+2')
+        JobApplication.objects.filter(pk=self.applications[0].pk).update(status='selected')
+        self.interview(self.applications[1])
+        Interview.objects.update(interviewer='@SUM(A1:A9)', location='\tRoom 1')
+        # A student of a later season, applying to another company
+        later = PlacementSeason.objects.create(year='2026-2027', start_date=date(2026, 7, 1), end_date=date(2027, 6, 30))
+        other = CompanyProfile.objects.create(
+            user=User.objects.create_user('globex', 'hr@globex.example', 'pw', user_type='company'),
+            company_name='Globex', industry='Software', description='Tools', website='https://globex.example',
+            address='Pune',
+        )
+        job = JobPosting.objects.create(
+            company=other, title='Analyst', category=self.category, job_type='full_time', description='Data',
+            requirements='SQL', responsibilities='Reports', location='Pune', salary_range='5 LPA',
+            application_deadline=date.today() + timedelta(days=10),
+        )
+        student = StudentProfile.objects.create(
+            user=User.objects.create_user('junior', 'junior@example.com', 'pw', user_type='student'),
+            roll_number='R7', department='CSE', year_of_graduation=2027,
+        )
+        self.later_application = JobApplication.objects.create(job=job, student=student)
+        placement_stats.rebuild()
+        self.later = later
+        self.client.force_login(self.officer)
+
+    def export(self, dataset, **filters):
+        """Rows of an export, header first, read from CSV and XLSX alike"""
+        csv_response = self.client.get(reverse('export_data', args=[dataset]), filters)
+        text = b''.join(csv_response.streaming_content).decode('utf-8')
+        self.assertTrue(text.startswith('\ufeff'))
+        csv_rows = list(csv.reader(io.StringIO(text[1:])))
+
+        xlsx_response = self.client.get(reverse('export_data', args=[dataset]), {**filters, 'format': 'xlsx'})
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(xlsx_response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(
+            sorted(archive.namelist()),
+            ['[Content_Types].xml', '_rels/.rels', 'xl/_rels/workbook.xml.rels', 'xl/workbook.xml',
+             'xl/worksheets/sheet1.xml'],
+        )
+        sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+        xlsx_rows = [
+            [''.join(cell.itertext()) for cell in row]
+            for row in sheet.iter(f'{SHEET_NS}row')
+        ]
+
+        self.assertEqual(xlsx_rows, csv_rows)
+        return csv_rows
+
+    def records(self, dataset, **filters):
+        header, *rows = self.export(dataset, **filters)
+        return [dict(zip(header, row)) for row in rows]
+
+    def test_headers(self):
+        for name, dataset in exports.DATASETS.items():
+            with self.subTest(dataset=name):
+                self.assertEqual(self.export(name)[0], [header for header, _ in dataset.columns])
+
+    def test_application_rows(self):
+        first, second, later = self.records('applications')
+
+        self.assertEqual(
+            (first['ID'], first['Status'], first['Roll Number'], first['Department'], first['Company'], first['Job']),
+            (str(self.applications[0].pk), 'selected', 'R0', 'CSE', 'Acme', 'Developer'),
+        )
+        self.assertEqual((second['Email'], later['Company']), ('student1@example.com', 'Globex'))
+        applied_at = timezone.localtime(self.applications[0].applied_at)
+        self.assertEqual(first['Applied At'], applied_at.strftime('%Y-%m-%d %H:%M'))
+
+    def test_filters(self):
+        def ids(dataset, column='ID', **filters):
+            return [record[column] for record in self.records(dataset, **filters)]
+
+        first, second = (str(application.pk) for application in self.applications)
+        self.assertEqual(ids('applications', status='selected'), [first])
+        self.assertEqual(ids('applications', season=self.season.pk), [first, second])
+        self.assertEqual(ids('applications', season=self.later.pk), [str(self.later_application.pk)])
+        self.assertEqual(ids('applications', company=self.company.pk), [first, second])
+        self.assertEqual(ids('applications', department='ECE'), [second])
+        self.assertEqual(ids('applications', department='ECE', status='selected'), [])
+        self.assertEqual(len(ids('interviews', status='scheduled', company=self.company.pk)), 1)
+        self.assertEqual(ids('interviews', department='CSE'), [])
+        self.assertEqual(ids('statistics', 'Department', season=self.season.pk), ['CSE', 'ECE'])
+
+    def test_formulas_are_escaped(self):
+        first, second, _ = self.records('applications')
+        self.assertEqual(first['First Name'], '\'=HYPERLINK("http://evil.example")')
+        self.assertEqual((second['First Name'], second['Last Name']), ('Ravi', "'-1+2"))
+
+        interview, = self.records('interviews')
+        self.assertEqual((interview['Interviewer'], interview['Location']), ("'@SUM(A1:A9)", "'\tRoom 1"))
+
+
+class OfficerCounterTests(TestCase):
+
+    def test_deltas_create_missing_shards(self):
+        self.assertFalse(DashboardCounter.objects.filter(key=snapshots.OFFICER_KEY).exists())
+
+        for shard, deltas in ((3, {'applications': 2, 'jobs': 1}), (3, {'applications': 1}), (5, {'applications': -1})):
+            with mock.patch('dashboard.snapshots.random.randrange', return_value=shard):
+                with self.captureOnCommitCallbacks(execute=True):
+                    snapshots.apply_deltas(deltas)
+
+        self.assertEqual(snapshots.read_counters(), {'applications': 2, 'jobs': 1, 'changes': 3})
+        rows = dict(DashboardCounter.objects.filter(key=snapshots.OFFICER_KEY).values_list('name', 'value'))
+        # Every shard of a new counter is created, the others at zero
+        self.assertEqual(len(rows), 3 * snapshots.COUNTER_SHARDS)
+        self.assertEqual(
+            {name: value for name, value in rows.items() if value},
+            {'applications#3': 3, 'applications#5': -1, 'changes#3': 2, 'changes#5': 1, 'jobs#3': 1},
+        )
+
+    def test_deltas_add_to_refreshed_counters(self):
+        _, counts = snapshots.refresh_officer_snapshot()
+
+        with mock.patch('dashboard.snapshots.random.randrange', return_value=snapshots.COUNTER_SHARDS - 1):
+            with self.captureOnCommitCallbacks(execute=True):
+                snapshots.apply_deltas({'applications': 4})
+
+        counters = snapshots.read_counters()
+        self.assertEqual(counters['applications'], counts['applications'] + 4)
+        self.assertEqual(counters['changes'], 1)
+
+
+class CalendarFeedTests(ViewTestCase):
+
+    def test_reset_revokes_the_feed_url(self):
+        user = self.students[0].user
+        old_url = reverse('calendar_feed', args=[feed_token(user)])
+        self.assertEqual(self.client.get(old_url).status_code, 200)
+        self.client.force_login(user)
+
+        response = self.client.post(reverse('reset_calendar_feed'))
+
+        self.assertRedirects(response, reverse('interviews'), fetch_redirect_response=False)
+        user.refresh_from_db()
+        self.assertEqual(self.client.get(old_url).status_code, 404)
+        self.assertEqual(self.client.get(reverse('calendar_feed', args=[feed_token(user)])).status_code, 200)
+        # Another user's feed is unaffected
+        self.assertEqual(self.client.get(reverse('calendar_feed', args=[feed_token(self.company_user)])).status_code, 200)
+
+    def test_feed_is_rebuilt_only_for_the_owners_of_a_changed_interview(self):
+        ical.feed_cache().clear()
+        users = [student.user for student in self.students] + [self.company_user, self.officer]
+        for user in users:
+            self.client.get(reverse('calendar_feed', args=[feed_token(user)]))
+
+        self.interview(self.applications[1])
+        with mock.patch('dashboard.ical.serialize', wraps=ical.serialize) as serialize:
+            for user in users:
+                self.client.get(reverse('calendar_feed', args=[feed_token(user)]))
+
+        self.assertEqual(
+            [call.args[0].username for call in serialize.call_args_list],
+            ['student1', self.company_user.username, self.officer.username],
+        )
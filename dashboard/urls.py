@@ -10,8 +10,25 @@ urlpatterns = [
     # Statistics
     path('statistics/', views.statistics, name='statistics'),
     path('season/create/', views.create_season, name='create_season'),
+    path('statistics/update/', views.update_statistics, name='update_statistics'),
     path('statistics/update/<str:department>/', views.update_statistics, name='update_statistics'),
     
+    # Chart data
+    path('charts/application-status/', views.chart_application_status, name='chart_application_status'),
+    path('charts/placement-rate/', views.chart_placement_rate, name='chart_placement_rate'),
+    path('charts/job-types/', views.chart_job_types, name='chart_job_types'),
+    path('charts/monthly-activity/', views.chart_monthly_activity, name='chart_monthly_activity'),
+    
+    # Calendar feed
+    path('calendar/<str:token>.ics', views.calendar_feed, name='calendar_feed'),
+    path('calendar/reset/', views.reset_calendar_feed, name='reset_calendar_feed'),
+    
+    # Exports
+    path('export/<str:dataset>/', views.export_data, name='export_data'),
+    
+    # Dashboard fragment cache
+    path('fragment-cache/', views.fragment_cache_stats, name='fragment_cache_stats'),
+    
     # Announcements and Events
     path('announcement/create/', views.create_announcement, name='create_announcement'),
     path('event/create/', views.create_event, name='create_event'),
@@ -0,0 +1,112 @@
+"""
+Data version counters.
+
+Each counter names a set of data shown by the chart endpoints or the
+dashboard fragments and is incremented, once the transaction commits,
+whenever that data changes:
+
+* applications - application counts by status
+* placement - PlacementStatistics rows
+* activity - ActivityRollup rows
+* job_postings, job_applications, interviews, announcements, events and
+  profiles - any saved or deleted row of the model (dashboard/signals.py)
+
+The chart endpoints build their ETags from these numbers, so a client
+polling with If-None-Match gets a 304 after a single query until the
+data actually changes; the dashboards key their cached fragments on them
+(see dashboard/fragments.py). Counters are DashboardCounter rows under the
+``version`` key; a missing row reads as 0.
+
+Dashboard data written once a transaction commits (officer counters,
+activity rollups) goes through defer(). Inside batched(), the deferred
+writes and version bumps of a whole block are merged and written by one
+on_commit callback, the versions last, so a status change takes the same
+few statements however many of them its receivers make.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import DashboardCounter
+
+VERSION_KEY = 'version'
+
+_batch = ContextVar('dashboard_batch', default=None)
+
+
+class _Batch:
+    def __init__(self):
+        # Writer -> merged deltas, in the order the writers were first used
+        self.writes = {}
+        self.versions = set()
+
+    def __bool__(self):
+        return bool(self.writes or self.versions)
+
+    def write(self):
+        for writer, deltas in self.writes.items():
+            writer(deltas)
+        if self.versions:
+            _increment(sorted(self.versions))
+
+
+@contextmanager
+def batched():
+    """
+    Merge the defer() and bump() calls of the block into one on_commit
+    callback; nested blocks join the outer one
+    """
+    if _batch.get() is not None:
+        yield
+        return
+    batch = _Batch()
+    token = _batch.set(batch)
+    try:
+        yield
+    finally:
+        _batch.reset(token)
+    if batch:
+        transaction.on_commit(batch.write)
+
+
+def defer(writer, deltas):
+    """
+    Call writer with a Counter of deltas once the current transaction
+    commits, merged with the other deltas for it in a batched() block
+    """
+    batch = _batch.get()
+    if batch is None:
+        transaction.on_commit(partial(writer, Counter(deltas)))
+    else:
+        batch.writes.setdefault(writer, Counter()).update(deltas)
+
+
+def _increment(names):
+    updated = DashboardCounter.objects.filter(key=VERSION_KEY, name__in=names).update(value=F('value') + 1)
+    if updated < len(names):
+        DashboardCounter.objects.bulk_create(
+            [DashboardCounter(key=VERSION_KEY, name=name, value=1) for name in names],
+            ignore_conflicts=True,
+        )
+
+
+def bump(*names):
+    """Increment the named versions when the current transaction commits"""
+    batch = _batch.get()
+    if batch is not None:
+        batch.versions.update(names)
+        return
+    names = sorted(set(names))
+    transaction.on_commit(lambda: _increment(names))
+
+
+def current(*names):
+    """Return {name: version} for the named versions"""
+    versions = dict(
+        DashboardCounter.objects.filter(key=VERSION_KEY, name__in=names).values_list('name', 'value')
+    )
+    return {name: versions.get(name, 0) for name in names}
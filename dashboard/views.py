@@ -1,16 +1,34 @@
+import hashlib
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db.models import Count, Avg, Max, Sum, Q
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.functional import SimpleLazyObject
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 
-from .models import PlacementSeason, PlacementStatistics, Announcement, Event
-from .forms import AnnouncementForm, EventForm, PlacementSeasonForm, PlacementStatisticsForm
-from accounts.models import User, StudentProfile, CompanyProfile
+from .models import PlacementSeason, PlacementStatistics, Event
+from .forms import AnnouncementForm, EventForm, PlacementSeasonForm
+from .feed import active_announcements, announcements_for
+from .fragments import fragment_stats, fragment_versions
+from .placement_stats import package_distribution, rebuild as rebuild_placement_stats
+from .snapshots import STATUS_KEYS, officer_summary
+from .versions import current as current_versions
+from . import charts, exports, ical
+from accounts.models import User
+from accounts.decorators import query_budget
+from accounts.middleware import require_profile
+from accounts.replicas import use_replica
 from jobs.models import JobPosting, JobApplication, Interview
 
 
 @login_required
+@query_budget(12)
 def student_dashboard(request):
     """Dashboard for students"""
     if not request.user.is_student:
@@ -18,53 +36,37 @@ def student_dashboard(request):
         return redirect('home')
     
     # Get student profile
-    student = get_object_or_404(StudentProfile, user=request.user)
+    student = require_profile(request)
     
-    # Get student's applications
-    applications = JobApplication.objects.filter(student=student).select_related('job')
+    # The querysets below are only evaluated by fragments missing from the cache
+    applications = JobApplication.objects.filter(student=student).select_related('job__company')
     
     # Get upcoming interviews
     upcoming_interviews = Interview.objects.filter(
         application__student=student,
         date_time__gte=timezone.now(),
         status='scheduled'
-    ).order_by('date_time')
+    ).select_related('application__job__company').order_by('date_time')
     
     # Get active job postings that match student's department
     matching_jobs = JobPosting.objects.filter(
         status='open',
         application_deadline__gte=timezone.now().date()
-    ).order_by('-created_at')[:5]
-    
-    # Get announcements relevant to students
-    announcements = Announcement.objects.filter(
-        Q(audience='all') | Q(audience='students'),
-        is_active=True,
-    ).filter(
-        Q(expires_at__isnull=True) | Q(expires_at__gte=timezone.now())
-    ).order_by('-created_at')[:5]
-    
-    # Get upcoming events
-    events = Event.objects.filter(
-        date_time__gte=timezone.now(),
-        is_active=True
-    ).order_by('date_time')[:5]
+    ).select_related('company').order_by('-created_at')[:5]
     
     context = {
         'student': student,
         'applications': applications,
-        'application_count': applications.count(),
-        'interview_count': upcoming_interviews.count(),
         'upcoming_interviews': upcoming_interviews,
         'matching_jobs': matching_jobs,
-        'announcements': announcements,
-        'events': events,
+        'versions': fragment_versions('student', student.pk),
     }
     
     return render(request, 'dashboard/student_dashboard.html', context)
 
 
 @login_required
+@query_budget(16)
 def company_dashboard(request):
     """Dashboard for companies"""
     if not request.user.is_company:
@@ -72,53 +74,48 @@ def company_dashboard(request):
         return redirect('home')
     
     # Get company profile
-    company = get_object_or_404(CompanyProfile, user=request.user)
+    company = require_profile(request)
     
-    # Get company's job postings
+    # The querysets below are only evaluated by fragments missing from the cache
     jobs = JobPosting.objects.filter(company=company)
     active_jobs = jobs.filter(status='open')
     
     # Get applications for company's jobs
     applications = JobApplication.objects.filter(job__company=company)
-    recent_applications = applications.order_by('-applied_at')[:10]
+    recent_applications = applications.select_related('student__user', 'job').order_by('-applied_at')[:10]
+    
+    # Application statistics, counted in one query
+    application_stats = SimpleLazyObject(lambda: applications.aggregate(
+        total=Count('id'),
+        **{key: Count('id', filter=Q(status=status)) for status, key in STATUS_KEYS.items()}
+    ))
     
     # Get upcoming interviews
     upcoming_interviews = Interview.objects.filter(
         application__job__company=company,
         date_time__gte=timezone.now()
-    ).order_by('date_time')[:5]
-    
-    # Application statistics
-    application_stats = {
-        'total': applications.count(),
-        'pending': applications.filter(status='applied').count(),
-        'shortlisted': applications.filter(status='shortlisted').count(),
-        'selected': applications.filter(status='selected').count(),
-        'rejected': applications.filter(status='rejected').count(),
-    }
-    
-    # Get announcements relevant to companies
-    announcements = Announcement.objects.filter(
-        Q(audience='all') | Q(audience='companies'),
-        is_active=True,
-    ).filter(
-        Q(expires_at__isnull=True) | Q(expires_at__gte=timezone.now())
-    ).order_by('-created_at')[:5]
+    ).select_related('application__student__user', 'application__job').order_by('date_time')[:5]
     
+    versions = fragment_versions('company', company.pk)
     context = {
         'company': company,
+        'jobs': jobs,
         'active_jobs': active_jobs,
-        'jobs_count': jobs.count(),
         'applications_stats': application_stats,
         'recent_applications': recent_applications,
         'upcoming_interviews': upcoming_interviews,
-        'announcements': announcements,
+        'announcements': SimpleLazyObject(
+            lambda: announcements_for(request.user, versions['announcements'])[:5]
+        ),
+        'versions': versions,
     }
     
     return render(request, 'dashboard/company_dashboard.html', context)
 
 
 @login_required
+@query_budget(20)
+@use_replica
 def officer_dashboard(request):
     """Dashboard for placement officers"""
     if not request.user.is_officer:
@@ -128,21 +125,13 @@ def officer_dashboard(request):
     # Get statistics for current placement season
     current_season = PlacementSeason.objects.filter(is_active=True).first()
     
-    # Overall statistics
-    total_companies = CompanyProfile.objects.count()
-    total_students = StudentProfile.objects.count()
-    total_jobs = JobPosting.objects.count()
-    active_jobs = JobPosting.objects.filter(status='open').count()
-    
-    # Application statistics
-    applications = JobApplication.objects.all()
-    application_stats = {
-        'total': applications.count(),
-        'pending': applications.filter(status='applied').count(),
-        'shortlisted': applications.filter(status='shortlisted').count(),
-        'selected': applications.filter(status='selected').count(),
-        'rejected': applications.filter(status='rejected').count(),
-    }
+    # Totals, status breakdown and recent activity come from the snapshot,
+    # read only when its fragment is missing from the cache. A refresh
+    # recomputes it first, which bumps the versions it is cached under.
+    if request.GET.get('refresh') == '1':
+        summary = officer_summary(refresh=True)
+    else:
+        summary = SimpleLazyObject(officer_summary)
     
     # Department-wise placement statistics
     if current_season:
@@ -150,36 +139,27 @@ def officer_dashboard(request):
     else:
         department_stats = []
     
-    # Recent activities
-    recent_jobs = JobPosting.objects.order_by('-created_at')[:5]
-    recent_applications = JobApplication.objects.order_by('-applied_at')[:5]
-    upcoming_interviews = Interview.objects.filter(date_time__gte=timezone.now()).order_by('date_time')[:5]
-    
-    # Get all announcements
-    announcements = Announcement.objects.filter(is_active=True).order_by('-created_at')[:5]
-    
     # Get upcoming events
-    events = Event.objects.filter(date_time__gte=timezone.now(), is_active=True).order_by('date_time')[:5]
+    events = Event.objects.filter(
+        date_time__gte=timezone.now(), is_active=True
+    ).select_related('company').order_by('date_time')[:5]
     
+    versions = fragment_versions()
     context = {
         'current_season': current_season,
-        'total_companies': total_companies,
-        'total_students': total_students,
-        'total_jobs': total_jobs,
-        'active_jobs': active_jobs,
-        'application_stats': application_stats,
+        'summary': summary,
         'department_stats': department_stats,
-        'recent_jobs': recent_jobs,
-        'recent_applications': recent_applications,
-        'upcoming_interviews': upcoming_interviews,
-        'announcements': announcements,
+        'announcements': SimpleLazyObject(lambda: active_announcements(version=versions['announcements'])[:5]),
         'events': events,
+        'versions': versions,
     }
     
     return render(request, 'dashboard/officer_dashboard.html', context)
 
 
 @login_required
+@query_budget(10)
+@use_replica
 def statistics(request):
     """View detailed placement statistics"""
     # Check if current season exists, otherwise redirect to create one
@@ -200,40 +180,36 @@ def statistics(request):
     
     # Department-wise statistics for selected season
     if selected_season:
-        department_stats = PlacementStatistics.objects.filter(season=selected_season)
+        department_stats = list(PlacementStatistics.objects.filter(season=selected_season))
     else:
         department_stats = []
     
-    # Job type distribution
-    job_type_distribution = JobPosting.objects.filter(
-        created_at__gte=selected_season.start_date if selected_season else '1900-01-01',
-        created_at__lte=selected_season.end_date if selected_season else '2999-12-31'
-    ).values('job_type').annotate(count=Count('id'))
+    # Season totals across departments
+    total_students = sum(stat.total_students for stat in department_stats)
+    placed_students = sum(stat.placed_students for stat in department_stats)
+    season_totals = {
+        'total_students': total_students,
+        'placed_students': placed_students,
+        'placement_percentage': (placed_students / total_students) * 100 if total_students else 0,
+        'highest_package': max((stat.highest_package or 0 for stat in department_stats), default=0),
+    }
     
-    # Monthly job postings
-    if selected_season:
-        # This is a simplified example - in real implementation, you might use more complex queries
-        monthly_jobs = JobPosting.objects.filter(
-            created_at__gte=selected_season.start_date,
-            created_at__lte=selected_season.end_date
-        ).extra(
-            select={'month': "EXTRACT(MONTH FROM created_at)"}
-        ).values('month').annotate(count=Count('id')).order_by('month')
-    else:
-        monthly_jobs = []
+    # Package distribution; the charts load their data from the chart endpoints
+    packages = package_distribution(selected_season) if selected_season else []
     
     context = {
         'seasons': seasons,
         'selected_season': selected_season,
         'department_stats': department_stats,
-        'job_type_distribution': job_type_distribution,
-        'monthly_jobs': monthly_jobs
+        'season_totals': season_totals,
+        'package_distribution': packages,
     }
     
     return render(request, 'dashboard/statistics.html', context)
 
 
 @login_required
+@query_budget(8)
 def create_announcement(request):
     """Create a new announcement"""
     if not request.user.is_officer:
@@ -255,6 +231,7 @@ def create_announcement(request):
 
 
 @login_required
+@query_budget(10)
 def create_event(request):
     """Create a new event"""
     if not request.user.is_officer:
@@ -276,6 +253,7 @@ def create_event(request):
 
 
 @login_required
+@query_budget(10)
 def create_season(request):
     """Create a new placement season"""
     if not request.user.is_officer:
@@ -300,9 +278,17 @@ def create_season(request):
     return render(request, 'dashboard/create_season.html', {'form': form})
 
 
+# Queries of a statistics recompute per department it writes
+RECOMPUTE_GROUP_BUDGET = 6
+
+
 @login_required
+@query_budget(10)
 def update_statistics(request, department=None):
-    """Update placement statistics for a department"""
+    """
+    Show the maintained statistics of the current season and recompute
+    them (for one department, or all of them) from the application data
+    """
     if not request.user.is_officer:
         messages.error(request, "Only placement officers can update statistics.")
         return redirect('home')
@@ -310,28 +296,182 @@ def update_statistics(request, department=None):
     # Get current season
     current_season = get_object_or_404(PlacementSeason, is_active=True)
     
-    # If department is provided, get existing stats or create new
-    if department:
-        stats, created = PlacementStatistics.objects.get_or_create(
-            season=current_season,
-            department=department
-        )
-    else:
-        stats = None
-    
     if request.method == 'POST':
-        form = PlacementStatisticsForm(request.POST, instance=stats)
-        if form.is_valid():
-            form.save()
-            messages.success(request, "Statistics updated successfully!")
-            return redirect('statistics')
-    else:
-        form = PlacementStatisticsForm(instance=stats)
+        # The figures are maintained from the data and cannot be typed in;
+        # a recompute repairs any drift (see check_placement_stats)
+        groups = rebuild_placement_stats(current_season, departments=[department] if department else None)
+        request.query_budget = 10 + RECOMPUTE_GROUP_BUDGET * groups
+        messages.success(request, f"Recomputed statistics for {groups} department(s).")
+        return redirect('statistics')
+    
+    statistics = PlacementStatistics.objects.filter(season=current_season).order_by('department')
+    if department:
+        statistics = statistics.filter(department=department)
     
     context = {
-        'form': form,
+        'statistics': statistics,
         'season': current_season,
         'department': department
     }
     
     return render(request, 'dashboard/update_statistics.html', context)
+
+
+# Chart data endpoints, polled by static/js/charts.js
+
+# Bump when the JSON layout of the charts changes
+CHART_FORMAT = 1
+
+
+def chart_etag(*versions):
+    """
+    ETag function for condition(): derived from the named data versions,
+    the user (whose role decides what they see) and the query string
+    """
+    def etag(request, *args, **kwargs):
+        current = sorted(current_versions(*versions).items())
+        key = f"{CHART_FORMAT}|{request.user.pk}|{request.get_full_path()}|{current}"
+        return hashlib.sha1(key.encode()).hexdigest()
+    return etag
+
+
+def chart_season(request):
+    """The season chosen with ?season=, else the active one, else the latest"""
+    season_id = request.GET.get('season', '')
+    if season_id.isdigit():
+        return get_object_or_404(PlacementSeason, id=season_id)
+    return (
+        PlacementSeason.objects.filter(is_active=True).first()
+        or PlacementSeason.objects.order_by('-year').first()
+    )
+
+
+@login_required
+@query_budget(8)
+@use_replica
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=chart_etag('applications'))
+def chart_application_status(request):
+    """Applications by status: all of them for officers, their own for companies"""
+    if request.user.is_officer:
+        return JsonResponse(charts.application_status())
+    if request.user.is_company:
+        company = require_profile(request)
+        return JsonResponse(charts.application_status(company))
+    return JsonResponse({'error': "Only officers and companies can view application statistics."}, status=403)
+
+
+@login_required
+@query_budget(5)
+@use_replica
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=chart_etag('placement'))
+def chart_placement_rate(request):
+    """Placement rate per department of a season"""
+    return JsonResponse(charts.placement_rate(chart_season(request)))
+
+
+@login_required
+@query_budget(5)
+@use_replica
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=chart_etag('activity'))
+def chart_job_types(request):
+    """Job postings of a season by job type"""
+    return JsonResponse(charts.job_types(chart_season(request)))
+
+
+@login_required
+@query_budget(5)
+@use_replica
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=chart_etag('activity'))
+def chart_monthly_activity(request):
+    """Monthly postings, applications, interviews and selections of a season"""
+    return JsonResponse(charts.monthly_activity(chart_season(request)))
+
+
+@login_required
+@query_budget(4)
+def fragment_cache_stats(request):
+    """Hit and miss counts of the dashboard fragment cache"""
+    if not request.user.is_officer:
+        return JsonResponse({'error': "Only placement officers can view cache statistics."}, status=403)
+    stats = fragment_stats()
+    hits = sum(counts['hits'] for counts in stats.values())
+    misses = sum(counts['misses'] for counts in stats.values())
+    return JsonResponse({
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / (hits + misses), 3) if hits + misses else None,
+        'fragments': stats,
+    })
+
+
+@query_budget(6)
+@cache_control(private=True, no_cache=True)
+def calendar_feed(request, token):
+    """
+    iCalendar feed of a user's interviews and events; the signed token in
+    the URL stands in for a login, which calendar clients cannot do
+    """
+    user = ical.feed_user(token)
+    if user is None:
+        raise Http404("Unknown calendar feed.")
+    last_modified, etag, body = ical.feed(user)
+    last_modified = int(last_modified.timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(body, content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = 'inline; filename="placement.ics"'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+@login_required
+@query_budget(5)
+def reset_calendar_feed(request):
+    """Give the user a new calendar feed URL; the old one stops working"""
+    if request.method == 'POST':
+        ical.reset_feed_token(request.user)
+        messages.success(request, "Your calendar feed URL has been reset. Subscribe again with the new one.")
+    return redirect('interviews')
+
+
+@login_required
+@query_budget(4)
+@use_replica
+def export_data(request, dataset):
+    """
+    Stream applications, interviews or statistics as CSV or XLSX
+    (?format=xlsx), filtered like the listings
+    """
+    if not request.user.is_officer:
+        messages.error(request, "Only placement officers can export data.")
+        return redirect('home')
+    
+    file_format = request.GET.get('format', 'csv')
+    if dataset not in exports.DATASETS or file_format not in exports.FORMATS:
+        raise Http404("Unknown export.")
+    try:
+        dataset_info, queryset = exports.export_queryset(
+            dataset,
+            status=request.GET.get('status'),
+            season=request.GET.get('season'),
+            company=request.GET.get('company'),
+            department=request.GET.get('department'),
+        )
+    except exports.ExportError as exc:
+        messages.error(request, str(exc))
+        return redirect('statistics')
+    
+    # The rows are queried while the response is sent, outside the query budget
+    response = StreamingHttpResponse(
+        exports.export_chunks(dataset_info, queryset, file_format),
+        content_type=exports.FORMATS[file_format],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{exports.export_filename(dataset, file_format)}"'
+    response['Cache-Control'] = 'private, no-store'
+    response['X-Accel-Buffering'] = 'no'
+    return response
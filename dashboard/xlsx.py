@@ -0,0 +1,143 @@
+"""
+Streaming XLSX writer.
+
+An XLSX file is a zip archive of XML parts. xlsx_chunks() writes the
+single worksheet row by row into a zip stream and yields the compressed
+bytes as they are produced, so memory use does not grow with the number
+of rows and the first bytes are sent before the last row is read.
+zipfile writes to unseekable outputs with data descriptors after each
+member, which spreadsheet applications read like any other workbook.
+
+Strings are written inline rather than through a shared string table,
+which would have to be complete before the worksheet is closed.
+"""
+import re
+import zipfile
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+# Rows of a worksheet, including the header row
+MAX_ROWS = 1048576
+
+# Bytes of worksheet XML buffered before compressed output is yielded
+FLUSH_SIZE = 64 * 1024
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+
+_SHEET_END = '</sheetData></worksheet>'
+
+# Characters XML 1.0 does not allow, even escaped
+_ILLEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+# Characters Excel does not allow in sheet names
+_ILLEGAL_SHEET_NAME = re.compile(r'[\[\]:*?/\\]')
+
+
+class _Output:
+    """Unseekable file collecting what zipfile writes until it is drained"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _cell(value):
+    if value is None or value == '':
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c><v>{value}</v></c>'
+    text = escape(_ILLEGAL_XML.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _row(values):
+    return '<row>' + ''.join(map(_cell, values)) + '</row>'
+
+
+def xlsx_chunks(sheet_name, headers, rows):
+    """
+    Yield an XLSX workbook of one worksheet as byte chunks. Rows past the
+    worksheet limit of MAX_ROWS are left out.
+    """
+    output = _Output()
+    archive = zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED)
+    sheet_name = escape(_ILLEGAL_SHEET_NAME.sub('', sheet_name)[:31], {'"': '&quot;'})
+    archive.writestr('[Content_Types].xml', _CONTENT_TYPES)
+    archive.writestr('_rels/.rels', _ROOT_RELS)
+    archive.writestr('xl/workbook.xml', _WORKBOOK.format(name=sheet_name))
+    archive.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+    yield output.drain()
+
+    with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+        buffered = [_SHEET_START, _row(headers)]
+        size = 0
+        for count, row in enumerate(rows, start=2):
+            if count > MAX_ROWS:
+                break
+            xml = _row(row)
+            buffered.append(xml)
+            size += len(xml)
+            if size >= FLUSH_SIZE:
+                sheet.write(''.join(buffered).encode())
+                buffered, size = [], 0
+                data = output.drain()
+                if data:
+                    yield data
+        buffered.append(_SHEET_END)
+        sheet.write(''.join(buffered).encode())
+    archive.close()
+    yield output.drain()
@@ -1,6 +1,7 @@
 from django import forms
 from django.utils import timezone
-from .models import JobPosting, JobApplication, Interview, JobCategory
+from .models import JobPosting, JobApplication, Interview, JobCategory, MAX_INTERVIEW_MINUTES
+from .scheduler import Window
 
 class JobPostingForm(forms.ModelForm):
     """Form for creating and editing job postings"""
@@ -55,7 +56,7 @@ class InterviewForm(forms.ModelForm):
     class Meta:
         model = Interview
         fields = [
-            'date_time', 'location', 'interview_type', 
+            'date_time', 'duration_minutes', 'location', 'interview_type', 
             'interviewer', 'notes', 'meeting_link', 'status', 'feedback'
         ]
         widgets = {
@@ -83,3 +84,60 @@ class InterviewForm(forms.ModelForm):
             self.add_error('location', "Location is required for in-person interviews.")
         
         return cleaned_data
+
+
+class InterviewBatchForm(forms.Form):
+    """Interviewer availability, slot length and venues for scheduling a job's shortlist"""
+    interview_type = forms.ChoiceField(choices=Interview.INTERVIEW_TYPE_CHOICES)
+    slot_minutes = forms.IntegerField(min_value=5, max_value=MAX_INTERVIEW_MINUTES, initial=30)
+    gap_minutes = forms.IntegerField(min_value=0, max_value=120, initial=0, required=False)
+    windows = forms.CharField(
+        widget=forms.Textarea(attrs={'rows': 4, 'placeholder': 'Priya Sharma, 2026-11-02 09:00, 2026-11-02 13:00'}),
+        help_text="One availability window per line: interviewer, start, end",
+    )
+    venues = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={'rows': 3, 'placeholder': 'Room 101'}),
+        help_text="One room, or meeting link for online interviews, per line",
+    )
+    notes = forms.CharField(required=False, widget=forms.Textarea(attrs={'rows': 2}))
+    
+    def clean_windows(self):
+        windows = []
+        parse = forms.DateTimeField().clean
+        for number, line in enumerate(self.cleaned_data['windows'].splitlines(), start=1):
+            if not line.strip():
+                continue
+            parts = [part.strip() for part in line.split(',')]
+            if len(parts) != 3 or not parts[0]:
+                raise forms.ValidationError(f"Line {number}: write interviewer, start, end.")
+            try:
+                start, end = parse(parts[1]), parse(parts[2])
+            except forms.ValidationError:
+                raise forms.ValidationError(f"Line {number}: enter dates as YYYY-MM-DD HH:MM.")
+            if end <= start:
+                raise forms.ValidationError(f"Line {number}: the window ends before it starts.")
+            if start < timezone.now():
+                raise forms.ValidationError(f"Line {number}: the window starts in the past.")
+            windows.append(Window(parts[0], start, end))
+        if not windows:
+            raise forms.ValidationError("Enter at least one availability window.")
+        return windows
+    
+    def clean_venues(self):
+        return [line.strip() for line in self.cleaned_data['venues'].splitlines() if line.strip()]
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        interview_type = cleaned_data.get('interview_type')
+        venues = cleaned_data.get('venues')
+        if interview_type and interview_type != 'phone' and not venues:
+            self.add_error('venues', "Enter the rooms or meeting links to use.")
+        if interview_type == 'online':
+            url = forms.URLField().clean
+            for venue in venues or ():
+                try:
+                    url(venue)
+                except forms.ValidationError:
+                    self.add_error('venues', f"{venue} is not a valid meeting link.")
+        return cleaned_data
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from dashboard import placement_stats
+from jobs.models import JobApplication, JobPosting
+from jobs.salary import salary_fields
+
+FIELDS = ['salary_min', 'salary_max', 'salary_currency', 'salary_period']
+
+
+class Command(BaseCommand):
+    help = "Parse salary_range into the structured salary fields of every job posting"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help="Number of job postings fetched and updated per database round-trip",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        jobs = (
+            JobPosting.objects.only('pk', 'salary_range', *FIELDS)
+            .order_by('pk')
+            .iterator(chunk_size=chunk_size)
+        )
+        parsed = changed = 0
+        chunk = []
+        # Graduation years of the students selected for a changed job
+        self.years = set()
+        for job in jobs:
+            fields = salary_fields(job.salary_range)
+            parsed += fields['salary_max'] is not None
+            if any(getattr(job, name) != value for name, value in fields.items()):
+                for name, value in fields.items():
+                    setattr(job, name, value)
+                chunk.append(job)
+            if len(chunk) == chunk_size:
+                changed += self.write(chunk)
+                chunk = []
+        changed += self.write(chunk)
+
+        # bulk_update sends no signals, so the packages of the offers are
+        # brought up to date by recomputing the seasons they count in
+        seasons = {placement_stats.season_for_year(year) for year in self.years} - {None}
+        for season in sorted(seasons, key=lambda season: season.end_date):
+            placement_stats.rebuild(season)
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {changed} job posting(s); {parsed} have a parseable salary. "
+            f"Recomputed placement statistics for {len(seasons)} season(s)."
+        ))
+
+    def write(self, chunk):
+        with transaction.atomic():
+            JobPosting.objects.bulk_update(chunk, FIELDS)
+        self.years.update(
+            JobApplication.objects.filter(status='selected', job__in=chunk)
+            .order_by().values_list('student__year_of_graduation', flat=True).distinct()
+        )
+        return len(chunk)
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from jobs.models import JobPosting
+from jobs.search import get_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the job posting search index from scratch"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=500,
+            help="Number of job postings fetched per database round-trip",
+        )
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        jobs = (
+            JobPosting.objects.select_related('company', 'category')
+            .order_by('pk')
+            .iterator(chunk_size=options['chunk_size'])
+        )
+        count = backend.rebuild(jobs)
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {count} job postings with {type(backend).__name__}."
+        ))
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def add_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(
+        "CREATE FULLTEXT INDEX jobs_searchdoc_content_ft ON jobs_jobsearchdocument (content)"
+    )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    schema_editor.execute(
+        "DROP INDEX jobs_searchdoc_content_ft ON jobs_jobsearchdocument"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSearchDocument',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='jobs.jobposting')),
+                ('content', models.TextField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='JobSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.FloatField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='jobs.jobposting')),
+            ],
+            options={
+                'unique_together': {('term', 'job')},
+            },
+        ),
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_unread_notification_counter'),
+        ('jobs', '0002_job_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobposting',
+            name='salary_currency',
+            field=models.CharField(blank=True, choices=[('INR', 'Indian Rupee'), ('USD', 'US Dollar'), ('EUR', 'Euro'), ('GBP', 'Pound Sterling')], editable=False, max_length=3),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='salary_max',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=14, null=True),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='salary_min',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=14, null=True),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='salary_period',
+            field=models.CharField(blank=True, choices=[('year', 'Per Year'), ('month', 'Per Month'), ('hour', 'Per Hour')], editable=False, max_length=5),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['salary_currency', 'salary_max'], name='job_salary_max_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['salary_currency', 'salary_min'], name='job_salary_min_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:22
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_structured_salary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interview',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(default=60, validators=[django.core.validators.MinValueValidator(5), django.core.validators.MaxValueValidator(480)]),
+        ),
+    ]
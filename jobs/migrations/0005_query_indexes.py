@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_query_indexes'),
+        ('jobs', '0004_interview_duration'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(fields=['date_time', 'status'], name='interview_date_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['job', 'status', 'applied_at'], name='application_job_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['student', 'applied_at'], name='application_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['status', 'applied_at'], name='application_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['status', 'created_at'], name='job_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['status', 'application_deadline'], name='job_status_deadline_idx'),
+        ),
+    ]
@@ -1,6 +1,10 @@
+from datetime import timedelta
+
 from django.db import models
 from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
 from accounts.models import CompanyProfile, StudentProfile
+from .salary import CURRENCY_CHOICES, PERIOD_CHOICES, salary_fields
 
 class JobCategory(models.Model):
     """
@@ -12,6 +16,15 @@ class JobCategory(models.Model):
     class Meta:
         verbose_name_plural = "Job Categories"
     
+    # Name as loaded from the database; None for unsaved categories
+    _loaded_name = None
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_name = instance.__dict__.get('name')
+        return instance
+    
     def __str__(self):
         return self.name
 
@@ -41,6 +54,11 @@ class JobPosting(models.Model):
     responsibilities = models.TextField()
     location = models.CharField(max_length=100)
     salary_range = models.CharField(max_length=100, blank=True)
+    # Parsed from salary_range on save (see jobs/salary.py); amounts are annual
+    salary_min = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True, editable=False)
+    salary_max = models.DecimalField(max_digits=14, decimal_places=2, null=True, blank=True, editable=False)
+    salary_currency = models.CharField(max_length=3, choices=CURRENCY_CHOICES, blank=True, editable=False)
+    salary_period = models.CharField(max_length=5, choices=PERIOD_CHOICES, blank=True, editable=False)
     application_deadline = models.DateField()
     positions_available = models.PositiveIntegerField(default=1)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='open')
@@ -50,13 +68,52 @@ class JobPosting(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['salary_currency', 'salary_max'], name='job_salary_max_idx'),
+            models.Index(fields=['salary_currency', 'salary_min'], name='job_salary_min_idx'),
+            # Open jobs newest first (job listing), and open jobs still taking
+            # applications (student dashboard)
+            models.Index(fields=['status', 'created_at'], name='job_status_created_idx'),
+            models.Index(fields=['status', 'application_deadline'], name='job_status_deadline_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} at {self.company.company_name}"
     
+    # After a save that changed the parsed salary of an existing posting,
+    # the salary fields it had before ({field: value}); None otherwise
+    previous_salary = None
+    
+    @property
+    def salary_changed(self):
+        return self.previous_salary is not None
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'salary_range' in update_fields:
+            fields = salary_fields(self.salary_range)
+            previous = {name: getattr(self, name) for name in fields}
+            self.previous_salary = None if self._state.adding or previous == fields else previous
+            for name, value in fields.items():
+                setattr(self, name, value)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *fields}
+        super().save(*args, **kwargs)
+    
     @property
     def is_active(self):
         return self.status == 'open'
+    
+    # Status and (category_id, job_type) as loaded from the database; None for unsaved postings
+    _loaded_status = None
+    _loaded_dimensions = None
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        instance._loaded_dimensions = (instance.__dict__.get('category_id'), instance.__dict__.get('job_type'))
+        return instance
 
 
 class JobApplication(models.Model):
@@ -71,6 +128,15 @@ class JobApplication(models.Model):
         ('selected', 'Selected'),
     )
     
+    # Legal status changes, applied by jobs.transitions.transition()
+    TRANSITIONS = {
+        'applied': ('under_review', 'shortlisted', 'rejected', 'selected'),
+        'under_review': ('shortlisted', 'rejected', 'selected'),
+        'shortlisted': ('under_review', 'rejected', 'selected'),
+        'rejected': ('under_review', 'shortlisted'),
+        'selected': ('shortlisted', 'rejected'),
+    }
+    
     job = models.ForeignKey(JobPosting, on_delete=models.CASCADE, related_name='applications')
     student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='applications')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='applied')
@@ -81,9 +147,39 @@ class JobApplication(models.Model):
     class Meta:
         unique_together = ('job', 'student')
         ordering = ['-applied_at']
+        indexes = [
+            # A job's applications of a status (shortlists, resume archives,
+            # selections), in application order
+            models.Index(fields=['job', 'status', 'applied_at'], name='application_job_status_idx'),
+            # A student's applications, newest first
+            models.Index(fields=['student', 'applied_at'], name='application_student_idx'),
+            # Applications of a status, newest first (officers)
+            models.Index(fields=['status', 'applied_at'], name='application_status_idx'),
+        ]
     
     def __str__(self):
         return f"{self.student.user.get_full_name()} - {self.job.title}"
+    
+    # Status as loaded from the database; None for unsaved applications
+    _loaded_status = None
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+    
+    @property
+    def status_changed(self):
+        """True when status differs from the value loaded from the database"""
+        return self._loaded_status is not None and self.status != self._loaded_status
+    
+    def can_transition_to(self, status):
+        return status in self.TRANSITIONS.get(self._loaded_status or self.status, ())
+
+
+# Longest interview; overlap checks look this far back for bookings
+MAX_INTERVIEW_MINUTES = 8 * 60
 
 
 class Interview(models.Model):
@@ -105,6 +201,9 @@ class Interview(models.Model):
     
     application = models.ForeignKey(JobApplication, on_delete=models.CASCADE, related_name='interviews')
     date_time = models.DateTimeField()
+    duration_minutes = models.PositiveIntegerField(
+        default=60, validators=[MinValueValidator(5), MaxValueValidator(MAX_INTERVIEW_MINUTES)]
+    )
     location = models.CharField(max_length=200, blank=True)
     interview_type = models.CharField(max_length=20, choices=INTERVIEW_TYPE_CHOICES)
     interviewer = models.CharField(max_length=100, blank=True)
@@ -117,6 +216,41 @@ class Interview(models.Model):
     
     class Meta:
         ordering = ['date_time']
+        indexes = [
+            # Interviews from or before a time in date order, checking the
+            # status in the index (listings, calendar feeds, overlap checks)
+            models.Index(fields=['date_time', 'status'], name='interview_date_status_idx'),
+        ]
     
     def __str__(self):
         return f"Interview for {self.application} on {self.date_time}"
+    
+    @property
+    def end_time(self):
+        return self.date_time + timedelta(minutes=self.duration_minutes)
+
+
+class JobSearchTerm(models.Model):
+    """
+    Posting-list entry of the job search inverted index (see jobs.search)
+    """
+    term = models.CharField(max_length=64)
+    job = models.ForeignKey(JobPosting, on_delete=models.CASCADE, related_name='search_terms')
+    weight = models.FloatField()
+    
+    class Meta:
+        unique_together = ('term', 'job')
+    
+    def __str__(self):
+        return f"{self.term} -> {self.job_id}"
+
+
+class JobSearchDocument(models.Model):
+    """
+    Analyzed search document of a job posting, used by the MySQL FULLTEXT backend
+    """
+    job = models.OneToOneField(JobPosting, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    content = models.TextField()
+    
+    def __str__(self):
+        return f"Search document for job {self.job_id}"
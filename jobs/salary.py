@@ -0,0 +1,122 @@
+"""
+Salary parsing for job postings.
+
+JobPosting.salary_range is free text ("6-8 LPA", "$50,000 - $70,000",
+"Stipend 20k/month"). parse_salary() turns it into the structured fields
+stored next to it: salary_min and salary_max as annual amounts, the
+currency, and the period the salary was quoted in. The annual amounts
+are what job filtering and package statistics use.
+"""
+import re
+from collections import namedtuple
+from decimal import Decimal
+
+from django.conf import settings
+
+DEFAULT_CURRENCY = 'INR'
+
+CURRENCY_CHOICES = (
+    ('INR', 'Indian Rupee'),
+    ('USD', 'US Dollar'),
+    ('EUR', 'Euro'),
+    ('GBP', 'Pound Sterling'),
+)
+
+PERIOD_CHOICES = (
+    ('year', 'Per Year'),
+    ('month', 'Per Month'),
+    ('hour', 'Per Hour'),
+)
+
+# Multiplier of each period to an annual amount (hours: 40 a week)
+ANNUAL_FACTORS = {'year': 1, 'month': 12, 'hour': 40 * 52}
+
+ParsedSalary = namedtuple('ParsedSalary', 'minimum maximum currency period')
+
+_CURRENCY_PATTERNS = (
+    ('INR', re.compile(r'₹|\brs\.?|\binr\b|\blpa\b|\blakhs?\b|\blacs?\b|\bcrores?\b')),
+    ('USD', re.compile(r'\$|\busd\b')),
+    ('EUR', re.compile(r'€|\beur\b')),
+    ('GBP', re.compile(r'£|\bgbp\b')),
+)
+
+_PERIOD_PATTERNS = (
+    ('hour', re.compile(r'/\s*h(?:ou)?r\b|\bper\s+hour\b|\bhourly\b|\bph\b')),
+    ('month', re.compile(r'/\s*m(?:o|onth)?\b|\bper\s+month\b|\bmonthly\b|\bpm\b|\bp\.m\.|\bstipend\b')),
+    ('year', re.compile(r'/\s*y(?:ea)?r\b|\bper\s+(?:year|annum)\b|\byearly\b|\bannual(?:ly)?\b|\bp\.?a\b\.?|\blpa\b|\bctc\b')),
+)
+
+_UNITS = {
+    'k': Decimal(1000),
+    'l': Decimal(100000),
+    'lpa': Decimal(100000),
+    'lakh': Decimal(100000),
+    'lakhs': Decimal(100000),
+    'lac': Decimal(100000),
+    'lacs': Decimal(100000),
+    'cr': Decimal(10000000),
+    'crore': Decimal(10000000),
+    'crores': Decimal(10000000),
+    'm': Decimal(1000000),
+    'mn': Decimal(1000000),
+    'million': Decimal(1000000),
+}
+
+_AMOUNT_RE = re.compile(
+    r'(\d+(?:\.\d+)?)\s*(' + '|'.join(sorted(_UNITS, key=len, reverse=True)) + r')?(?![a-z])'
+)
+
+CENT = Decimal('0.01')
+
+# Annual amounts in the default currency written without a unit and below
+# this are in lakhs: "6-8" and a bare "6" typed into the salary filter
+# mean 6 LPA, not 6 rupees a year
+BARE_LAKHS_BELOW = Decimal(100)
+
+
+def default_currency():
+    return getattr(settings, 'SALARY_DEFAULT_CURRENCY', DEFAULT_CURRENCY)
+
+
+def parse_salary(text):
+    """
+    Parse a salary string into a ParsedSalary of annual amounts, or return
+    None when it holds no amount. A unit written once applies to every
+    amount ("6-8 LPA"); small rupee amounts without one are lakhs ("6-8").
+    Amounts are read as annual unless a period says otherwise.
+    """
+    text = (text or '').lower().replace(',', '')
+    matches = _AMOUNT_RE.findall(text)
+    if not matches:
+        return None
+
+    units = [unit for _, unit in matches if unit]
+    default_unit = units[-1] if units else None
+    currency = next((code for code, pattern in _CURRENCY_PATTERNS if pattern.search(text)), default_currency())
+    period = next((name for name, pattern in _PERIOD_PATTERNS if pattern.search(text)), 'year')
+    numbers = [Decimal(number) for number, _ in matches[:2]]
+    if (default_unit is None and currency == 'INR' and period == 'year'
+            and max(numbers) < BARE_LAKHS_BELOW):
+        default_unit = 'lakh'
+    amounts = [number * _UNITS.get(unit or default_unit, 1) for number, (_, unit) in zip(numbers, matches)]
+
+    factor = ANNUAL_FACTORS[period]
+    return ParsedSalary(
+        minimum=(min(amounts) * factor).quantize(CENT),
+        maximum=(max(amounts) * factor).quantize(CENT),
+        currency=currency,
+        period=period,
+    )
+
+
+def salary_fields(text):
+    """Field values of JobPosting for a salary string"""
+    parsed = parse_salary(text)
+    if parsed is None:
+        return {'salary_min': None, 'salary_max': None, 'salary_currency': '', 'salary_period': ''}
+    return {
+        'salary_min': parsed.minimum,
+        'salary_max': parsed.maximum,
+        'salary_currency': parsed.currency,
+        'salary_period': parsed.period,
+    }
@@ -0,0 +1,265 @@
+"""
+Interview slot scheduling with conflict detection.
+
+An interview occupies [date_time, date_time + duration_minutes). Nobody
+can be in two interviews at once: not a student (across all companies),
+not an interviewer, and not a room or meeting link. IntervalIndex keeps
+the busy intervals of each of them merged and sorted, so checking or
+booking a slot is a binary search.
+
+schedule() assigns the shortlisted applications of a job to slots cut
+from the interviewers' availability windows, earliest free slot first,
+against an index loaded with the interviews already booked in the
+period. book() then writes the assigned interviews with bulk_create,
+shortlists and notifies in bulk, and sends interviews_scheduled once
+for the dashboard counters (bulk_create sends no post_save).
+
+conflicts() checks a single interview the same way, for the one at a
+time schedule and update forms.
+"""
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.dispatch import Signal
+
+from accounts.models import Notification
+from accounts.utils import send_emails
+from .models import MAX_INTERVIEW_MINUTES, Interview, JobApplication
+from .transitions import bulk_transition
+
+# Sent once per book() with interviews=[Interview, ...]
+interviews_scheduled = Signal()
+
+# Interviews in these statuses take up their slot
+ACTIVE_STATUSES = ('scheduled', 'rescheduled')
+
+# An interviewer's availability, from start to end
+Window = namedtuple('Window', 'interviewer start end')
+
+
+class IntervalIndex:
+    """Merged, sorted busy intervals per key"""
+
+    def __init__(self):
+        self._starts = {}
+        self._ends = {}
+
+    def overlaps(self, key, start, end):
+        """Whether [start, end) overlaps a busy interval of key"""
+        starts = self._starts.get(key)
+        if not starts:
+            return False
+        # Intervals are disjoint and sorted, so only the last one starting
+        # before end can reach past start
+        i = bisect_left(starts, end) - 1
+        return i >= 0 and self._ends[key][i] > start
+
+    def add(self, key, start, end):
+        """Mark [start, end) busy, merging it with the intervals it touches"""
+        starts = self._starts.setdefault(key, [])
+        ends = self._ends.setdefault(key, [])
+        lo = bisect_left(ends, start)
+        hi = bisect_right(starts, end)
+        if lo < hi:
+            start = min(start, starts[lo])
+            end = max(end, ends[hi - 1])
+        starts[lo:hi] = [start]
+        ends[lo:hi] = [end]
+
+
+def interviewer_key(name):
+    return ('interviewer', name.strip().lower())
+
+
+def venue_key(venue):
+    return ('venue', venue.strip().lower())
+
+
+def _keys(student_id, interviewer, venue):
+    keys = [('student', student_id)]
+    if interviewer and interviewer.strip():
+        keys.append(interviewer_key(interviewer))
+    if venue and venue.strip():
+        keys.append(venue_key(venue))
+    return keys
+
+
+def booked_interviews(start, end, student_ids=(), interviewers=(), venues=(), exclude=None):
+    """
+    Active interviews overlapping [start, end) of the given students,
+    interviewers or venues (a location or meeting link)
+    """
+    people = Q(application__student_id__in=list(student_ids))
+    for name in interviewers:
+        people |= Q(interviewer__iexact=name.strip())
+    for venue in venues:
+        people |= Q(location__iexact=venue.strip()) | Q(meeting_link=venue.strip())
+    interviews = Interview.objects.filter(
+        people,
+        status__in=ACTIVE_STATUSES,
+        date_time__lt=end,
+        date_time__gt=start - timedelta(minutes=MAX_INTERVIEW_MINUTES),
+    ).select_related('application')
+    if exclude is not None:
+        interviews = interviews.exclude(pk=exclude)
+    return [interview for interview in interviews if interview.end_time > start]
+
+
+def build_index(interviews):
+    index = IntervalIndex()
+    for interview in interviews:
+        venue = interview.meeting_link or interview.location
+        for key in _keys(interview.application.student_id, interview.interviewer, venue):
+            index.add(key, interview.date_time, interview.end_time)
+    return index
+
+
+def conflicts(student_id, interviewer, venue, start, duration_minutes, exclude=None):
+    """
+    Return a message for each booked interview the given one would
+    overlap, for the student, the interviewer or the venue
+    """
+    end = start + timedelta(minutes=duration_minutes)
+    venues = [venue] if venue else []
+    interviewers = [interviewer] if interviewer else []
+    messages = []
+    for interview in booked_interviews(start, end, [student_id], interviewers, venues, exclude):
+        if interview.application.student_id == student_id:
+            who = "The student"
+        elif interviewer and interview.interviewer.strip().lower() == interviewer.strip().lower():
+            who = interviewer
+        else:
+            who = venue
+        messages.append(
+            f"{who} already has an interview from {interview.date_time:%b %d, %H:%M} "
+            f"to {interview.end_time:%H:%M}."
+        )
+    return messages
+
+
+@dataclass
+class Schedule:
+    interviews: list = field(default_factory=list)  # unsaved, assigned
+    unassigned: list = field(default_factory=list)  # (application, reason)
+
+
+def slots(windows, slot_minutes, gap_minutes=0):
+    """Cut the availability windows into (start, end, interviewer) slots, in time order"""
+    length = timedelta(minutes=slot_minutes)
+    step = length + timedelta(minutes=gap_minutes)
+    cut = []
+    for window in windows:
+        start = window.start
+        while start + length <= window.end:
+            cut.append((start, start + length, window.interviewer))
+            start += step
+    return sorted(cut, key=lambda slot: (slot[0], slot[2]))
+
+
+def schedule(applications, windows, slot_minutes, venues, interview_type, gap_minutes=0, notes=''):
+    """
+    Assign each application (loaded with student__user and job__company)
+    the earliest slot in which its student, an available interviewer and
+    one of the venues are all free. Venues are meeting links for online
+    interviews and rooms otherwise; a phone interview needs none.
+    Returns a Schedule of unsaved Interview rows and the applications left
+    without a slot.
+    """
+    result = Schedule()
+    free = slots(windows, slot_minutes, gap_minutes)
+    if not free:
+        result.unassigned = [(application, "No slots in the availability windows.") for application in applications]
+        return result
+    venues = [venue.strip() for venue in venues if venue.strip()] or ([''] if interview_type == 'phone' else [])
+    if not venues:
+        result.unassigned = [(application, "No rooms or meeting links given.") for application in applications]
+        return result
+
+    index = build_index(booked_interviews(
+        free[0][0], max(end for _, end, _ in free),
+        student_ids={application.student_id for application in applications},
+        interviewers={window.interviewer for window in windows},
+        venues=[venue for venue in venues if venue],
+    ))
+    for application in applications:
+        booked = None
+        for position, (start, end, interviewer) in enumerate(free):
+            student = ('student', application.student_id)
+            if index.overlaps(student, start, end) or index.overlaps(interviewer_key(interviewer), start, end):
+                continue
+            venue = next((venue for venue in venues if not venue or not index.overlaps(venue_key(venue), start, end)), None)
+            if venue is None:
+                continue
+            booked = Interview(
+                application=application,
+                date_time=start,
+                duration_minutes=slot_minutes,
+                interview_type=interview_type,
+                interviewer=interviewer,
+                location='' if interview_type == 'online' else venue,
+                meeting_link=venue if interview_type == 'online' else None,
+                notes=notes,
+            )
+            for key in _keys(application.student_id, interviewer, venue):
+                index.add(key, start, end)
+            del free[position]
+            break
+        if booked is None:
+            result.unassigned.append((application, "No free slot for the student, an interviewer and a venue."))
+        else:
+            result.interviews.append(booked)
+    return result
+
+
+def interview_email(interview):
+    """Return the (subject, message, recipient) email for a new interview"""
+    application = interview.application
+    student = application.student.user
+    return (
+        "📅 Interview Scheduled",
+        f"Hi {student.first_name},\n\n"
+        f"Your interview has been scheduled.\n\n"
+        f"Job Title: {application.job.title}\n"
+        f"Company: {application.job.company.company_name}\n\n"
+        f"Interview Details:\n"
+        f"Date & Time: {interview.date_time}\n"
+        f"Mode: {interview.interview_type}\n"
+        f"Meeting Link: {interview.meeting_link}\n"
+        f"Location: {interview.location}\n\n"
+        "Please be available on time.\n\n"
+        "All the best 👍\n"
+        "Campus Placement Cell",
+        student.email,
+    )
+
+
+def interview_notification(interview):
+    return Notification(
+        user=interview.application.student.user,
+        title=f"Interview Scheduled for {interview.application.job.title}",
+        message=f"You have been scheduled for an interview on {interview.date_time}. Please check your interview details.",
+    )
+
+
+def book(interviews):
+    """
+    Write the interviews of a Schedule, shortlist their applications and
+    queue one notification and email per student, in one transaction
+    """
+    if not interviews:
+        return []
+    with transaction.atomic():
+        Interview.objects.bulk_create(interviews)
+        # The interview notification replaces the generic status change one
+        bulk_transition(
+            JobApplication.objects.filter(pk__in=[interview.application_id for interview in interviews]),
+            'shortlisted', notify=False,
+        )
+        Notification.objects.bulk_create(map(interview_notification, interviews))
+        send_emails(map(interview_email, interviews))
+        interviews_scheduled.send(sender=Interview, interviews=interviews)
+    return interviews
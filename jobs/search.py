@@ -0,0 +1,376 @@
+"""
+Full-text search for job postings.
+
+Job postings are analyzed into stemmed terms (title, description,
+requirements, company name and category) and kept in a search index that
+is updated whenever a posting is saved. The index implementation is
+pluggable through the ``JOB_SEARCH_BACKEND`` setting:
+
+* ``jobs.search.InvertedIndexBackend`` (default) - inverted index stored in
+  the ``JobSearchTerm`` table, works on every database.
+* ``jobs.search.MySQLFullTextBackend`` - MySQL ``FULLTEXT`` index over the
+  ``JobSearchDocument`` table, for production.
+* ``jobs.search.MemoryBackend`` - pure-Python in-process index, for tests.
+"""
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connection, transaction
+from django.db.models import Case, Count, F, FloatField, IntegerField, Sum, Value, When
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+DEFAULT_BACKEND = 'jobs.search.InvertedIndexBackend'
+
+# Maximum number of ranked hits returned by a backend for one query
+SEARCH_RESULT_LIMIT = 1000
+
+# Relative importance of each indexed field
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'company': 2.5,
+    'category': 2.0,
+    'requirements': 1.0,
+    'description': 1.0,
+}
+
+STOP_WORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has',
+    'have', 'in', 'is', 'it', 'its', 'of', 'on', 'or', 'our', 'that', 'the',
+    'this', 'to', 'we', 'will', 'with', 'you', 'your',
+))
+
+TOKEN_RE = re.compile(r"[a-z0-9]+[+#]*")
+
+# Suffixes stripped by the stemmer, longest first
+_SUFFIXES = (
+    ('ational', 'ate'), ('ation', ''), ('ments', ''), ('ment', ''),
+    ('ness', ''), ('ings', ''), ('ing', ''), ('ies', 'y'), ('ied', 'y'),
+    ('ers', ''), ('er', ''), ('ed', ''), ('ly', ''), ('s', ''),
+)
+
+MAX_TERM_LENGTH = 64
+
+
+def stem(word):
+    """
+    Light suffix-stripping stemmer.
+    Maps inflected forms to a shared stem, e.g. developer/developing/
+    development -> "develop", services/service -> "servic".
+    """
+    if len(word) <= 3 or not word.isalpha():
+        return word
+    for _ in range(2):
+        for suffix, replacement in _SUFFIXES:
+            if not word.endswith(suffix):
+                continue
+            if suffix == 's' and word.endswith(('ss', 'us', 'is')):
+                break
+            candidate = word[:-len(suffix)] + replacement
+            if len(candidate) < 3:
+                break
+            if suffix in ('ing', 'ings', 'ed') and len(candidate) > 3 \
+                    and candidate[-1] == candidate[-2] and candidate[-1] not in 'lsz':
+                candidate = candidate[:-1]
+            word = candidate
+            break
+        else:
+            break
+    if len(word) > 3 and word.endswith('e'):
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Split text into lower-cased tokens, dropping stop words"""
+    if not text:
+        return []
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def analyze(text):
+    """Tokenize and stem text into index terms"""
+    return [stem(token)[:MAX_TERM_LENGTH] for token in tokenize(text)]
+
+
+def document_fields(job):
+    """Return the searchable text of a job posting keyed by field"""
+    return {
+        'title': job.title,
+        'description': job.description,
+        'requirements': job.requirements,
+        'company': job.company.company_name if job.company_id else '',
+        'category': job.category.name if job.category_id else '',
+    }
+
+
+def weighted_terms(job):
+    """
+    Return {term: weight} for a job posting.
+    Term frequency is dampened logarithmically so long descriptions do not
+    drown out a match in the title.
+    """
+    weights = defaultdict(float)
+    for field, text in document_fields(job).items():
+        for term, frequency in Counter(analyze(text)).items():
+            weights[term] += FIELD_WEIGHTS[field] * (1 + math.log(frequency))
+    return dict(weights)
+
+
+class BaseSearchBackend:
+    """
+    Interface implemented by every search backend
+    """
+
+    def index(self, job):
+        """Add or replace a job posting in the index"""
+        raise NotImplementedError
+
+    def remove(self, job_id):
+        """Drop a job posting from the index"""
+        raise NotImplementedError
+
+    def search(self, query, limit=SEARCH_RESULT_LIMIT, within=None):
+        """
+        Return a list of (job_id, score) pairs, best match first. within,
+        a JobPosting queryset, restricts the hits to its postings before
+        the limit is applied; scores are those of the whole index.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """Empty the index"""
+        raise NotImplementedError
+
+    def rebuild(self, jobs):
+        """Re-index every job posting in an iterable"""
+        self.clear()
+        count = 0
+        for job in jobs:
+            self.index(job)
+            count += 1
+        return count
+
+
+class InvertedIndexBackend(BaseSearchBackend):
+    """
+    Inverted index stored in the database.
+    Each (term, job) posting is a JobSearchTerm row, so a query only reads
+    the posting lists of its own terms through the (term, job) index.
+    """
+
+    def index(self, job):
+        from .models import JobSearchTerm
+
+        terms = weighted_terms(job)
+        with transaction.atomic():
+            JobSearchTerm.objects.filter(job_id=job.pk).delete()
+            JobSearchTerm.objects.bulk_create(
+                JobSearchTerm(job_id=job.pk, term=term, weight=weight)
+                for term, weight in terms.items()
+            )
+
+    def remove(self, job_id):
+        from .models import JobSearchTerm
+
+        JobSearchTerm.objects.filter(job_id=job_id).delete()
+
+    def clear(self):
+        from .models import JobSearchTerm
+
+        JobSearchTerm.objects.all().delete()
+
+    def search(self, query, limit=SEARCH_RESULT_LIMIT, within=None):
+        from .models import JobPosting, JobSearchTerm
+
+        terms = sorted(set(analyze(query)))
+        if not terms:
+            return []
+
+        postings = JobSearchTerm.objects.filter(term__in=terms)
+        document_frequency = dict(
+            postings.values_list('term').annotate(n=Count('job_id')).order_by()
+        )
+        if not document_frequency:
+            return []
+        # Every posting is indexed when saved, so the postings are the corpus
+        total = JobPosting.objects.count()
+        idf = {
+            term: math.log(1 + total / frequency)
+            for term, frequency in document_frequency.items()
+        }
+
+        score = Sum(Case(
+            *[When(term=term, then=F('weight') * Value(value)) for term, value in idf.items()],
+            default=Value(0.0),
+            output_field=FloatField(),
+        ))
+        if within is not None:
+            postings = postings.filter(job_id__in=within.values('pk'))
+        rows = (
+            postings.values('job_id')
+            .annotate(matched=Count('term'), score=score)
+            .order_by('-matched', '-score', 'job_id')[:limit]
+        )
+        return [(row['job_id'], row['score']) for row in rows]
+
+
+class MySQLFullTextBackend(BaseSearchBackend):
+    """
+    MySQL FULLTEXT search over pre-analyzed documents.
+    Each posting is stored as one JobSearchDocument row whose content holds
+    the stemmed terms (repeated by field weight), so queries are analyzed
+    the same way before MATCH ... AGAINST. Terms shorter than
+    innodb_ft_min_token_size are ignored by MySQL.
+    """
+
+    def index(self, job):
+        from .models import JobSearchDocument
+
+        words = []
+        for term, weight in weighted_terms(job).items():
+            words.extend([term] * max(1, round(weight)))
+        JobSearchDocument.objects.update_or_create(
+            job_id=job.pk, defaults={'content': ' '.join(words)}
+        )
+
+    def remove(self, job_id):
+        from .models import JobSearchDocument
+
+        JobSearchDocument.objects.filter(job_id=job_id).delete()
+
+    def clear(self):
+        from .models import JobSearchDocument
+
+        JobSearchDocument.objects.all().delete()
+
+    def search(self, query, limit=SEARCH_RESULT_LIMIT, within=None):
+        from .models import JobSearchDocument
+
+        terms = ' '.join(sorted(set(analyze(query))))
+        if not terms:
+            return []
+        table = connection.ops.quote_name(JobSearchDocument._meta.db_table)
+        restriction, restriction_params = '', []
+        if within is not None:
+            subquery, restriction_params = within.order_by().values('pk').query.sql_with_params()
+            restriction = f"AND job_id IN ({subquery}) "
+        sql = (
+            f"SELECT job_id, MATCH(content) AGAINST (%s IN NATURAL LANGUAGE MODE) AS score "
+            f"FROM {table} WHERE MATCH(content) AGAINST (%s IN NATURAL LANGUAGE MODE) {restriction}"
+            f"ORDER BY score DESC, job_id LIMIT %s"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [terms, terms, *restriction_params, limit])
+            return [(job_id, float(score)) for job_id, score in cursor.fetchall()]
+
+
+class MemoryBackend(BaseSearchBackend):
+    """
+    Pure-Python inverted index kept in process memory.
+    Intended for tests; the index is lost when the process exits.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = defaultdict(dict)  # term -> {job_id: weight}
+        self._documents = {}  # job_id -> set of terms
+
+    def index(self, job):
+        terms = weighted_terms(job)
+        with self._lock:
+            self._remove(job.pk)
+            for term, weight in terms.items():
+                self._postings[term][job.pk] = weight
+            self._documents[job.pk] = set(terms)
+
+    def remove(self, job_id):
+        with self._lock:
+            self._remove(job_id)
+
+    def _remove(self, job_id):
+        for term in self._documents.pop(job_id, ()):
+            postings = self._postings[term]
+            postings.pop(job_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def clear(self):
+        with self._lock:
+            self._postings.clear()
+            self._documents.clear()
+
+    def search(self, query, limit=SEARCH_RESULT_LIMIT, within=None):
+        terms = set(analyze(query))
+        allowed = None if within is None else set(within.values_list('pk', flat=True))
+        with self._lock:
+            postings = {term: dict(self._postings[term]) for term in terms if term in self._postings}
+            total = len(self._documents)
+        if not postings:
+            return []
+        scores = defaultdict(float)
+        matched = Counter()
+        for term, jobs in postings.items():
+            idf = math.log(1 + total / len(jobs))
+            for job_id, weight in jobs.items():
+                scores[job_id] += weight * idf
+                matched[job_id] += 1
+        ranked = sorted(
+            (job_id for job_id in scores if allowed is None or job_id in allowed),
+            key=lambda job_id: (-matched[job_id], -scores[job_id], job_id),
+        )
+        return [(job_id, scores[job_id]) for job_id in ranked[:limit]]
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Return the configured search backend instance"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                path = getattr(settings, 'JOB_SEARCH_BACKEND', DEFAULT_BACKEND)
+                _backend = import_string(path)()
+    return _backend
+
+
+@receiver(setting_changed)
+def _reset_backend(setting, **kwargs):
+    global _backend
+    if setting == 'JOB_SEARCH_BACKEND':
+        _backend = None
+
+
+def search_jobs(queryset, query, limit=SEARCH_RESULT_LIMIT):
+    """
+    Restrict a JobPosting queryset to postings matching the query.
+    The result is annotated with ``search_rank`` (0 = best match) and
+    ordered by it. The backend ranks only postings of the queryset, so
+    filtered out postings do not take up the limit.
+    """
+    hits = get_backend().search(query, limit=limit, within=queryset)
+    if not hits:
+        return queryset.none()
+    job_ids = [job_id for job_id, _ in hits]
+    ranking = Case(
+        *[When(pk=job_id, then=Value(position)) for position, job_id in enumerate(job_ids)],
+        output_field=IntegerField(),
+    )
+    return queryset.filter(pk__in=job_ids).annotate(search_rank=ranking).order_by('search_rank', 'pk')
+
+
+def index_job(job):
+    """Update the search index for a job posting once the transaction commits"""
+    transaction.on_commit(lambda: get_backend().index(job))
+
+
+def unindex_job(job_id):
+    """Remove a job posting from the search index once the transaction commits"""
+    transaction.on_commit(lambda: get_backend().remove(job_id))
@@ -1,63 +1,45 @@
-from django.db.models.signals import pre_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import JobApplication
-from accounts.utils import send_email
-from accounts.models import Notification
-
-
-@receiver(pre_save, sender=JobApplication)
-def job_application_status_email(sender, instance, **kwargs):
-    if not instance.pk:
-        return  # new application, ignore
-
-    old = JobApplication.objects.get(pk=instance.pk)
-
-    if old.status != instance.status:
-        student = instance.student.user
-        job = instance.job
-
-        # DATABASE notification
-        Notification.objects.create(
-            user=student,
-            title="Application Status Updated",
-            message=f"Your application for {job.title} is now '{instance.status}'."
-        )
-
-        # STATUS-SPECIFIC MESSAGE
-        if instance.status == 'selected':
-            subject = "🎉 Congratulations! You Are Selected"
-            message = (
-                f"Hi {student.first_name},\n\n"
-                f"Congratulations! 🎉\n\n"
-                f"You have been SELECTED for:\n"
-                f"Job Title: {job.title}\n"
-                f"Company: {job.company.company_name}\n\n"
-                "The company or placement team will contact you soon.\n\n"
-                "Best Wishes,\n"
-                "Campus Placement Cell"
-            )
-
-        elif instance.status == 'rejected':
-            subject = "Application Status Update"
-            message = (
-                f"Hi {student.first_name},\n\n"
-                f"We regret to inform you that your application for:\n"
-                f"{job.title} at {job.company.company_name}\n"
-                f"has been rejected.\n\n"
-                "Keep applying — success is near 💪\n\n"
-                "Campus Placement Cell"
-            )
-
-        else:
-            subject = "Application Status Updated"
-            message = (
-                f"Hi {student.first_name},\n\n"
-                f"Your application status has been updated.\n\n"
-                f"Job: {job.title}\n"
-                f"Company: {job.company.company_name}\n"
-                f"New Status: {instance.status}\n\n"
-                "Login to your dashboard for more details.\n\n"
-                "Campus Placement Cell"
-            )
-
-        send_email(subject, message, student.email)
+from .models import JobApplication, JobPosting, JobCategory
+from .search import index_job, unindex_job
+from .transitions import StatusChange, run_pipeline
+from accounts.models import CompanyProfile
+
+
+@receiver(post_save, sender=JobApplication)
+def job_application_status_changed(sender, instance, created, **kwargs):
+    """
+    Status changes saved directly (e.g. from the admin) rather than through
+    jobs.transitions.transition() still run the side-effect pipeline once.
+    """
+    changed = not created and instance.status_changed
+    old_status = instance._loaded_status
+    instance._loaded_status = instance.status
+    if changed:
+        run_pipeline([StatusChange(instance, old_status, instance.status)])
+
+
+@receiver(post_save, sender=JobPosting)
+def index_job_posting(sender, instance, **kwargs):
+    """Keep the search index in step with the saved job posting"""
+    index_job(instance)
+
+
+@receiver(post_delete, sender=JobPosting)
+def unindex_job_posting(sender, instance, **kwargs):
+    unindex_job(instance.pk)
+
+
+@receiver(post_save, sender=CompanyProfile)
+@receiver(post_save, sender=JobCategory)
+def reindex_related_jobs(sender, instance, created, **kwargs):
+    """Company and category names are part of the indexed document"""
+    field = 'company_name' if sender is CompanyProfile else 'name'
+    name, loaded = getattr(instance, field), instance._loaded_name
+    instance._loaded_name = name
+    if created or name == loaded:
+        return
+    related = 'company' if sender is CompanyProfile else 'category'
+    jobs = JobPosting.objects.filter(**{related: instance}).select_related('company', 'category')
+    for job in jobs:
+        index_job(job)
@@ -0,0 +1,664 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import CompanyProfile, Notification, OutboxEmail, StudentProfile, User
+from dashboard import placement_stats
+from dashboard.models import PlacementSeason, PlacementStatistics
+from dashboard.snapshots import refresh_officer_snapshot
+from . import transitions
+from .forms import InterviewBatchForm
+from .models import Interview, JobApplication, JobCategory, JobPosting
+from .salary import ParsedSalary, parse_salary
+from .scheduler import IntervalIndex, Window, book, conflicts, schedule
+from .search import get_backend, search_jobs
+from .transitions import CONFLICT, NOT_ALLOWED, UNCHANGED, UPDATED, InvalidTransition, bulk_transition, transition
+
+
+class ViewTestCase(TransactionTestCase):
+    """
+    A season, an officer, a company with an open job and two students who
+    applied to it.
+
+    Budgeted views are called outside a test transaction so that the work
+    they defer with on_commit runs, and is counted, in the request as it
+    would in production. QUERY_BUDGET_STRICT (test settings) turns any
+    view over its budget into an error.
+    """
+
+    def setUp(self):
+        self.season = PlacementSeason.objects.create(
+            year='2025-2026', start_date=date(2025, 7, 1), end_date=date(2026, 6, 30), is_active=True,
+        )
+        self.officer = User.objects.create_user('officer', 'officer@example.com', 'pw', user_type='officer')
+        self.company_user = User.objects.create_user('acme', 'hr@acme.example', 'pw', user_type='company')
+        self.company = CompanyProfile.objects.create(
+            user=self.company_user, company_name='Acme', industry='Software', description='Tools',
+            website='https://acme.example', address='Pune',
+        )
+        self.category = JobCategory.objects.create(name='Engineering')
+        self.job = JobPosting.objects.create(
+            company=self.company, title='Developer', category=self.category, job_type='full_time',
+            description='Build things', requirements='Python', responsibilities='Code', location='Pune',
+            salary_range='6-8 LPA', application_deadline=date.today() + timedelta(days=10),
+        )
+        self.students = [
+            StudentProfile.objects.create(
+                user=User.objects.create_user(f'student{i}', f'student{i}@example.com', 'pw', user_type='student'),
+                roll_number=f'R{i}', department=department, year_of_graduation=2026,
+            )
+            for i, department in enumerate(('CSE', 'ECE'))
+        ]
+        self.applications = [
+            JobApplication.objects.create(job=self.job, student=student) for student in self.students
+        ]
+        # Budgets are those of a running site, whose officer counters exist
+        refresh_officer_snapshot()
+
+    def interview(self, application, days=2):
+        return Interview.objects.create(
+            application=application, date_time=timezone.now() + timedelta(days=days),
+            interview_type='phone', interviewer='Priya',
+        )
+
+    def get_pages(self, user, urls):
+        """GET each url as the user, which must answer with one of the expected statuses"""
+        self.client.force_login(user)
+        for url in urls:
+            with self.subTest(user=user.username, url=url):
+                self.assertIn(self.client.get(url).status_code, (200, 302))
+
+    def job_data(self, **changes):
+        data = {
+            'title': self.job.title, 'category': self.category.pk, 'job_type': self.job.job_type,
+            'description': self.job.description, 'requirements': self.job.requirements,
+            'responsibilities': self.job.responsibilities, 'location': self.job.location,
+            'salary_range': self.job.salary_range, 'application_deadline': self.job.application_deadline,
+            'positions_available': self.job.positions_available, 'status': self.job.status, 'min_cgpa': '',
+        }
+        data.update(changes)
+        return data
+
+
+class EditJobTests(ViewTestCase):
+
+    def test_salary_change_moves_the_offers_to_the_new_package(self):
+        JobApplication.objects.filter(job=self.job).update(status='selected')
+        placement_stats.rebuild(self.season)
+        self.client.force_login(self.company_user)
+
+        response = self.client.post(reverse('edit_job', args=[self.job.pk]), self.job_data(salary_range='10-12 LPA'))
+
+        self.assertRedirects(response, reverse('manage_jobs'), fetch_redirect_response=False)
+        self.assertEqual(placement_stats.check(self.season), [])
+        for statistics in PlacementStatistics.objects.filter(season=self.season):
+            self.assertEqual((statistics.offers, statistics.highest_package), (1, Decimal('1200.00')))
+
+    def test_salary_no_longer_counted(self):
+        JobApplication.objects.filter(pk=self.applications[0].pk).update(status='selected')
+        placement_stats.rebuild(self.season)
+        self.client.force_login(self.company_user)
+
+        self.client.post(reverse('edit_job', args=[self.job.pk]), self.job_data(salary_range='Negotiable'))
+
+        self.assertEqual(placement_stats.check(self.season), [])
+        statistics = PlacementStatistics.objects.get(season=self.season, department='CSE')
+        self.assertEqual((statistics.offers, statistics.highest_package, statistics.average_package), (0, None, None))
+
+
+class SearchTests(ViewTestCase):
+    """The inverted index (JobSearchTerm), kept up to date as postings are saved"""
+
+    def posting(self, title, description='Build things', **fields):
+        return JobPosting.objects.create(
+            company=self.company, title=title, category=self.category, job_type='full_time',
+            description=description, requirements='', responsibilities='Code', location='Pune',
+            application_deadline=date.today() + timedelta(days=10), **fields,
+        )
+
+    def ranked(self, query, **kwargs):
+        return [job_id for job_id, _ in get_backend().search(query, **kwargs)]
+
+    def test_more_matched_terms_then_heavier_fields_rank_first(self):
+        in_title = self.posting('Kotlin Engineer')
+        in_description = self.posting('Engineer', description='Kotlin services')
+        both = self.posting('Backend', description='Kotlin and Django')
+
+        self.assertEqual(self.ranked('kotlin django'), [both.pk, in_title.pk, in_description.pk])
+
+    def test_rare_terms_weigh_more(self):
+        common = [self.posting(f'Kotlin {i}') for i in range(3)]
+        rare = self.posting('Django')
+
+        hits = dict(get_backend().search('kotlin django'))
+
+        self.assertGreater(hits[rare.pk], hits[common[0].pk])
+        self.assertEqual(self.ranked('kotlin django')[0], rare.pk)
+
+    def test_inflected_forms_match(self):
+        job = self.posting('Tester', description='Testing services')
+
+        self.assertEqual(self.ranked('tested service'), [job.pk])
+
+    def test_saving_and_deleting_reindex_the_posting(self):
+        job = self.posting('Kotlin Engineer')
+
+        job.title = 'Java Engineer'
+        job.save()
+        self.assertEqual(self.ranked('kotlin'), [])
+        self.assertEqual(self.ranked('java'), [job.pk])
+
+        job.delete()
+        self.assertEqual(self.ranked('java'), [])
+
+    def test_filtered_out_postings_do_not_take_up_the_limit(self):
+        closed = [self.posting('Kotlin Kotlin Engineer', status='closed') for _ in range(3)]
+        open_job = self.posting('Engineer', description='Kotlin')
+        open_jobs = JobPosting.objects.filter(status='open')
+        self.assertEqual(self.ranked('kotlin', limit=1), [closed[0].pk])
+
+        for backend in ('jobs.search.InvertedIndexBackend', 'jobs.search.MemoryBackend'):
+            with self.subTest(backend=backend), override_settings(JOB_SEARCH_BACKEND=backend):
+                if backend.endswith('MemoryBackend'):
+                    get_backend().rebuild(JobPosting.objects.select_related('company', 'category'))
+                self.assertEqual(list(search_jobs(open_jobs, 'kotlin', limit=1)), [open_job])
+                self.assertEqual(list(search_jobs(open_jobs, 'kotlin')), [open_job])
+
+
+@override_settings(SALARY_DEFAULT_CURRENCY='INR')
+class ParseSalaryTests(SimpleTestCase):
+
+    def assertParses(self, text, minimum, maximum, currency='INR', period='year'):
+        self.assertEqual(
+            parse_salary(text), ParsedSalary(Decimal(minimum), Decimal(maximum), currency, period), text,
+        )
+
+    def test_ranges_share_their_unit(self):
+        self.assertParses('6-8 LPA', '600000', '800000')
+        self.assertParses('8 - 6 lakhs', '600000', '800000')
+        self.assertParses('$50,000 - $70,000', '50000', '70000', 'USD')
+        self.assertParses('1.2 crore', '12000000', '12000000')
+
+    def test_annual_keywords(self):
+        self.assertParses('12 CTC', '1200000', '1200000')
+        self.assertParses('Rs 450000 per annum', '450000', '450000')
+
+    def test_monthly_and_hourly_amounts_are_annualised(self):
+        self.assertParses('Stipend 20k/month', '240000', '240000', period='month')
+        self.assertParses('Rs 25,000 per month', '300000', '300000', period='month')
+        self.assertParses('$40/hour', '83200', '83200', 'USD', 'hour')
+
+    def test_bare_small_amounts_are_lakhs(self):
+        self.assertParses('6', '600000', '600000')
+        self.assertParses('4.5-6', '450000', '600000')
+        self.assertParses('150', '150', '150')
+        self.assertParses('$6', '6', '6', 'USD')
+
+    def test_unparseable(self):
+        for text in ('Negotiable', '', None, 'As per industry standards'):
+            with self.subTest(text=text):
+                self.assertIsNone(parse_salary(text))
+
+
+class SalaryFilterTests(ViewTestCase):
+
+    def test_bare_figure_filters_in_lakhs(self):
+        self.client.force_login(self.students[0].user)
+
+        for query, found in (({'min_salary': '7'}, True), ({'min_salary': '9'}, False), ({'max_salary': '6'}, True)):
+            with self.subTest(query=query):
+                response = self.client.get(reverse('job_list'), query)
+                self.assertEqual(self.job in response.context['jobs'], found)
+
+
+class BackfillSalariesTests(ViewTestCase):
+
+    def test_backfill_recomputes_the_placement_statistics(self):
+        JobApplication.objects.filter(job=self.job).update(status='selected')
+        placement_stats.rebuild(self.season)
+        # Edited without signals, as before the structured fields existed
+        JobPosting.objects.filter(pk=self.job.pk).update(salary_range='10-12 LPA')
+
+        out = StringIO()
+        call_command('backfill_salaries', stdout=out)
+
+        self.assertIn("Updated 1 job posting(s)", out.getvalue())
+        self.assertEqual(JobPosting.objects.get(pk=self.job.pk).salary_max, Decimal('1200000'))
+        self.assertEqual(placement_stats.check(self.season), [])
+        for statistics in PlacementStatistics.objects.filter(season=self.season):
+            self.assertEqual(statistics.highest_package, Decimal('1200.00'))
+
+
+class BulkUpdateTests(ViewTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.company_user)
+        self.url = reverse('bulk_update_applications')
+
+    def statuses(self):
+        return list(JobApplication.objects.order_by('pk').values_list('status', flat=True))
+
+    def test_unfiltered_scope_is_refused(self):
+        response = self.client.post(self.url, {'status': 'rejected', 'scope': 'filtered'}, HTTP_ACCEPT='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.statuses(), ['applied', 'applied'])
+
+    def test_filtered_scope_is_counted_before_it_is_confirmed(self):
+        JobApplication.objects.filter(pk=self.applications[1].pk).update(status='under_review')
+        data = {'status': 'rejected', 'scope': 'filtered', 'filter_status': 'applied'}
+
+        response = self.client.post(self.url, data)
+        self.assertContains(response, "<strong>1 application</strong>", html=False)
+        self.assertEqual(self.statuses(), ['applied', 'under_review'])
+
+        response = self.client.post(self.url, data, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.json(), {'status': 'rejected', 'matching': 1, 'confirmed': False})
+
+        response = self.client.post(self.url, {**data, 'confirm': '1', 'matching': 1}, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.json()['counts'], {'updated': 1})
+        self.assertEqual(self.statuses(), ['rejected', 'under_review'])
+
+    def test_confirm_of_a_stale_count_is_refused(self):
+        data = {'status': 'rejected', 'scope': 'filtered', 'filter_status': 'applied'}
+        response = self.client.post(self.url, data)
+        self.assertContains(response, 'name="matching" value="2"', html=False)
+
+        # Another student applies before the user confirms
+        student = StudentProfile.objects.create(
+            user=User.objects.create_user('late', 'late@example.com', 'pw', user_type='student'),
+            roll_number='R9', department='CSE', year_of_graduation=2026,
+        )
+        JobApplication.objects.create(job=self.job, student=student)
+
+        response = self.client.post(self.url, {**data, 'confirm': '1', 'matching': 2})
+        self.assertContains(response, "<strong>3 applications</strong>", status_code=409, html=False)
+        self.assertEqual(self.statuses(), ['applied', 'applied', 'applied'])
+
+        response = self.client.post(self.url, {**data, 'confirm': '1'}, HTTP_ACCEPT='application/json')
+        self.assertEqual((response.status_code, response.json()['matching']), (409, 3))
+
+        response = self.client.post(self.url, {**data, 'confirm': '1', 'matching': 3}, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.json()['counts'], {'updated': 3})
+
+    def test_job_alone_is_a_filter(self):
+        data = {'status': 'under_review', 'scope': 'filtered', 'job': self.job.pk, 'confirm': '1', 'matching': 2}
+
+        response = self.client.post(self.url, data, HTTP_ACCEPT='application/json')
+
+        self.assertEqual(response.json()['counts'], {'updated': 2})
+
+
+class TransitionTests(ViewTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.applications = list(JobApplication.objects.order_by('pk'))
+
+    def statuses(self):
+        return list(JobApplication.objects.order_by('pk').values_list('status', flat=True))
+
+    def notified(self):
+        """(status notifications, queued emails) so far"""
+        return (
+            Notification.objects.filter(title="Application Status Updated").count(),
+            OutboxEmail.objects.filter(recipient__startswith='student').count(),
+        )
+
+    def test_transition_runs_the_pipeline_once(self):
+        self.assertTrue(transition(self.applications[0], 'shortlisted'))
+        self.assertFalse(transition(self.applications[0], 'shortlisted'))
+
+        self.assertEqual(self.statuses(), ['shortlisted', 'applied'])
+        self.assertEqual(self.notified(), (1, 1))
+
+    def test_illegal_transition_is_refused(self):
+        JobApplication.objects.filter(pk=self.applications[0].pk).update(status='rejected')
+        application = JobApplication.objects.get(pk=self.applications[0].pk)
+
+        for status in ('selected', 'applied'):
+            with self.subTest(status=status), self.assertRaises(InvalidTransition):
+                transition(application, status)
+
+        self.assertEqual(self.statuses(), ['rejected', 'applied'])
+        self.assertEqual(self.notified(), (0, 0))
+
+    def test_concurrent_change_is_a_conflict(self):
+        application = self.applications[0]
+        # Someone else rejects the application after it was loaded
+        JobApplication.objects.filter(pk=application.pk).update(status='rejected')
+
+        with self.assertRaises(InvalidTransition):
+            transition(application, 'selected')
+
+        self.assertEqual(self.statuses(), ['rejected', 'applied'])
+        self.assertEqual(self.notified(), (0, 0))
+
+    def test_bulk_transition_reports_every_application(self):
+        JobApplication.objects.filter(pk=self.applications[1].pk).update(status='shortlisted')
+        rejected = JobApplication.objects.create(
+            job=self.job, status='rejected', student=StudentProfile.objects.create(
+                user=User.objects.create_user('student2', 'student2@example.com', 'pw', user_type='student'),
+                roll_number='R2', department='CSE', year_of_graduation=2026,
+            ),
+        )
+
+        results = bulk_transition(JobApplication.objects.all(), 'selected', batch_size=2)
+
+        self.assertEqual(results, {
+            self.applications[0].pk: UPDATED, self.applications[1].pk: UPDATED, rejected.pk: NOT_ALLOWED,
+        })
+        self.assertEqual(self.statuses(), ['selected', 'selected', 'rejected'])
+        self.assertEqual(self.notified(), (2, 2))
+
+    def test_bulk_transition_does_not_overwrite_a_concurrent_change(self):
+        original = transitions._transition_batch
+
+        def concurrently(batch, *args):
+            # Rejected by someone else between the SELECT of the batch and its UPDATE
+            JobApplication.objects.filter(pk=self.applications[1].pk).update(status='rejected')
+            return original(batch, *args)
+
+        with mock.patch.object(transitions, '_transition_batch', side_effect=concurrently):
+            results = bulk_transition(JobApplication.objects.all(), 'shortlisted')
+
+        self.assertEqual(results, {self.applications[0].pk: UPDATED, self.applications[1].pk: CONFLICT})
+        self.assertEqual(self.statuses(), ['shortlisted', 'rejected'])
+        self.assertEqual(self.notified(), (1, 1))
+
+    def test_bulk_transition_is_safe_to_retry(self):
+        first = bulk_transition(JobApplication.objects.filter(pk=self.applications[0].pk), 'under_review')
+
+        retried = bulk_transition(JobApplication.objects.all(), 'under_review')
+
+        self.assertEqual(first, {self.applications[0].pk: UPDATED})
+        self.assertEqual(retried, {self.applications[0].pk: UNCHANGED, self.applications[1].pk: UPDATED})
+        self.assertEqual(self.statuses(), ['under_review', 'under_review'])
+        self.assertEqual(self.notified(), (2, 2))
+
+        self.assertEqual(set(bulk_transition(JobApplication.objects.all(), 'under_review').values()), {UNCHANGED})
+        self.assertEqual(self.notified(), (2, 2))
+
+
+class IntervalIndexTests(SimpleTestCase):
+
+    def test_touching_intervals_do_not_overlap(self):
+        index = IntervalIndex()
+        index.add('room', 9, 10)
+
+        self.assertFalse(index.overlaps('room', 8, 9))
+        self.assertFalse(index.overlaps('room', 10, 11))
+        self.assertTrue(index.overlaps('room', 8, 10))
+        self.assertTrue(index.overlaps('room', 9.5, 9.75))
+        self.assertTrue(index.overlaps('room', 8, 12))
+        self.assertFalse(index.overlaps('other room', 9, 10))
+
+    def test_touching_and_overlapping_intervals_merge(self):
+        index = IntervalIndex()
+        for start, end in ((13, 14), (9, 10), (10, 11), (15, 16), (13.5, 15)):
+            index.add('room', start, end)
+
+        self.assertEqual(index._starts['room'], [9, 13])
+        self.assertEqual(index._ends['room'], [11, 16])
+        self.assertFalse(index.overlaps('room', 11, 13))
+        self.assertTrue(index.overlaps('room', 10.5, 13.5))
+
+
+class SchedulerTests(ViewTestCase):
+
+    def setUp(self):
+        super().setUp()
+        JobApplication.objects.filter(job=self.job).update(status='shortlisted')
+        self.start = (timezone.now() + timedelta(days=3)).replace(hour=9, minute=0, second=0, microsecond=0)
+        other_job = JobPosting.objects.create(
+            company=self.company, title='Tester', category=self.category, job_type='full_time',
+            description='Test things', requirements='', responsibilities='Test', location='Pune',
+            application_deadline=date.today() + timedelta(days=10),
+        )
+        self.other_applications = [
+            JobApplication.objects.create(job=other_job, student=student) for student in self.students
+        ]
+        # An application of a student who is not scheduled here
+        self.outsider = JobApplication.objects.create(job=other_job, student=StudentProfile.objects.create(
+            user=User.objects.create_user('outsider', 'outsider@example.com', 'pw', user_type='student'),
+            roll_number='R9', department='CSE', year_of_graduation=2026,
+        ))
+
+    def at(self, minutes):
+        return self.start + timedelta(minutes=minutes)
+
+    def booked(self, application, minutes, duration=30, interviewer='Someone', location='Room 9'):
+        return Interview.objects.create(
+            application=application, date_time=self.at(minutes), duration_minutes=duration,
+            interview_type='in_person', interviewer=interviewer, location=location,
+        )
+
+    def assigned(self, windows, venues=('Room 1',), interview_type='in_person'):
+        applications = JobApplication.objects.filter(job=self.job).select_related('student__user', 'job__company')
+        result = schedule(list(applications.order_by('pk')), windows, 30, venues, interview_type)
+        return [
+            (interview.application.student_id, interview.date_time, interview.interviewer, interview.location)
+            for interview in result.interviews
+        ], result.unassigned
+
+    def test_students_get_the_earliest_free_slots(self):
+        assigned, unassigned = self.assigned([Window('Priya', self.at(0), self.at(60))])
+
+        self.assertEqual(assigned, [
+            (self.students[0].pk, self.at(0), 'Priya', 'Room 1'),
+            (self.students[1].pk, self.at(30), 'Priya', 'Room 1'),
+        ])
+        self.assertEqual(unassigned, [])
+
+    def test_student_busy_with_another_interview(self):
+        # The first student's other interview ends as the second slot starts
+        self.booked(self.other_applications[0], 0)
+
+        assigned, _ = self.assigned([Window('Priya', self.at(0), self.at(60))])
+
+        self.assertEqual(assigned, [
+            (self.students[0].pk, self.at(30), 'Priya', 'Room 1'),
+            (self.students[1].pk, self.at(0), 'Priya', 'Room 1'),
+        ])
+
+    def test_interviewer_and_room_busy(self):
+        self.booked(self.outsider, -30, duration=60, interviewer=' priya ', location='Room 2')
+        self.booked(self.outsider, 30, duration=30, location='room 1')
+
+        assigned, unassigned = self.assigned(
+            [Window('Priya', self.at(0), self.at(60)), Window('Arun', self.at(0), self.at(30))],
+            venues=('Room 1', 'Room 2'),
+        )
+
+        # Priya is busy until 9:30, room 1 from 9:30 and room 2 until 9:30
+        self.assertEqual(assigned, [
+            (self.students[0].pk, self.at(0), 'Arun', 'Room 1'),
+            (self.students[1].pk, self.at(30), 'Priya', 'Room 2'),
+        ])
+        self.assertEqual(unassigned, [])
+
+    def test_applications_left_without_a_slot(self):
+        self.booked(self.other_applications[1], 0, duration=60)
+
+        assigned, unassigned = self.assigned([Window('Priya', self.at(0), self.at(60))])
+
+        self.assertEqual([student for student, *_ in assigned], [self.students[0].pk])
+        self.assertEqual([application.pk for application, _ in unassigned], [self.applications[1].pk])
+
+    def test_book_writes_and_notifies_once(self):
+        self.booked(self.other_applications[0], 0)
+        applications = JobApplication.objects.filter(job=self.job).select_related('student__user', 'job__company')
+        result = schedule(list(applications), [Window('Priya', self.at(0), self.at(60))], 30, ['Room 1'], 'in_person')
+
+        book(result.interviews)
+
+        self.assertEqual(Interview.objects.filter(application__job=self.job).count(), 2)
+        self.assertEqual(Notification.objects.filter(title__startswith="Interview Scheduled").count(), 2)
+        self.assertEqual(Notification.objects.filter(title="Application Status Updated").count(), 0)
+        # Booked interviews are conflicts of the next schedule
+        assigned, unassigned = self.assigned([Window('Priya', self.at(0), self.at(60))])
+        self.assertEqual(assigned, [])
+        self.assertEqual(len(unassigned), 2)
+
+    def test_conflicts_of_a_single_interview(self):
+        interview = self.booked(self.other_applications[0], 0, interviewer='Priya', location='Room 1')
+        student = self.students[0].pk
+
+        self.assertEqual(len(conflicts(student, 'Arun', 'Room 2', self.at(15), 30)), 1)
+        self.assertEqual(len(conflicts(self.students[1].pk, 'PRIYA', 'Room 2', self.at(15), 30)), 1)
+        self.assertEqual(len(conflicts(self.students[1].pk, 'Arun', 'room 1', self.at(15), 30)), 1)
+        self.assertEqual(len(conflicts(student, 'Priya', 'Room 1', self.at(15), 30)), 1)
+        self.assertEqual(conflicts(student, 'Priya', 'Room 1', self.at(30), 30), [])
+        self.assertEqual(conflicts(student, 'Priya', 'Room 1', self.at(-30), 30), [])
+        self.assertEqual(conflicts(student, 'Priya', 'Room 1', self.at(15), 30, exclude=interview.pk), [])
+
+        interview.status = 'cancelled'
+        interview.save()
+        self.assertEqual(conflicts(student, 'Priya', 'Room 1', self.at(15), 30), [])
+
+    def test_batch_form(self):
+        window = f"Priya, {self.at(0):%Y-%m-%d %H:%M}, {self.at(60):%Y-%m-%d %H:%M}"
+        data = {'interview_type': 'in_person', 'slot_minutes': 30, 'windows': window, 'venues': 'Room 1\n\nRoom 2'}
+
+        form = InterviewBatchForm(data)
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['windows'], [Window('Priya', self.at(0), self.at(60))])
+        self.assertEqual(form.cleaned_data['venues'], ['Room 1', 'Room 2'])
+
+        past = timezone.now() - timedelta(days=1)
+        invalid = {
+            'format': {'windows': f"{window}\nPriya, tomorrow, later"},
+            'reversed': {'windows': f"Priya, {self.at(60):%Y-%m-%d %H:%M}, {self.at(0):%Y-%m-%d %H:%M}"},
+            'venues': {'venues': ''},
+            'past': {'windows': f"Priya, {past:%Y-%m-%d %H:%M}, {self.at(0):%Y-%m-%d %H:%M}"},
+            'link': {'interview_type': 'online', 'venues': 'Room 1'},
+        }
+        for case, changes in invalid.items():
+            with self.subTest(case=case):
+                self.assertFalse(InterviewBatchForm({**data, **changes}).is_valid())
+        self.assertTrue(InterviewBatchForm({**data, 'interview_type': 'phone', 'venues': ''}).is_valid())
+
+
+class JobViewBudgetTests(ViewTestCase):
+    """Every budgeted view of jobs/views.py, within its budget"""
+
+    def test_pages(self):
+        JobPosting.objects.create(
+            company=self.company, title='Analyst Intern', job_type='internship', description='Data',
+            requirements='Excel', responsibilities='Reports', location='Pune', salary_range='20k per month',
+            application_deadline=date.today() + timedelta(days=10),
+        )
+        self.interview(self.applications[0])
+        job_pages = [
+            reverse('job_list'), reverse('job_list') + '?keyword=developer&job_type=full_time',
+            reverse('job_detail', args=[self.job.pk]), reverse('applications'),
+            reverse('interviews') + '?date_filter=all',
+        ]
+        self.get_pages(self.students[0].user, job_pages)
+        self.get_pages(self.company_user, job_pages + [
+            reverse('manage_jobs'), reverse('post_job'), reverse('edit_job', args=[self.job.pk]),
+            reverse('applications') + '?status=applied',
+            reverse('schedule_interview', args=[self.applications[1].pk]),
+            reverse('schedule_interviews', args=[self.job.pk]),
+            reverse('update_interview', args=[self.applications[0].interviews.get().pk]),
+            reverse('download_resumes', args=[self.job.pk]),
+        ])
+        self.get_pages(self.officer, job_pages + [reverse('applications') + '?resume=python'])
+
+    def test_apply(self):
+        # A student's first application also creates their dashboard versions
+        student = StudentProfile.objects.create(
+            user=User.objects.create_user('newcomer', 'newcomer@example.com', 'pw', user_type='student'),
+            roll_number='R9', department='CSE', year_of_graduation=2026,
+        )
+        self.client.force_login(student.user)
+
+        self.client.post(reverse('job_detail', args=[self.job.pk]), {'cover_letter': 'I write Python.'})
+
+        self.assertTrue(JobApplication.objects.filter(job=self.job, student=student).exists())
+
+    def test_post_job(self):
+        self.client.force_login(self.company_user)
+
+        self.client.post(reverse('post_job'), {**self.job_data(), 'title': 'Tester', 'salary_range': '5 LPA'})
+
+        self.assertTrue(JobPosting.objects.filter(title='Tester', salary_max=500000).exists())
+
+    def test_status_change_to_and_from_selected(self):
+        self.client.force_login(self.company_user)
+        application = self.applications[0]
+        url = reverse('update_application', args=[application.pk])
+
+        for status in ('selected', 'rejected', 'shortlisted', 'selected', 'shortlisted'):
+            with self.subTest(status=status):
+                self.client.post(url, {'status': status})
+                application.refresh_from_db()
+                self.assertEqual(application.status, status)
+                self.assertEqual(placement_stats.check(self.season), [])
+
+    def test_bulk_update(self):
+        self.client.force_login(self.officer)
+
+        response = self.client.post(reverse('bulk_update_applications'), {
+            'status': 'selected', 'ids': [application.pk for application in self.applications],
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(JobApplication.objects.filter(status='selected').count(), 2)
+        self.assertEqual(placement_stats.check(self.season), [])
+
+    def test_download_resumes(self):
+        StudentProfile.objects.filter(pk=self.students[0].pk).update(resume='resumes/r0.pdf')
+        self.client.force_login(self.company_user)
+
+        response = self.client.get(reverse('download_resumes', args=[self.job.pk]))
+
+        self.assertEqual(response['Content-Type'], 'application/zip')
+
+    def test_schedule_interview(self):
+        self.client.force_login(self.company_user)
+        application = self.applications[0]
+
+        self.client.post(reverse('schedule_interview', args=[application.pk]), {
+            'date_time': (timezone.now() + timedelta(days=3)).strftime('%Y-%m-%d %H:%M'),
+            'duration_minutes': 45, 'interview_type': 'in_person', 'location': 'Room 101',
+            'interviewer': 'Priya', 'status': 'scheduled',
+        })
+
+        application.refresh_from_db()
+        self.assertEqual(application.status, 'shortlisted')
+        self.assertEqual(application.interviews.get().location, 'Room 101')
+
+    def test_schedule_interviews(self):
+        JobApplication.objects.filter(job=self.job).update(status='shortlisted')
+        start = (timezone.localtime() + timedelta(days=3)).replace(hour=9, minute=0)
+        window = f"Priya, {start:%Y-%m-%d %H:%M}, {start + timedelta(hours=2):%Y-%m-%d %H:%M}"
+        data = {'interview_type': 'phone', 'slot_minutes': 30, 'gap_minutes': 0, 'windows': window}
+        self.client.force_login(self.company_user)
+        url = reverse('schedule_interviews', args=[self.job.pk])
+
+        self.assertEqual(self.client.post(url, data).status_code, 200)
+        self.assertFalse(Interview.objects.exists())
+
+        self.client.post(url, {**data, 'confirm': '1'})
+        self.assertEqual(Interview.objects.filter(application__job=self.job).count(), 2)
+
+    def test_update_interview(self):
+        interview = self.interview(self.applications[0])
+        self.client.force_login(self.company_user)
+
+        self.client.post(reverse('update_interview', args=[interview.pk]), {
+            'date_time': timezone.localtime(interview.date_time).strftime('%Y-%m-%d %H:%M'),
+            'duration_minutes': 60, 'interview_type': 'phone', 'interviewer': 'Priya',
+            'status': 'completed', 'feedback': 'Strong',
+        })
+
+        interview.refresh_from_db()
+        self.assertEqual((interview.status, interview.feedback), ('completed', 'Strong'))
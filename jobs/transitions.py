@@ -0,0 +1,206 @@
+"""
+Job application state machine.
+
+Status changes go through transition(), which checks the change against
+JobApplication.TRANSITIONS, writes it with a single conditional UPDATE and
+runs the side-effect pipeline exactly once: one student notification, one
+queued email and the application_status_changed signal that counters
+listen to.
+
+The status loaded with the instance is tracked on the model
+(JobApplication._loaded_status), so no extra SELECT is needed to find
+out what changed.
+
+bulk_transition() applies one status to a whole queryset in batches: a
+conditional UPDATE per old status and one pipeline run per batch, with
+the outcome reported for every application.
+"""
+from collections import namedtuple
+
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from accounts.models import Notification
+from accounts.utils import send_emails
+from .models import JobApplication
+
+# Sent once per pipeline run with changes=[StatusChange, ...]
+application_status_changed = Signal()
+
+StatusChange = namedtuple('StatusChange', 'application old_status new_status')
+
+STATUS_LABELS = dict(JobApplication.STATUS_CHOICES)
+
+
+class InvalidTransition(Exception):
+    pass
+
+
+def status_email(application, new_status):
+    """Return the (subject, message, recipient) email for a status change"""
+    student = application.student.user
+    job = application.job
+
+    if new_status == 'selected':
+        subject = "🎉 Congratulations! You Are Selected"
+        message = (
+            f"Hi {student.first_name},\n\n"
+            f"Congratulations! 🎉\n\n"
+            f"You have been SELECTED for:\n"
+            f"Job Title: {job.title}\n"
+            f"Company: {job.company.company_name}\n\n"
+            "The company or placement team will contact you soon.\n\n"
+            "Best Wishes,\n"
+            "Campus Placement Cell"
+        )
+    elif new_status == 'rejected':
+        subject = "Application Status Update"
+        message = (
+            f"Hi {student.first_name},\n\n"
+            f"We regret to inform you that your application for:\n"
+            f"{job.title} at {job.company.company_name}\n"
+            f"has been rejected.\n\n"
+            "Keep applying — success is near 💪\n\n"
+            "Campus Placement Cell"
+        )
+    else:
+        subject = "Application Status Updated"
+        message = (
+            f"Hi {student.first_name},\n\n"
+            f"Your application status has been updated.\n\n"
+            f"Job: {job.title}\n"
+            f"Company: {job.company.company_name}\n"
+            f"New Status: {STATUS_LABELS[new_status]}\n\n"
+            "Login to your dashboard for more details.\n\n"
+            "Campus Placement Cell"
+        )
+    return subject, message, student.email
+
+
+def status_notification(change):
+    application = change.application
+    return Notification(
+        user_id=application.student.user_id,
+        title="Application Status Updated",
+        message=(
+            f"Your application for {application.job.title} has been updated from "
+            f"{STATUS_LABELS[change.old_status]} to {STATUS_LABELS[change.new_status]}."
+        ),
+    )
+
+
+def run_pipeline(changes, notify=True):
+    """
+    Run the side effects of a list of StatusChange tuples: notifications
+    and emails are inserted in bulk, then application_status_changed is
+    sent once. Applications should be loaded with student__user and
+    job__company.
+    """
+    if not changes:
+        return
+    if notify:
+        Notification.objects.bulk_create(status_notification(change) for change in changes)
+        send_emails(status_email(change.application, change.new_status) for change in changes)
+    application_status_changed.send(sender=JobApplication, changes=changes)
+
+
+def transition(application, new_status, notify=True):
+    """
+    Move an application to new_status and run the side-effect pipeline.
+    Returns False when the application already has that status. Raises
+    InvalidTransition for an illegal change, or when the row was changed
+    by someone else since it was loaded.
+    """
+    old_status = application._loaded_status or application.status
+    if new_status == old_status:
+        return False
+    if new_status not in JobApplication.TRANSITIONS.get(old_status, ()):
+        raise InvalidTransition(
+            f"Cannot change an application from {STATUS_LABELS.get(old_status, old_status)} "
+            f"to {STATUS_LABELS.get(new_status, new_status)}."
+        )
+
+    now = timezone.now()
+    with transaction.atomic():
+        updated = JobApplication.objects.filter(pk=application.pk, status=old_status).update(
+            status=new_status, updated_at=now
+        )
+        if not updated:
+            raise InvalidTransition("The application was changed by someone else. Please try again.")
+        application.status = new_status
+        application.updated_at = now
+        application._loaded_status = new_status
+        run_pipeline([StatusChange(application, old_status, new_status)], notify=notify)
+    return True
+
+
+# Outcomes reported per application by bulk_transition()
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+NOT_ALLOWED = 'not_allowed'
+CONFLICT = 'conflict'
+
+BULK_BATCH_SIZE = 500
+
+
+def bulk_transition(applications, new_status, notify=True, batch_size=BULK_BATCH_SIZE):
+    """
+    Move every application of a queryset to new_status. Applications are
+    processed in primary key batches, each in its own transaction with one
+    conditional UPDATE per old status and one pipeline run, so
+    notifications and emails are inserted in bulk.
+
+    Returns {application id: outcome}: UPDATED, UNCHANGED (it already had
+    that status), NOT_ALLOWED (the transition is illegal) or CONFLICT (it
+    was changed by someone else meanwhile). Running it again only touches
+    what is left, so it is safe to retry.
+    """
+    if new_status not in STATUS_LABELS:
+        raise InvalidTransition(f"Unknown status {new_status!r}.")
+    results = {}
+    rows = applications.select_related('student__user', 'job__company').order_by('pk')
+    last_pk = 0
+    while True:
+        batch = list(rows.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            return results
+        last_pk = batch[-1].pk
+        _transition_batch(batch, new_status, notify, results)
+        if len(batch) < batch_size:
+            return results
+
+
+def _transition_batch(batch, new_status, notify, results):
+    by_old_status = {}
+    for application in batch:
+        if application.status == new_status:
+            results[application.pk] = UNCHANGED
+        elif new_status not in JobApplication.TRANSITIONS.get(application.status, ()):
+            results[application.pk] = NOT_ALLOWED
+        else:
+            by_old_status.setdefault(application.status, []).append(application)
+
+    now = timezone.now()
+    with transaction.atomic():
+        changes = []
+        for old_status, group in by_old_status.items():
+            ids = [application.pk for application in group]
+            updated = JobApplication.objects.filter(pk__in=ids, status=old_status).update(
+                status=new_status, updated_at=now
+            )
+            if updated < len(ids):
+                # Rows changed by someone else meanwhile did not get this timestamp
+                ids = set(JobApplication.objects.filter(
+                    pk__in=ids, status=new_status, updated_at=now
+                ).values_list('pk', flat=True))
+            for application in group:
+                if application.pk not in ids:
+                    results[application.pk] = CONFLICT
+                    continue
+                application.status = new_status
+                application.updated_at = now
+                application._loaded_status = new_status
+                results[application.pk] = UPDATED
+                changes.append(StatusChange(application, old_status, new_status))
+        run_pipeline(changes, notify=notify)
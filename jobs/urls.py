@@ -13,11 +13,16 @@ urlpatterns = [
     path('applications/', views.applications, name='applications'),
     path('applications/<int:application_id>/update/', 
          views.update_application_status, name='update_application'),
+    path('applications/bulk-update/', 
+         views.bulk_update_applications, name='bulk_update_applications'),
+    path('<int:job_id>/resumes/', views.download_resumes, name='download_resumes'),
     
     # Interviews
     path('interviews/', views.interviews, name='interviews'),
     path('applications/<int:application_id>/schedule-interview/', 
          views.schedule_interview, name='schedule_interview'),
+    path('<int:job_id>/schedule-interviews/', 
+         views.schedule_interviews, name='schedule_interviews'),
     path('interviews/<int:interview_id>/update/', 
          views.update_interview, name='update_interview'),
 ]
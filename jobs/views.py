@@ -1,24 +1,48 @@
+import os
+import re
+from datetime import datetime, time
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q
-from django.http import JsonResponse
-from django.core.paginator import Paginator
+from django.db.models import Q, Count
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import urlencode
 from django.utils import timezone
+from django.utils.text import slugify
+from django.db import transaction
 
 from .models import JobPosting, JobApplication, Interview, JobCategory
-from .forms import JobPostingForm, JobApplicationForm, InterviewForm
-from accounts.models import StudentProfile, Notification
+from .forms import JobPostingForm, JobApplicationForm, InterviewForm, InterviewBatchForm
+from .salary import parse_salary
+from .search import search_jobs
+from .transitions import transition, bulk_transition, InvalidTransition, BULK_BATCH_SIZE, UPDATED
+from . import scheduler
+from .scheduler import interview_email, interview_notification
+from accounts.models import Notification
+from accounts.pagination import CursorPaginator
+from accounts.decorators import query_budget
+from accounts.middleware import require_profile
+from accounts.downloads import stream_zip
+from accounts.storage import resume_storage
 from accounts.utils import send_email
+from accounts.fanout import fan_out
+from dashboard.ical import feed_token
+from dashboard.versions import batched
 from django.contrib.auth import get_user_model
 User = get_user_model()
 
+# Listings show an approximate total counted up to this many rows
+LISTING_COUNT_LIMIT = 1000
+
 @login_required
+@query_budget(10)
 def job_list(request):
     """
    List all open job postings with filters
     """
-    jobs = JobPosting.objects.filter(status='open')
+    jobs = JobPosting.objects.filter(status='open').select_related('company', 'category')
     categories = JobCategory.objects.all()
     
     # Filter by category
@@ -31,19 +55,25 @@ def job_list(request):
     if job_type:
         jobs = jobs.filter(job_type=job_type)
     
-    # Filter by keyword search
+    # Filter by salary, e.g. "6 LPA" or "30k/month", on the parsed annual amounts
+    min_salary = parse_salary(request.GET.get('min_salary'))
+    if min_salary:
+        jobs = jobs.filter(salary_currency=min_salary.currency, salary_max__gte=min_salary.minimum)
+    max_salary = parse_salary(request.GET.get('max_salary'))
+    if max_salary:
+        jobs = jobs.filter(salary_currency=max_salary.currency, salary_min__lte=max_salary.maximum)
+    
+    # Filter by keyword search, ranked by relevance
     keyword = request.GET.get('keyword')
     if keyword:
-        jobs = jobs.filter(
-            Q(title__icontains=keyword) | 
-            Q(description__icontains=keyword) |
-            Q(company__company_name__icontains=keyword)
-        )
+        jobs = search_jobs(jobs, keyword)
+        ordering = ('search_rank', 'id')
+    else:
+        ordering = ('-created_at', '-id')
     
-    # Pagination
-    paginator = Paginator(jobs, 10)  # Show 10 jobs per page
-    page = request.GET.get('page')
-    jobs = paginator.get_page(page)
+    # Keyset pagination: 10 jobs per page
+    paginator = CursorPaginator(jobs, 10, ordering, count_limit=LISTING_COUNT_LIMIT)
+    jobs = paginator.get_page(request.GET)
     
     context = {
         'jobs': jobs,
@@ -54,16 +84,17 @@ def job_list(request):
 
 
 @login_required
+@query_budget(18)
 def job_detail(request, job_id):
     """
     View details of a specific job posting and allow students to apply
     """
-    job = get_object_or_404(JobPosting, id=job_id)
+    job = get_object_or_404(JobPosting.objects.select_related('company__user', 'category'), id=job_id)
     
     # Check if user has already applied
     has_applied = False
     if request.user.is_student:
-        student_profile = get_object_or_404(StudentProfile, user=request.user)
+        student_profile = require_profile(request)
         has_applied = JobApplication.objects.filter(job=job, student=student_profile).exists()
     
     # Check if the job deadline has passed
@@ -72,34 +103,35 @@ def job_detail(request, job_id):
     if request.method == 'POST' and request.user.is_student and not has_applied and not deadline_passed:
         form = JobApplicationForm(request.POST)
         if form.is_valid():
-            application = form.save(commit=False)
-            student_profile = get_object_or_404(StudentProfile, user=request.user)
-            application.job = job
-            application.student = student_profile
-            application.save()
-            
-            # EMAIL TO STUDENT
-            send_email(
-                subject="Job Application Submitted Successfully",
-                message=(
-                    f"Hi {request.user.first_name},\n\n"
-                    f"You have successfully applied for the job:\n\n"
-                    f"Job Title: {job.title}\n"
-                    f"Company: {job.company.company_name}\n\n"
-                    "Your application has been received successfully.\n"
-                    "You will be notified when the application status changes.\n\n"
-                    "Best Regards,\n"
-                    "Campus Placement Cell"
-                    ),
-                    recipient=request.user.email
-            )
-            
-            # Create notification for company
-            Notification.objects.create(
-                user=job.company.user,
-                title=f"New Application for {job.title}",
-                message=f"{request.user.get_full_name()} has applied for the {job.title} position."
-            )
+            # Application, queued email and notification commit together
+            with transaction.atomic():
+                application = form.save(commit=False)
+                application.job = job
+                application.student = student_profile
+                application.save()
+                
+                # EMAIL TO STUDENT
+                send_email(
+                    subject="Job Application Submitted Successfully",
+                    message=(
+                        f"Hi {request.user.first_name},\n\n"
+                        f"You have successfully applied for the job:\n\n"
+                        f"Job Title: {job.title}\n"
+                        f"Company: {job.company.company_name}\n\n"
+                        "Your application has been received successfully.\n"
+                        "You will be notified when the application status changes.\n\n"
+                        "Best Regards,\n"
+                        "Campus Placement Cell"
+                        ),
+                        recipient=request.user.email
+                )
+                
+                # Create notification for company
+                Notification.objects.create(
+                    user=job.company.user,
+                    title=f"New Application for {job.title}",
+                    message=f"{request.user.get_full_name()} has applied for the {job.title} position."
+                )
             
             messages.success(request, f"You have successfully applied for {job.title}")
             return redirect('job_list')
@@ -117,6 +149,7 @@ def job_detail(request, job_id):
 
 
 @login_required
+@query_budget(20)
 def post_job(request):
     """
     Allow companies to post new job openings
@@ -129,18 +162,16 @@ def post_job(request):
         form = JobPostingForm(request.POST)
         if form.is_valid():
             job = form.save(commit=False)
-            company_profile = request.user.company_profile
+            company_profile = require_profile(request)
             job.company = company_profile
             job.save()
             
             # Notify placement officers about new job
-            placement_officers = User.objects.filter(user_type='officer')
-            for officer in placement_officers:
-                Notification.objects.create(
-                    user=officer,
-                    title=f"New Job Posted: {job.title}",
-                    message=f"{company_profile.company_name} has posted a new job: {job.title}"
-                )
+            fan_out(
+                'officers',
+                title=f"New Job Posted: {job.title}",
+                message=f"{company_profile.company_name} has posted a new job: {job.title}"
+            )
             
             messages.success(request, f"Job posting for '{job.title}' has been created successfully!")
             return redirect('manage_jobs')
@@ -156,6 +187,7 @@ def post_job(request):
 
 
 @login_required
+@query_budget(15)
 def edit_job(request, job_id):
     """
     Edit an existing job posting
@@ -164,7 +196,9 @@ def edit_job(request, job_id):
         messages.error(request, "Only companies can edit job postings.")
         return redirect('home')
     
-    job = get_object_or_404(JobPosting, id=job_id, company=request.user.company_profile)
+    job = get_object_or_404(
+        JobPosting.objects.select_related('company', 'category'), id=job_id, company=require_profile(request)
+    )
     
     if request.method == 'POST':
         form = JobPostingForm(request.POST, instance=job)
@@ -185,6 +219,7 @@ def edit_job(request, job_id):
 
 
 @login_required
+@query_budget(6)
 def manage_jobs(request):
     """
     Allow companies to manage their job postings
@@ -193,25 +228,28 @@ def manage_jobs(request):
         messages.error(request, "Only companies can access job management.")
         return redirect('home')
     
-    jobs = JobPosting.objects.filter(company=request.user.company_profile).order_by('-created_at')
+    jobs = JobPosting.objects.filter(
+        company=require_profile(request)
+    ).annotate(application_count=Count('applications')).order_by('-created_at')
     
     return render(request, 'jobs/manage_jobs.html', {'jobs': jobs})
 
 
 @login_required
+@query_budget(10)
 def applications(request):
     """
     View and manage job applications
     """
     if request.user.is_student:
         # Students view their applications
-        student_profile = get_object_or_404(StudentProfile, user=request.user)
+        student_profile = require_profile(request)
         applications = JobApplication.objects.filter(student=student_profile)
         template = 'jobs/student_applications.html'
     
     elif request.user.is_company:
         # Companies view applications for their jobs
-        company_profile = request.user.company_profile
+        company_profile = require_profile(request)
         applications = JobApplication.objects.filter(job__company=company_profile)
         template = 'jobs/company_applications.html'
     
@@ -220,20 +258,32 @@ def applications(request):
         applications = JobApplication.objects.all()
         template = 'jobs/officer_applications.html'
     
+    applications = applications.select_related(
+        'student__user', 'job__company'
+    ).prefetch_related('interviews')
+    if not request.user.is_student:
+        # Skills extracted from the resumes, without their full text
+        applications = applications.select_related('student__resume_text').defer('student__resume_text__text')
+    
     # Filter by status
     status = request.GET.get('status')
     if status:
         applications = applications.filter(status=status)
     
-    # Pagination
-    paginator = Paginator(applications, 15)
-    page = request.GET.get('page')
-    applications = paginator.get_page(page)
+    # Search the text extracted from the students' resumes
+    resume_query = request.GET.get('resume', '').strip()
+    if resume_query and not request.user.is_student:
+        applications = applications.filter(student__resume_text__text__icontains=resume_query)
+    
+    # Keyset pagination on the default ordering
+    paginator = CursorPaginator(applications, 15, ('-applied_at', '-id'), count_limit=LISTING_COUNT_LIMIT)
+    applications = paginator.get_page(request.GET)
     
     return render(request, template, {'applications': applications})
 
 
 @login_required
+@query_budget(18)
 def update_application_status(request, application_id):
     """
     Update the status of a job application
@@ -242,35 +292,193 @@ def update_application_status(request, application_id):
         messages.error(request, "You don't have permission to update application status.")
         return redirect('home')
     
-    application = get_object_or_404(JobApplication, id=application_id)
+    application = get_object_or_404(
+        JobApplication.objects.select_related('student__user', 'job__company'), id=application_id
+    )
     
     # Only allow companies to update their own job applications
-    if request.user.is_company and application.job.company != request.user.company_profile:
+    if request.user.is_company and application.job.company != request.profile:
         messages.error(request, "You can only update applications for your jobs.")
         return redirect('applications')
     
     if request.method == 'POST':
         new_status = request.POST.get('status')
         if new_status in dict(JobApplication.STATUS_CHOICES).keys():
-            old_status = application.status
-            application.status = new_status
-            application.save()
-            
-            # Notify the student about status change
-            Notification.objects.create(
-                user=application.student.user,
-                title=f"Application Status Updated",
-                message=f"Your application for {application.job.title} has been updated from {old_status} to {new_status}."
-            )
-            
-            messages.success(request, f"Application status updated to {new_status}.")
+            try:
+                transition(application, new_status)
+            except InvalidTransition as exc:
+                messages.error(request, str(exc))
+            else:
+                messages.success(request, f"Application status updated to {application.get_status_display()}.")
         else:
             messages.error(request, "Invalid status provided.")
     
     return redirect('applications')
 
 
+# Queries of a bulk update besides its batches, and per batch of
+# transitions.BULK_BATCH_SIZE applications (SQLite splits the bulk
+# inserts of a batch into several statements)
+BULK_UPDATE_BASE_BUDGET = 6
+BULK_UPDATE_BATCH_BUDGET = 50
+
+
+@login_required
+@query_budget(BULK_UPDATE_BASE_BUDGET + BULK_UPDATE_BATCH_BUDGET)
+def bulk_update_applications(request):
+    """
+    Change the status of the selected applications (ids), or of all
+    applications matching the listing filter (scope=filtered with
+    filter_status, filter_resume or job; at least one is required). A
+    filtered update first answers with the number of matching
+    applications and changes them once posted again with confirm and that
+    number (matching); if a different number matches by then, it answers
+    with the new number instead. Answers with the outcome per application
+    when JSON is accepted; otherwise summarises it in a message.
+    """
+    if not (request.user.is_company or request.user.is_officer):
+        messages.error(request, "You don't have permission to update application status.")
+        return redirect('home')
+    if request.method != 'POST':
+        return redirect('applications')
+
+    wants_json = 'application/json' in request.headers.get('Accept', '')
+    filter_status = request.POST.get('filter_status', '')
+    filter_resume = request.POST.get('filter_resume', '').strip()
+    back = redirect('applications')
+    listing_filter = {key: value for key, value in (('status', filter_status), ('resume', filter_resume)) if value}
+    if listing_filter:
+        back['Location'] += '?' + urlencode(listing_filter)
+
+    def error(message):
+        if wants_json:
+            return JsonResponse({'error': message}, status=400)
+        messages.error(request, message)
+        return back
+
+    new_status = request.POST.get('status')
+    if new_status not in dict(JobApplication.STATUS_CHOICES):
+        return error("Invalid status provided.")
+
+    applications = JobApplication.objects.all()
+    if request.user.is_company:
+        # Companies can only update applications for their jobs
+        applications = applications.filter(job__company=require_profile(request))
+
+    ids = []
+    if request.POST.get('scope') == 'filtered':
+        job_id = request.POST.get('job', '')
+        if not job_id.isdigit():
+            job_id = ''
+        if not (filter_status or filter_resume or job_id):
+            return error("Filter the applications by status, resume or job before updating all of them.")
+        if filter_status:
+            applications = applications.filter(status=filter_status)
+        if filter_resume:
+            applications = applications.filter(student__resume_text__text__icontains=filter_resume)
+        if job_id:
+            applications = applications.filter(job_id=job_id)
+        matching = applications.count()
+        # Only the applications the user was shown the number of are changed
+        changed = 'confirm' in request.POST and request.POST.get('matching') != str(matching)
+        if 'confirm' not in request.POST or changed:
+            status = 409 if changed else 200
+            if wants_json:
+                return JsonResponse({'status': new_status, 'matching': matching, 'confirmed': False}, status=status)
+            return render(request, 'jobs/bulk_update_confirm.html', {
+                'status': new_status,
+                'label': dict(JobApplication.STATUS_CHOICES)[new_status],
+                'matching': matching,
+                'changed': changed,
+                'filter_status': filter_status,
+                'filter_resume': filter_resume,
+                'job': job_id,
+                'back': back['Location'],
+            }, status=status)
+    else:
+        ids = request.POST.getlist('ids')
+        if not ids or not all(pk.isdigit() for pk in ids):
+            return error("Select the applications to update.")
+        ids = [int(pk) for pk in ids]
+        applications = applications.filter(pk__in=ids)
+
+    results = bulk_transition(applications, new_status)
+    # Selected ids that are not this user's applications, or no longer exist
+    for pk in ids:
+        results.setdefault(pk, 'not_found')
+    request.query_budget = (
+        BULK_UPDATE_BASE_BUDGET + BULK_UPDATE_BATCH_BUDGET * (len(results) // BULK_BATCH_SIZE + 1)
+    )
+
+    counts = {}
+    for outcome in results.values():
+        counts[outcome] = counts.get(outcome, 0) + 1
+    if wants_json:
+        return JsonResponse({
+            'status': new_status,
+            'counts': counts,
+            'results': {str(pk): outcome for pk, outcome in sorted(results.items())},
+        })
+
+    label = dict(JobApplication.STATUS_CHOICES)[new_status]
+    updated = counts.pop(UPDATED, 0)
+    if updated:
+        messages.success(request, f"{updated} application{'s' if updated != 1 else ''} updated to {label}.")
+    skipped = ', '.join(f"{count} {outcome.replace('_', ' ')}" for outcome, count in sorted(counts.items()))
+    if skipped:
+        messages.warning(request, f"Not updated: {skipped}.")
+    elif not updated:
+        messages.info(request, "No applications matched.")
+    return back
+
+
+def archive_name(roll_number, stored_name):
+    """Name of a student's resume in an archive: the roll number and the file's extension"""
+    extension = os.path.splitext(stored_name)[1].lower()
+    return re.sub(r'[^\w.-]', '_', roll_number) + extension
+
+
 @login_required
+@query_budget(5)
+def download_resumes(request, job_id):
+    """
+    Download the resumes of a job's applicants, optionally of one
+    application status, as a ZIP archive streamed as it is written
+    """
+    if not (request.user.is_company or request.user.is_officer):
+        messages.error(request, "You don't have permission to download resumes.")
+        return redirect('home')
+    
+    job = get_object_or_404(JobPosting.objects.select_related('company'), id=job_id)
+    if request.user.is_company and job.company.user_id != request.user.id:
+        messages.error(request, "You can only download resumes for your jobs.")
+        return redirect('manage_jobs')
+    
+    applications = JobApplication.objects.filter(job=job).exclude(student__resume='').exclude(student__resume__isnull=True)
+    status = request.GET.get('status')
+    if status:
+        if status not in dict(JobApplication.STATUS_CHOICES):
+            messages.error(request, "Invalid application status.")
+            return redirect('job_detail', job_id=job.id)
+        applications = applications.filter(status=status)
+    # Names only, read before streaming starts, so no cursor stays open meanwhile
+    entries = [
+        (archive_name(roll_number, name), name)
+        for roll_number, name in applications.order_by('student__roll_number')
+        .values_list('student__roll_number', 'student__resume')
+    ]
+    if not entries:
+        messages.info(request, "No applicant of this job has uploaded a resume.")
+        return redirect('job_detail', job_id=job.id)
+    
+    filename = f"{slugify(job.company.company_name)}-{slugify(job.title)}-{status or 'all'}-resumes.zip"
+    response = StreamingHttpResponse(stream_zip(resume_storage, entries), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@login_required
+@query_budget(21)
 def schedule_interview(request, application_id):
     """
     Schedule an interview for a job application
@@ -279,10 +487,12 @@ def schedule_interview(request, application_id):
         messages.error(request, "You don't have permission to schedule interviews.")
         return redirect('home')
     
-    application = get_object_or_404(JobApplication, id=application_id)
+    application = get_object_or_404(
+        JobApplication.objects.select_related('student__user', 'job__company'), id=application_id
+    )
     
     # Only allow companies to schedule interviews for their own job applications
-    if request.user.is_company and application.job.company != request.user.company_profile:
+    if request.user.is_company and application.job.company != request.profile:
         messages.error(request, "You can only schedule interviews for your jobs.")
         return redirect('applications')
     
@@ -291,38 +501,26 @@ def schedule_interview(request, application_id):
         if form.is_valid():
             interview = form.save(commit=False)
             interview.application = application
-            interview.save()
-
-            student = application.student.user
-            send_email(
-                subject="📅 Interview Scheduled",
-            message=(
-                f"Hi {student.first_name},\n\n"
-                f"Your interview has been scheduled.\n\n"
-                f"Job Title: {application.job.title}\n"
-                f"Company: {application.job.company.company_name}\n\n"
-                f"Interview Details:\n"
-                f"Date & Time: {interview.date_time}\n"
-                f"Mode: {interview.interview_type}\n"
-                f"Meeting Link: {interview.meeting_link}\n"
-                f"Location: {interview.location}\n\n"
-                "Please be available on time.\n\n"
-                "All the best 👍\n"
-                "Campus Placement Cell"
-                ),
-                recipient=student.email
-                )
-            
-            # Update application status to shortlisted
-            application.status = 'shortlisted'
-            application.save()
-            
-            # Notify the student about the interview
-            Notification.objects.create(
-                user=application.student.user,
-                title=f"Interview Scheduled for {application.job.title}",
-                message=f"You have been scheduled for an interview on {interview.date_time}. Please check your interview details."
-            )
+            for conflict in interview_conflicts(interview):
+                form.add_error(None, conflict)
+        if form.is_valid():
+            # Interview, status change and queued email commit together, and
+            # their dashboard updates are written in one batch
+            try:
+                with transaction.atomic(), batched():
+                    interview.save()
+                    send_email(*interview_email(interview))
+                    
+                    # Shortlist the application; the interview notification
+                    # below replaces the generic status-change one
+                    if application.can_transition_to('shortlisted'):
+                        transition(application, 'shortlisted', notify=False)
+                    
+                    # Notify the student about the interview
+                    interview_notification(interview).save()
+            except InvalidTransition as exc:
+                messages.error(request, str(exc))
+                return redirect('applications')
             
             messages.success(request, "Interview has been scheduled successfully!")
             return redirect('applications')
@@ -338,19 +536,20 @@ def schedule_interview(request, application_id):
 
 
 @login_required
+@query_budget(10)
 def interviews(request):
     """
     View scheduled interviews
     """
     if request.user.is_student:
         # Students view their interviews
-        student_profile = get_object_or_404(StudentProfile, user=request.user)
+        student_profile = require_profile(request)
         interviews = Interview.objects.filter(application__student=student_profile)
         template = 'jobs/student_interviews.html'
     
     elif request.user.is_company:
         # Companies view interviews for their job applications
-        company_profile = request.user.company_profile
+        company_profile = require_profile(request)
         interviews = Interview.objects.filter(application__job__company=company_profile)
         template = 'jobs/company_interviews.html'
     
@@ -359,29 +558,111 @@ def interviews(request):
         interviews = Interview.objects.all()
         template = 'jobs/officer_interviews.html'
     
+    interviews = interviews.select_related('application__student__user', 'application__job__company')
+    
     # Filter by status
     status = request.GET.get('status')
     if status:
         interviews = interviews.filter(status=status)
     
-    # Filter by date range
-    today = timezone.now().date()
+    # Filter by date range, compared with the start of today rather than on
+    # the date of date_time, which the index on date_time cannot serve
+    today = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
     date_filter = request.GET.get('date_filter', 'upcoming')
     
     if date_filter == 'upcoming':
-        interviews = interviews.filter(date_time__date__gte=today)
+        interviews = interviews.filter(date_time__gte=today)
     elif date_filter == 'past':
-        interviews = interviews.filter(date_time__date__lt=today)
+        interviews = interviews.filter(date_time__lt=today)
+    
+    # Keyset pagination on the default ordering
+    paginator = CursorPaginator(interviews, 10, ('date_time', 'id'), count_limit=LISTING_COUNT_LIMIT)
+    interviews = paginator.get_page(request.GET)
+    
+    return render(request, template, {
+        'interviews': interviews,
+        'calendar_url': request.build_absolute_uri(reverse('calendar_feed', args=[feed_token(request.user)])),
+    })
+
+
+def interview_conflicts(interview):
+    """Messages for the booked interviews an active interview would overlap"""
+    if interview.status not in scheduler.ACTIVE_STATUSES:
+        return []
+    return scheduler.conflicts(
+        interview.application.student_id,
+        interview.interviewer,
+        interview.meeting_link if interview.interview_type == 'online' else interview.location,
+        interview.date_time,
+        interview.duration_minutes,
+        exclude=interview.pk,
+    )
+
+
+# Queries of a batch scheduling request besides the booking, and per
+# transitions.BULK_BATCH_SIZE interviews booked
+SCHEDULE_BASE_BUDGET = 12
+SCHEDULE_BATCH_BUDGET = 30
+
+
+@login_required
+@query_budget(SCHEDULE_BASE_BUDGET + SCHEDULE_BATCH_BUDGET)
+def schedule_interviews(request, job_id):
+    """
+    Schedule interviews for every shortlisted application of a job without
+    one, in slots cut from the interviewers' availability windows. The
+    first POST shows the proposed schedule; confirming books it.
+    """
+    if not (request.user.is_company or request.user.is_officer):
+        messages.error(request, "You don't have permission to schedule interviews.")
+        return redirect('home')
     
-    # Pagination
-    paginator = Paginator(interviews, 10)
-    page = request.GET.get('page')
-    interviews = paginator.get_page(page)
+    job = get_object_or_404(JobPosting.objects.select_related('company'), id=job_id)
+    if request.user.is_company and job.company != request.profile:
+        messages.error(request, "You can only schedule interviews for your jobs.")
+        return redirect('manage_jobs')
+    
+    applications = list(
+        JobApplication.objects.filter(job=job, status='shortlisted')
+        .exclude(interviews__status__in=scheduler.ACTIVE_STATUSES)
+        .select_related('student__user', 'job__company')
+        .order_by('applied_at', 'id')
+    )
+    proposal = None
+    if request.method == 'POST':
+        form = InterviewBatchForm(request.POST)
+        if form.is_valid() and applications:
+            data = form.cleaned_data
+            proposal = scheduler.schedule(
+                applications, data['windows'], data['slot_minutes'], data['venues'],
+                data['interview_type'], gap_minutes=data['gap_minutes'] or 0, notes=data['notes'],
+            )
+            if 'confirm' in request.POST:
+                booked = scheduler.book(proposal.interviews)
+                request.query_budget = (
+                    SCHEDULE_BASE_BUDGET + SCHEDULE_BATCH_BUDGET * (len(booked) // BULK_BATCH_SIZE + 1)
+                )
+                messages.success(request, f"Scheduled {len(booked)} interview{'s' if len(booked) != 1 else ''}.")
+                if proposal.unassigned:
+                    messages.warning(
+                        request,
+                        f"{len(proposal.unassigned)} shortlisted application{'s' if len(proposal.unassigned) != 1 else ''} "
+                        "could not be given a slot; add availability and schedule again.",
+                    )
+                return redirect('interviews')
+    else:
+        form = InterviewBatchForm()
     
-    return render(request, template, {'interviews': interviews})
+    return render(request, 'jobs/schedule_interviews.html', {
+        'form': form,
+        'job': job,
+        'applications': applications,
+        'proposal': proposal,
+    })
 
 
 @login_required
+@query_budget(12)
 def update_interview(request, interview_id):
     """
     Update interview details or provide feedback
@@ -390,15 +671,21 @@ def update_interview(request, interview_id):
         messages.error(request, "You don't have permission to update interviews.")
         return redirect('home')
     
-    interview = get_object_or_404(Interview, id=interview_id)
+    interview = get_object_or_404(
+        Interview.objects.select_related('application__student__user', 'application__job__company'),
+        id=interview_id
+    )
     
     # Only allow companies to update their own interviews
-    if request.user.is_company and interview.application.job.company != request.user.company_profile:
+    if request.user.is_company and interview.application.job.company != request.profile:
         messages.error(request, "You can only update interviews for your jobs.")
         return redirect('interviews')
     
     if request.method == 'POST':
         form = InterviewForm(request.POST, instance=interview)
+        if form.is_valid():
+            for conflict in interview_conflicts(interview):
+                form.add_error(None, conflict)
         if form.is_valid():
             form.save()
             
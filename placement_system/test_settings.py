@@ -0,0 +1,27 @@
+"""
+Settings for the test suite, on SQLite so that no database server is needed:
+
+    python manage.py test --settings=placement_system.test_settings
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test.sqlite3',
+    },
+    # A separate database standing in for a read replica; tests that use it
+    # list it in DATABASE_REPLICAS (see accounts/tests.py)
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test_replica.sqlite3',
+    },
+}
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+# Views over their @query_budget fail the tests
+QUERY_BUDGET_STRICT = True
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
@@ -34,151 +34,124 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     };
 
-    // Initialize charts if elements exist
-    initializeCharts();
-
-    // Function to initialize all charts
-    function initializeCharts() {
-        // Application Status Chart
-        initializeApplicationStatusChart();
-        
-        // Department Placement Rate Chart
-        initializePlacementRateChart();
-        
-        // Job Type Distribution Chart
-        initializeJobTypeChart();
-        
-        // Monthly Job Postings Chart
-        initializeMonthlyJobsChart();
-    }
-
-    // Application Status Distribution Chart
-    function initializeApplicationStatusChart() {
-        const applicationStatusChart = document.getElementById('applicationStatusChart');
-        if (!applicationStatusChart) return;
-
-        const ctx = applicationStatusChart.getContext('2d');
-        
-        // Data will be populated from the template
-        // This is just a placeholder for demonstration
-        new Chart(ctx, {
-            type: 'doughnut',
-            data: {
-                labels: ['Applied', 'Under Review', 'Shortlisted', 'Selected', 'Rejected'],
-                datasets: [{
-                    data: [30, 20, 15, 25, 10], // Will be overridden by template data
-                    backgroundColor: [
-                        colorPalette.primary,
-                        colorPalette.info,
-                        colorPalette.warning,
-                        colorPalette.success,
-                        colorPalette.danger
-                    ],
-                    borderWidth: 1
-                }]
-            },
-            options: {
-                ...commonOptions
-            }
-        });
-    }
+    // Colors of the series returned by the chart endpoints, by dataset key
+    const seriesColors = {
+        applications: colorPalette.warning,
+        placement_rate: colorPalette.success,
+        jobs: colorPalette.primary,
+        interviews: '#6f42c1',
+        selections: colorPalette.success
+    };
 
-    // Department Placement Rate Chart
-    function initializePlacementRateChart() {
-        const placementRateChart = document.getElementById('placementRateChart');
-        if (!placementRateChart) return;
+    // Slice colors of pie and doughnut charts, in label order
+    const sliceColors = [
+        colorPalette.secondary,
+        colorPalette.info,
+        colorPalette.warning,
+        colorPalette.success,
+        colorPalette.danger,
+        colorPalette.primary
+    ];
+
+    // Seconds between refreshes of a chart's data
+    const POLL_INTERVAL = 60;
+
+    // Initialize every chart container on the page
+    document.querySelectorAll('.chart-container[data-chart-url]').forEach(initializeDataChart);
+
+    // Chart whose data is loaded from a JSON chart endpoint.
+    // The endpoint answers 304 Not Modified while its ETag still matches,
+    // so polling costs one small request until the data changes.
+    function initializeDataChart(container) {
+        const canvas = container.querySelector('canvas');
+        const emptyState = container.querySelector('.chart-empty');
+        const type = container.dataset.chartType || 'bar';
+        let chart = null;
+        let etag = null;
+
+        function datasetsFor(data) {
+            const isSliced = type === 'pie' || type === 'doughnut';
+            return data.datasets.map(function(dataset) {
+                const color = seriesColors[dataset.key] || colorPalette.primary;
+                return {
+                    label: dataset.label,
+                    data: dataset.data,
+                    backgroundColor: isSliced ? sliceColors.slice(0, dataset.data.length)
+                        : (type === 'line' ? 'transparent' : color),
+                    borderColor: isSliced ? '#fff' : color,
+                    borderWidth: isSliced ? 1 : 2,
+                    pointBackgroundColor: color,
+                    tension: 0.4
+                };
+            });
+        }
 
-        const ctx = placementRateChart.getContext('2d');
-        
-        // Data will be populated from the template
-        new Chart(ctx, {
-            type: 'horizontalBar',
-            data: {
-                labels: ['Computer Science', 'Electrical Engineering', 'Mechanical Engineering', 'Civil Engineering'],
-                datasets: [{
-                    label: 'Placement Rate (%)',
-                    data: [92, 85, 78, 65], // Will be overridden by template data
-                    backgroundColor: colorPalette.successLight,
-                    borderColor: colorPalette.success,
-                    borderWidth: 1
-                }]
-            },
-            options: {
+        function optionsFor() {
+            const options = {
                 ...commonOptions,
-                scales: {
-                    xAxes: [{
-                        ticks: {
-                            beginAtZero: true,
-                            max: 100
-                        }
-                    }]
+                plugins: {
+                    ...commonOptions.plugins,
+                    legend: {position: container.dataset.chartLegend || 'bottom'}
                 }
+            };
+            if (type === 'horizontal-bar') {
+                options.indexAxis = 'y';
+                options.scales = {x: {beginAtZero: true, max: Number(container.dataset.chartMax) || undefined}};
+            } else if (type === 'line' || type === 'bar') {
+                options.scales = {y: {beginAtZero: true, ticks: {precision: 0}}};
             }
-        });
-    }
-
-    // Job Type Distribution Chart
-    function initializeJobTypeChart() {
-        const jobTypeChart = document.getElementById('jobTypeChart');
-        if (!jobTypeChart) return;
+            return options;
+        }
 
-        const ctx = jobTypeChart.getContext('2d');
-        
-        // Data will be populated from the template
-        new Chart(ctx, {
-            type: 'pie',
-            data: {
-                labels: ['Full Time', 'Internship', 'Part Time'],
-                datasets: [{
-                    data: [65, 30, 5], // Will be overridden by template data
-                    backgroundColor: [
-                        colorPalette.primary,
-                        colorPalette.warning,
-                        colorPalette.info
-                    ],
-                    borderWidth: 1
-                }]
-            },
-            options: {
-                ...commonOptions
+        function render(data) {
+            const isEmpty = data.labels.length === 0 ||
+                data.datasets.every(function(dataset) {
+                    return dataset.data.every(function(value) { return !value; });
+                });
+            canvas.classList.toggle('d-none', isEmpty);
+            if (emptyState) {
+                emptyState.classList.toggle('d-none', !isEmpty);
             }
-        });
-    }
+            if (chart) {
+                chart.data.labels = data.labels;
+                chart.data.datasets = datasetsFor(data);
+                chart.update();
+                return;
+            }
+            chart = new Chart(canvas.getContext('2d'), {
+                type: type === 'horizontal-bar' ? 'bar' : type,
+                data: {labels: data.labels, datasets: datasetsFor(data)},
+                options: optionsFor()
+            });
+        }
 
-    // Monthly Job Postings Chart
-    function initializeMonthlyJobsChart() {
-        const monthlyJobsChart = document.getElementById('monthlyJobsChart');
-        if (!monthlyJobsChart) return;
+        function load() {
+            const headers = {'Accept': 'application/json'};
+            if (etag) {
+                headers['If-None-Match'] = etag;
+            }
+            return fetch(container.dataset.chartUrl, {headers: headers, cache: 'no-store', credentials: 'same-origin'})
+                .then(function(response) {
+                    if (response.status === 304 || !response.ok) {
+                        return;
+                    }
+                    etag = response.headers.get('ETag');
+                    return response.json().then(render);
+                })
+                .catch(function(error) {
+                    console.error('Could not load chart data', container.dataset.chartUrl, error);
+                });
+        }
 
-        const ctx = monthlyJobsChart.getContext('2d');
-        
-        // Data will be populated from the template
-        new Chart(ctx, {
-            type: 'line',
-            data: {
-                labels: ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'],
-                datasets: [{
-                    label: 'Job Postings',
-                    data: [12, 19, 3, 5, 2, 3, 7, 8, 12, 15, 10, 6], // Will be overridden by template data
-                    backgroundColor: colorPalette.primaryLight,
-                    borderColor: colorPalette.primary,
-                    borderWidth: 2,
-                    pointBackgroundColor: colorPalette.primary,
-                    tension: 0.4
-                }]
-            },
-            options: {
-                ...commonOptions,
-                scales: {
-                    yAxes: [{
-                        ticks: {
-                            beginAtZero: true,
-                            stepSize: 5
-                        }
-                    }]
+        load();
+        const interval = Number(container.dataset.chartPoll || POLL_INTERVAL);
+        if (interval > 0) {
+            setInterval(function() {
+                if (!document.hidden) {
+                    load();
                 }
-            }
-        });
+            }, interval * 1000);
+        }
     }
 
     // Gender Distribution Chart (for officer dashboards)